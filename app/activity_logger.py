@@ -1,57 +1,136 @@
+import fcntl
 import json
 import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from typing import List, Dict
+from metrics import ACTIVITY_STORE_DURATION
+from tracing import start_span
 
 ACTIVITY_FILE = "activities.json"
 MAX_ACTIVITIES = 50  
 
+# Parsed activities.json, reused until the file's mtime/size change
+_store_cache = {"stat": None, "activities": []}
+_store_lock = threading.Lock()
+
+
+@contextmanager
+def _file_lock():
+    # Workers are separate processes; the thread lock alone does not stop two of
+    # them from reading the same list and each dropping the other's entry
+    with open(f"{ACTIVITY_FILE}.lock", 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
 class ActivityLogger:
     @staticmethod
     def log_activity(activity_type: str, title: str, meta: str = "", icon: str = "info"):
-        activities = ActivityLogger._load_activities()
-        
-        activity = {
-            "type": activity_type,
-            "title": title,
-            "meta": meta,
-            "icon": icon,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        activities.insert(0, activity)
-        
-        activities = activities[:MAX_ACTIVITIES]
+        with _store_lock, _file_lock():
+            activities = ActivityLogger._load_activities()
+            
+            activity = {
+                "id": ActivityLogger.latest_id(activities) + 1,
+                "type": activity_type,
+                "title": title,
+                "meta": meta,
+                "icon": icon,
+                "timestamp": datetime.now().isoformat()
+            }
+            
+            activities = [activity] + activities
+            
+            activities = activities[:MAX_ACTIVITIES]
 
-        ActivityLogger._save_activities(activities)
+            ActivityLogger._save_activities(activities)
     
     @staticmethod
-    def get_recent_activities(limit: int = 10) -> List[Dict]:
-        activities = ActivityLogger._load_activities()
+    def get_recent_activities(limit: int = 10, since=None, activities: List[Dict] = None) -> List[Dict]:
+        if activities is None:
+            activities = ActivityLogger.load()
         
-        # Add relative time to each activity
-        for activity in activities:
-            activity['relative_time'] = ActivityLogger._get_relative_time(
-                activity['timestamp']
-            )
+        if since is not None:
+            activities = ActivityLogger._newer_than(activities, since)
         
-        return activities[:limit]
+        # Relative time only for the entries actually returned
+        return [
+            dict(activity, relative_time=ActivityLogger._get_relative_time(activity['timestamp']))
+            for activity in activities[:limit]
+        ]
+    
+    @staticmethod
+    def load() -> List[Dict]:
+        """All stored activities, newest first; pass them on to read one consistent state."""
+        return ActivityLogger._load_activities()
+    
+    @staticmethod
+    def latest_id(activities: List[Dict] = None) -> int:
+        if activities is None:
+            activities = ActivityLogger._load_activities()
+        return activities[0]['id'] if activities else 0
+    
+    @staticmethod
+    def _newer_than(activities: List[Dict], since) -> List[Dict]:
+        # since is an activity id or an ISO timestamp
+        try:
+            since_id = int(since)
+        except (TypeError, ValueError):
+            since_id = None
+        if since_id is not None:
+            return [a for a in activities if a['id'] > since_id]
+        try:
+            since_time = datetime.fromisoformat(str(since).replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError("since must be an activity id or an ISO timestamp")
+        if since_time.tzinfo is not None:
+            # Stored timestamps are naive server-local time
+            since_time = since_time.astimezone().replace(tzinfo=None)
+        return [a for a in activities if datetime.fromisoformat(a['timestamp']) > since_time]
     
     @staticmethod
     def _load_activities() -> List[Dict]:
-        if not os.path.exists(ACTIVITY_FILE):
+        try:
+            stat = os.stat(ACTIVITY_FILE)
+        except FileNotFoundError:
             return []
         
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if _store_cache["stat"] == signature:
+            return _store_cache["activities"]
+        
+        started = time.perf_counter()
         try:
-            with open(ACTIVITY_FILE, 'r') as f:
-                return json.load(f)
+            with start_span("activity_store.load", **{"activity_store.file": ACTIVITY_FILE}):
+                with open(ACTIVITY_FILE, 'r') as f:
+                    activities = json.load(f)
         except (json.JSONDecodeError, FileNotFoundError):
             return []
+        finally:
+            ACTIVITY_STORE_DURATION.observe(time.perf_counter() - started, operation='load')
+        
+        # Entries written before ids existed: number them newest-highest
+        for index, activity in enumerate(activities):
+            activity.setdefault('id', len(activities) - index)
+        
+        _store_cache["stat"] = signature
+        _store_cache["activities"] = activities
+        return activities
     
     @staticmethod
     def _save_activities(activities: List[Dict]):
-        with open(ACTIVITY_FILE, 'w') as f:
-            json.dump(activities, f, indent=2)
+        started = time.perf_counter()
+        with start_span("activity_store.save", **{"activity_store.entries": len(activities)}):
+            # Readers in other workers never see a half-written file
+            tmp_path = f"{ACTIVITY_FILE}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(activities, f, indent=2)
+            os.replace(tmp_path, ACTIVITY_FILE)
+        stat = os.stat(ACTIVITY_FILE)
+        _store_cache["stat"] = (stat.st_mtime_ns, stat.st_size)
+        _store_cache["activities"] = activities
+        ACTIVITY_STORE_DURATION.observe(time.perf_counter() - started, operation='save')
     
     @staticmethod
     def _get_relative_time(timestamp_str: str) -> str:
@@ -0,0 +1,238 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+
+class QueueFullError(Exception):
+    def __init__(self, message: str, retry_after: int, position: Optional[int] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.position = position
+
+
+class QueueTimeoutError(QueueFullError):
+    pass
+
+
+class Ticket:
+    def __init__(self, user: str):
+        self.user = user
+        self.enqueued_at = time.monotonic()
+        self.granted_at = None
+        self.initial_position = 0
+        # Called on grant for tickets waiting on an event loop
+        self.wake = None
+
+    @property
+    def wait_ms(self) -> int:
+        if self.granted_at is None:
+            return 0
+        return int((self.granted_at - self.enqueued_at) * 1000)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class FairScheduler:
+    """Bounded admission queue with a global slot limit, a per-user limit and
+    round-robin dispatch across users, so one busy user cannot starve the rest."""
+
+    def __init__(self, name: str, max_concurrent: int, per_user_limit: int,
+                 max_queue: int, queue_timeout: float = 60.0,
+                 per_user_queue: Optional[int] = None):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.per_user_limit = per_user_limit
+        self.max_queue = max_queue
+        # Keeps one user's burst from filling the shared queue for everyone
+        self.per_user_queue = per_user_queue
+        self.queue_timeout = queue_timeout
+        self.rejected = 0
+        self.timed_out = 0
+        self.completed = 0
+        self._avg_service = 5.0
+        self._running: Dict[str, int] = {}
+        self._waiting: "OrderedDict[str, deque]" = OrderedDict()
+        self._cond = threading.Condition()
+
+    # Internal helpers expect self._cond to be held
+
+    def _queued(self) -> int:
+        return sum(len(q) for q in self._waiting.values())
+
+    def _active(self) -> int:
+        return sum(self._running.values())
+
+    def _position(self, ticket: Ticket) -> int:
+        queue = self._waiting.get(ticket.user)
+        if not queue or ticket not in queue:
+            return 0
+        rank = list(queue).index(ticket)
+        # Round-robin serves one ticket per user per turn
+        ahead = sum(min(len(q), rank + 1) for user, q in self._waiting.items() if user != ticket.user)
+        return ahead + rank + 1
+
+    def _retry_after(self) -> int:
+        backlog = self._queued() + self._active()
+        return max(1, int(self._avg_service * backlog / max(1, self.max_concurrent)))
+
+    def _dispatch(self):
+        granted = False
+        while self._active() < self.max_concurrent:
+            picked = None
+            for user, queue in self._waiting.items():
+                if queue and self._running.get(user, 0) < self.per_user_limit:
+                    picked = user
+                    break
+            if picked is None:
+                break
+            ticket = self._waiting[picked].popleft()
+            # Move the served user to the back of the rotation
+            self._waiting.move_to_end(picked)
+            if not self._waiting[picked]:
+                del self._waiting[picked]
+            self._running[picked] = self._running.get(picked, 0) + 1
+            ticket.granted_at = time.monotonic()
+            if ticket.wake is not None:
+                ticket.wake()
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _enqueue(self, ticket: Ticket):
+        if self._queued() >= self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(
+                f"{self.name} queue is full ({self.max_queue} waiting)",
+                retry_after=self._retry_after()
+            )
+        waiting = len(self._waiting.get(ticket.user, ()))
+        if self.per_user_queue is not None and waiting >= self.per_user_queue:
+            self.rejected += 1
+            raise QueueFullError(
+                f"Too many {self.name} requests waiting for {ticket.user} ({waiting})",
+                retry_after=self._retry_after()
+            )
+        self._waiting.setdefault(ticket.user, deque()).append(ticket)
+        ticket.initial_position = self._position(ticket)
+        self._dispatch()
+
+    def _withdraw(self, ticket: Ticket) -> int:
+        position = self._position(ticket)
+        queue = self._waiting.get(ticket.user)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._waiting[ticket.user]
+        return position
+
+    def _expired(self, ticket: Ticket, timeout: float) -> QueueTimeoutError:
+        position = self._withdraw(ticket)
+        self.timed_out += 1
+        return QueueTimeoutError(
+            f"Timed out after {timeout:.0f}s waiting for {self.name}",
+            retry_after=self._retry_after(),
+            position=position
+        )
+
+    def acquire(self, user: str, timeout: Optional[float] = None) -> Ticket:
+        timeout = self.queue_timeout if timeout is None else timeout
+        ticket = Ticket(user)
+        with self._cond:
+            self._enqueue(ticket)
+            deadline = time.monotonic() + timeout
+            while ticket.granted_at is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise self._expired(ticket, timeout)
+                self._cond.wait(remaining)
+        return ticket
+
+    async def acquire_async(self, user: str, timeout: Optional[float] = None) -> Ticket:
+        """acquire for coroutines: same queue and limits, but waits without blocking the loop."""
+        timeout = self.queue_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+        ticket = Ticket(user)
+        # _dispatch may run on any thread, e.g. when a sync caller releases
+        ticket.wake = lambda: loop.call_soon_threadsafe(_resolve, granted)
+        with self._cond:
+            self._enqueue(ticket)
+        try:
+            await asyncio.wait_for(granted, timeout)
+        except asyncio.TimeoutError:
+            with self._cond:
+                if ticket.granted_at is None:
+                    raise self._expired(ticket, timeout)
+        except asyncio.CancelledError:
+            with self._cond:
+                holding = ticket.granted_at is not None
+                if not holding:
+                    self._withdraw(ticket)
+            if holding:
+                self.release(ticket)
+            raise
+        return ticket
+
+    def release(self, ticket: Ticket):
+        with self._cond:
+            remaining = self._running.get(ticket.user, 0) - 1
+            if remaining > 0:
+                self._running[ticket.user] = remaining
+            else:
+                self._running.pop(ticket.user, None)
+            if ticket.granted_at is not None:
+                elapsed = time.monotonic() - ticket.granted_at
+                self._avg_service = 0.8 * self._avg_service + 0.2 * elapsed
+            self.completed += 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, user: str, timeout: Optional[float] = None):
+        ticket = self.acquire(user, timeout)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    @asynccontextmanager
+    async def slot_async(self, user: str, timeout: Optional[float] = None):
+        ticket = await self.acquire_async(user, timeout)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def user_status(self, user: str) -> Dict:
+        with self._cond:
+            queue = self._waiting.get(user, ())
+            positions = [self._position(t) for t in queue]
+            return {
+                "running": self._running.get(user, 0),
+                "waiting": len(positions),
+                "position": min(positions) if positions else 0,
+                "queue_length": self._queued(),
+                "retry_after": self._retry_after()
+            }
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "name": self.name,
+                "active": self._active(),
+                "queued": self._queued(),
+                "max_concurrent": self.max_concurrent,
+                "per_user_limit": self.per_user_limit,
+                "max_queue": self.max_queue,
+                "per_user_queue": self.per_user_queue,
+                "users_waiting": len(self._waiting),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_service_seconds": round(self._avg_service, 3)
+            }
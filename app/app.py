@@ -1,5 +1,9 @@
 from flask import Flask
 from routes import init_routes
+from metrics import init_metrics
+from tracing import init_tracing
+from warmup import init_warmup
+from assets import init_assets
 from dotenv import load_dotenv
 import os
 
@@ -20,7 +24,36 @@ else:
     from config import DevelopmentConfig
     app.config.from_object(DevelopmentConfig)
 
+if app.config.get('TRUSTED_PROXIES'):
+    from werkzeug.middleware.proxy_fix import ProxyFix
+    proxies = app.config['TRUSTED_PROXIES']
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies)
+
+if os.environ.get('ZOWE_REPLAY'):
+    from zowe_replay import ReplayBackend
+    from zowe_backend import set_backend
+    set_backend(ReplayBackend.load(
+        os.environ['ZOWE_REPLAY'],
+        speed=float(os.environ.get('ZOWE_REPLAY_SPEED', 1.0))
+    ))
+elif app.config.get('MOCK_MODE') and app.config.get('MOCK_SIMULATOR'):
+    from mainframe_sim import MainframeSimulator
+    from zowe_backend import set_backend
+    os.environ.setdefault('ZOS_USER', 'IBMUSER')
+    set_backend(MainframeSimulator())
+
+if os.environ.get('ZOWE_RECORD'):
+    from zowe_replay import ZoweRecorder, set_recorder
+    set_recorder(ZoweRecorder(os.environ['ZOWE_RECORD']))
+
 init_routes(app)
+init_assets(app)
+init_metrics(app)
+init_tracing(app)
+# With the debug reloader, only the child process that serves requests warms up
+init_warmup(app, start=not (
+    __name__ == '__main__' and app.debug and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+))
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=6767)
\ No newline at end of file
+    app.run(debug=app.config.get('DEBUG', False), host='0.0.0.0', port=6767)
\ No newline at end of file
@@ -0,0 +1,358 @@
+"""Async entry point: `uvicorn asgi:application --host 0.0.0.0 --port 6767`.
+
+The mainframe read routes are served natively on the event loop with
+asyncio zowe subprocesses; every other request is handed to the regular
+Flask app, so both modes share one route table and one set of parsers.
+"""
+import asyncio
+import json
+import re
+import time
+import traceback
+from http.cookies import CookieError, SimpleCookie
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app
+from routes import (
+    CONTENT_CACHE_MAX_BYTES,
+    CONTENT_PAGE_MAX,
+    CONTENT_PAGE_SIZE,
+    catalog_cache,
+    catalog_key,
+    content_cache,
+    data_set_target,
+    jobs_key,
+    job_steps,
+    jobs_list_cmd,
+    member_list_cmd,
+    view_data_set_cmd,
+    parse_jobs_output,
+    parse_dataset_list,
+    parse_members,
+    parse_uss_listing,
+    record_count_key,
+    record_counts,
+    remember_job_output,
+    spool_cache,
+    spool_key
+)
+from admission import QueueFullError, QueueTimeoutError
+from zowe_async import client_address, run_zowe_async, stale_marker
+from job_snapshots import job_store, jobs_response
+from job_stats import job_stats
+from metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS
+from tracing import request_span
+from zowe_backend import get_backend
+from zowe_identity import ZOWE_IDENTITY_HEADER, ZOWE_PROFILES, current_identity, resolve, set_identity
+
+flask_application = WsgiToAsgi(app)
+
+ASYNC_ROUTES = []
+
+
+def route(pattern, error_fields=None):
+    def decorator(handler):
+        # Same route label as the Flask rule, e.g. /api/jobs/<jobid>
+        handler.rule = re.sub(r"\(\?P<(\w+)>[^)]*\)", r"<\1>", pattern)
+        # Extra keys the Flask route puts in its 500 body next to "error"
+        handler.error_fields = error_fields or {}
+        ASYNC_ROUTES.append((re.compile(f"^{pattern}$"), handler))
+        return handler
+    return decorator
+
+
+async def refresh_jobs_async(owner='*', prefix='*'):
+    key = jobs_key(owner, prefix)
+    if job_store.is_fresh(key):
+        return key
+    loop = asyncio.get_running_loop()
+
+    def fetch():
+        # The zowe call itself still runs on the event loop
+        future = asyncio.run_coroutine_threadsafe(run_zowe_async(jobs_list_cmd(owner, prefix)), loop)
+        return parse_jobs_output(future.result())
+
+    # Through the store's single-flight refresh, shared with the Flask route and other workers
+    await asyncio.to_thread(job_store.refresh, key, fetch)
+    return key
+
+
+async def list_catalog_async(pattern):
+    """routes.list_catalog with the zowe call on the event loop; same cache keys."""
+    key = catalog_key(pattern)
+    output = catalog_cache.get(key)
+    if output is not None:
+        return output
+    loop = asyncio.get_running_loop()
+
+    def load():
+        # The zowe call itself still runs on the event loop
+        future = asyncio.run_coroutine_threadsafe(run_zowe_async(f'zowe files list data-set "{pattern}"'), loop)
+        return future.result()
+
+    # Through the cache's single-flight load, shared with the Flask route and other workers
+    return await asyncio.to_thread(catalog_cache.get_or_load, key, load)
+
+
+async def read_content_async(target, cmd):
+    """routes.read_content with the zowe call on the event loop; same cache keys."""
+    key = f"{target}\x00{current_identity().name}"
+    content = content_cache.get(key)
+    if content is not None:
+        return content, True
+    content = await run_zowe_async(cmd)
+    if len(content) <= CONTENT_CACHE_MAX_BYTES:
+        content_cache.set(key, content)
+    return content, False
+
+
+@route(r"/api/jobs", error_fields={"jobs": []})
+async def list_jobs(args):
+    key = await refresh_jobs_async(args.get('owner', '*').strip(), args.get('prefix', '*').strip())
+    try:
+        return jobs_response(job_store, key, args)
+    except ValueError as e:
+        return 400, {"error": str(e), "jobs": []}
+
+
+@route(r"/api/jobs/stats")
+async def get_job_stats(args):
+    # Registered before the <jobid> route so it wins
+    try:
+        top = int(args.get('top', 20))
+        points = int(args.get('points', 0))
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    # Like the Flask route: the stats are fed by the job list, so bring it up to date first
+    await refresh_jobs_async()
+    try:
+        stats = job_stats.query(args.get('window', '24h').strip(), args.get('group_by', 'all').strip(), top)
+        if points > 0:
+            stats["series"] = job_stats.series(args.get('window', '24h').strip(), points)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+    stats["mock"] = False
+    return 200, stats
+
+
+@route(r"/api/jobs/(?P<jobid>[^/]+)")
+async def get_job_details(args, jobid):
+    output = spool_cache.get(spool_key(jobid, 'status'))
+    spool_output = spool_cache.get(spool_key(jobid, 'spool'))
+    fetched = output is None or spool_output is None
+    if fetched:
+        # Status and spool listing are independent, so fetch them concurrently
+        output, spool_output = await asyncio.gather(
+            run_zowe_async(f'zowe jobs view job-status-by-jobid {jobid} --rfj'),
+            run_zowe_async(f'zowe jobs list spool-files-by-jobid {jobid} --rfj')
+        )
+    job = json.loads(output).get('data', {})
+    spool_data = json.loads(spool_output)
+    finished = job.get('status') == 'OUTPUT'
+    if fetched:
+        remember_job_output(jobid, 'status', output, finished)
+        remember_job_output(jobid, 'spool', spool_output, finished)
+
+    return 200, {
+        "jobid": job.get('jobid', jobid),
+        "jobname": job.get('jobname', ''),
+        "owner": job.get('owner', ''),
+        "status": job.get('status', ''),
+        "retcode": job.get('retcode'),
+        "class": job.get('class', 'A'),
+        "subsystem": job.get('subsystem'),
+        # The parser streams spool through the sync zowe path; keep it off the event loop
+        "steps": await asyncio.to_thread(job_steps, jobid, spool_data.get('data', [])) if finished else [],
+        "spool": spool_data.get('data', []),
+        "mock": False
+    }
+
+
+@route(r"/api/jobs/(?P<jobid>[^/]+)/spool/(?P<spool_id>\d+)")
+async def get_spool_content(args, jobid, spool_id):
+    content = spool_cache.get(spool_key(jobid, spool_id))
+    if content is None:
+        content = await run_zowe_async(f'zowe jobs view spool-file-by-id {jobid} {spool_id}')
+        remember_job_output(jobid, spool_id, content)
+    return 200, {"content": content, "mock": False}
+
+
+@route(r"/api/datasets/list")
+async def list_datasets(args):
+    hlq = args.get('hlq', '').strip()
+    if not hlq:
+        return 400, {"error": "HLQ parameter is required"}
+    output = await list_catalog_async(f"{hlq}.*")
+    return 200, {"datasets": parse_dataset_list(output), "mock": False}
+
+
+@route(r"/api/datasets/members")
+async def list_members(args):
+    dataset = args.get('dataset', '').strip()
+    if not dataset:
+        return 400, {"error": "Dataset parameter is required"}
+    output = await run_zowe_async(member_list_cmd(dataset))
+    return 200, {"members": parse_members(output), "mock": False}
+
+
+@route(r"/api/datasets/content")
+async def get_content(args):
+    dataset = args.get('dataset', '').strip()
+    member = args.get('member', '').strip()
+    if not dataset:
+        return 400, {"error": "Dataset parameter is required"}
+    if 'offset' in args or 'limit' in args:
+        try:
+            offset = max(0, int(args.get('offset', 0)))
+            limit = max(1, min(int(args.get('limit', CONTENT_PAGE_SIZE)), CONTENT_PAGE_MAX))
+        except ValueError:
+            return 400, {"error": "offset and limit must be integers"}
+        records = (await run_zowe_async(view_data_set_cmd(dataset, member, offset, limit))).splitlines()
+        return 200, {"records": records, "offset": offset, "limit": limit, "returned": len(records),
+                     "has_more": len(records) == limit,
+                     "total": record_counts.get(record_count_key(data_set_target(dataset, member).upper())), "mock": False}
+    content, cached = await read_content_async(data_set_target(dataset, member).upper(),
+                                               view_data_set_cmd(dataset, member))
+    return 200, {"content": content, "cached": cached, "mock": False}
+
+
+@route(r"/api/uss/browse")
+async def browse_uss(args):
+    path = args.get('path', '/').strip()
+    if not path:
+        return 400, {"error": "Path parameter is required"}
+    output = await run_zowe_async(f'zowe files list uss-files "{path}"')
+    return 200, {"path": path, "files": parse_uss_listing(output), "mock": False}
+
+
+@route(r"/api/uss/file")
+async def get_uss_file(args):
+    path = args.get('path', '').strip()
+    if not path:
+        return 400, {"error": "Path parameter is required"}
+    content, cached = await read_content_async(path, f'zowe files view uss-file "{path}"')
+    return 200, {"content": content, "cached": cached, "mock": False}
+
+
+def match_route(scope):
+    if scope['method'] != 'GET' or (app.config.get('MOCK_MODE', True) and get_backend() is None):
+        return None, None
+    for pattern, handler in ASYNC_ROUTES:
+        match = pattern.match(scope['path'])
+        if match:
+            return handler, match.groupdict()
+    return None, None
+
+
+async def send_json(send, status, payload, stale=False, retry_after=None):
+    body = json.dumps(payload).encode('utf-8')
+    headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode())
+    ]
+    if stale:
+        # Same flag the Flask routes set when run_zowe served last known good output
+        headers.append((b'x-zowe-stale', b'1'))
+    if retry_after is not None:
+        headers.append((b'retry-after', str(retry_after).encode()))
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': headers
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def has_session_cookie(headers):
+    cookies = SimpleCookie()
+    try:
+        cookies.load(headers.get(b'cookie', b'').decode('latin-1'))
+    except CookieError:
+        return False
+    return app.config['SESSION_COOKIE_NAME'] in cookies
+
+
+async def watch_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] != 'http':
+        return await flask_application(scope, receive, send)
+
+    handler, params = match_route(scope)
+    if handler is None:
+        return await flask_application(scope, receive, send)
+
+    started = time.perf_counter()
+    query = parse_qs(scope.get('query_string', b'').decode('utf-8'))
+    args = {key: values[0] for key, values in query.items()}
+    if args.get('stream', '').lower() == 'true':
+        # Chunked responses are produced by the Flask routes
+        return await flask_application(scope, receive, send)
+
+    headers = dict(scope.get('headers', []))
+    # Users on the shared identity are queued per client, like request.remote_addr in Flask;
+    # behind a proxy, run uvicorn with --proxy-headers --forwarded-allow-ips
+    client = scope.get('client')
+    client_address.set(client[0] if client else 'anonymous')
+    if ZOWE_IDENTITY_HEADER:
+        if ZOWE_PROFILES and has_session_cookie(headers):
+            # A profile the user switched to is inside Flask's signed session cookie
+            return await flask_application(scope, receive, send)
+        proxy_user = headers.get(ZOWE_IDENTITY_HEADER.lower().encode('latin-1'), b'').decode('latin-1')
+        # The handler task copies this context, so its zowe calls use the user's profile
+        set_identity(resolve(proxy_user, None))
+
+    with request_span(
+        f"GET {scope['path']}",
+        headers.get(b'traceparent', b'').decode('latin-1'),
+        **{"http.method": "GET", "http.route": handler.rule}
+    ) as span:
+        await serve(handler, args, params, receive, send, span, started)
+
+
+async def serve(handler, args, params, receive, send, span, started):
+    # The handler task copies the context, so it fills this same set
+    stale = set()
+    stale_marker.set(stale)
+    work = asyncio.ensure_future(handler(args, **params))
+    disconnect = asyncio.ensure_future(watch_disconnect(receive))
+    done, _ = await asyncio.wait({work, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+
+    if work not in done:
+        # Cancelling the handler kills its zowe subprocesses
+        work.cancel()
+        print(f"Client disconnected, cancelled {handler.rule}")
+        span.set_attribute("http.status_code", 499)
+        HTTP_REQUESTS.inc(route=handler.rule, method='GET', status=499)
+        return
+    disconnect.cancel()
+
+    retry_after = None
+    try:
+        status, payload = work.result()
+    except Exception as e:
+        print(f"Error in async handler for {handler.rule}:\n{traceback.format_exc()}")
+        span.record_error(e)
+        status, payload = 500, {"error": str(e), **handler.error_fields}
+        if isinstance(e, QueueFullError):
+            # As the Flask after_request does for g.zowe_busy
+            status = 503 if isinstance(e, QueueTimeoutError) else 429
+            retry_after = e.retry_after
+
+    span.set_attribute("http.status_code", status)
+
+    await send_json(send, status, payload, stale=bool(stale), retry_after=retry_after)
+    HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, route=handler.rule, method='GET')
+    HTTP_REQUESTS.inc(route=handler.rule, method='GET', status=status)
+
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run("asgi:application", host='0.0.0.0', port=6767)
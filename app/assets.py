@@ -0,0 +1,399 @@
+"""Bundled, minified and fingerprinted static assets.
+
+`python assets.py` builds them ahead of a deploy; otherwise the first start
+builds whatever is out of date. Templates ask for a bundle by name through
+`asset_urls()`, which returns the fingerprinted URL from the manifest, or
+the individual source files while bundling is off (the default when
+debugging, so edits show up on reload).
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+ASSETS_DIR = os.environ.get('ASSETS_DIR', os.path.join(STATIC_DIR, "dist"))
+ASSETS_URL = '/assets'
+# Unset: bundle unless the app runs in debug mode
+ASSETS_BUNDLE = os.environ.get('ASSETS_BUNDLE', '')
+ASSETS_MINIFY = os.environ.get('ASSETS_MINIFY', 'True').lower() in ['true', '1', 'yes']
+# Superseded builds stay servable this long for pages rendered by older workers
+ASSETS_KEEP = float(os.environ.get('ASSETS_KEEP', 86400))
+ASSETS_MAX_AGE = 365 * 24 * 3600
+
+MANIFEST_NAME = 'manifest.json'
+# What build_bundle names its output: <bundle>.<12 hex digits of sha256>.<js|css>
+FINGERPRINTED = re.compile(r"[A-Za-z0-9_-]+\.[0-9a-f]{12}\.(?:js|css)")
+
+# Bundle name -> sources under static/, in load order
+BUNDLES = {
+    'base.css': ['css/style.css'],
+    'base.js': ['js/main.js'],
+    'index.js': ['js/index.js'],
+    'jobs.css': ['css/jobs.css'],
+    'jobs.js': ['js/jobs.js'],
+    'datasets.css': ['css/datasets.css'],
+    'datasets.js': ['js/datasets.js'],
+    'editor.css': ['css/editor.css'],
+    'editor.js': ['js/nexus_ai.js', 'js/editor.js'],
+    'uss.css': ['css/uss.css'],
+    'uss.js': ['js/uss.js'],
+}
+
+IDENT_CHARS = re.compile(r"[\w$]")
+# After one of these (or these words) a slash starts a regex literal, not a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = {'return', 'typeof', 'case', 'in', 'of', 'delete', 'void', 'throw', 'new', 'instanceof', 'yield'}
+
+CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/)', re.DOTALL)
+
+
+def minify_css(source: str) -> str:
+    """Drop comments and redundant whitespace; strings are copied verbatim."""
+    out = []
+    for i, part in enumerate(CSS_TOKENS.split(source)):
+        if i % 2:
+            if not part.startswith('/*'):
+                out.append(part)
+            continue
+        part = re.sub(r"\s+", ' ', part)
+        # Not around ':' on its left, where ".a :hover" and ".a:hover" differ
+        part = re.sub(r" ?([{};,>~]) ?", r"\1", part)
+        part = re.sub(r": ", ":", part)
+        out.append(part)
+    return re.sub(r";}", "}", ''.join(out)).strip() + '\n'
+
+
+def _skip_string(source: str, i: int) -> int:
+    quote = source[i]
+    i += 1
+    while i < len(source) and source[i] != quote:
+        if source[i] == '\\':
+            i += 1
+        elif source[i] == '\n':
+            break
+        i += 1
+    return i + 1
+
+
+def _skip_regex(source: str, i: int) -> Optional[int]:
+    in_class = False
+    i += 1
+    while i < len(source):
+        c = source[i]
+        if c == '\n':
+            return None
+        if c == '\\':
+            i += 1
+        elif c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            while i < len(source) and IDENT_CHARS.match(source[i]):
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def _regex_allowed(out: List[str]) -> bool:
+    text = ''.join(out[-32:]).rstrip()
+    if not text:
+        return True
+    if text[-1] in REGEX_PRECEDERS:
+        return True
+    word = re.search(r"[\w$]+$", text)
+    return bool(word) and word.group(0) in REGEX_KEYWORDS
+
+
+def minify_js(source: str) -> str:
+    """Drop comments, indentation and blank lines.
+
+    Strings, template literals and regex literals are copied verbatim, and
+    line breaks are kept, so automatic semicolon insertion sees the same
+    code. Less thorough than a real minifier, but it cannot change meaning.
+    """
+    out: List[str] = []
+    # Brace depth at which each open `${` substitution of a template literal closes
+    substitutions: List[int] = []
+    depth = 0
+    i, n = 0, len(source)
+    while i < n:
+        c = source[i]
+        if c == '`' or (c == '}' and substitutions and substitutions[-1] == depth):
+            if c == '}':
+                substitutions.pop()
+            j = i + 1
+            while j < n:
+                if source[j] == '\\':
+                    j += 2
+                    continue
+                if source[j] == '`':
+                    j += 1
+                    break
+                if source.startswith('${', j):
+                    j += 2
+                    substitutions.append(depth)
+                    break
+                j += 1
+            out.append(source[i:j])
+            i = j
+        elif c in '"\'':
+            j = _skip_string(source, i)
+            out.append(source[i:j])
+            i = j
+        elif source.startswith('//', i):
+            while i < n and source[i] != '\n':
+                i += 1
+        elif source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            if '\n' in source[i:end]:
+                out.append('\n')
+            i = end
+        elif c == '/' and _regex_allowed(out):
+            j = _skip_regex(source, i)
+            if j is None:
+                out.append(c)
+                i += 1
+            else:
+                out.append(source[i:j])
+                i = j
+        elif c in ' \t\r':
+            while i < n and source[i] in ' \t\r':
+                i += 1
+            before = out[-1][-1] if out and out[-1] else ''
+            after = source[i] if i < n else ''
+            if (IDENT_CHARS.match(before) and IDENT_CHARS.match(after)) or (before == after and before in '+-'):
+                out.append(' ')
+        elif c == '\n':
+            if out and out[-1] != '\n':
+                out.append('\n')
+            i += 1
+        else:
+            if c == '{':
+                depth += 1
+            elif c == '}':
+                depth -= 1
+            out.append(c)
+            i += 1
+    return ''.join(out).strip() + '\n'
+
+
+def _read_sources(sources: List[str]) -> Dict[str, str]:
+    texts = {}
+    for source in sources:
+        path = os.path.join(STATIC_DIR, source)
+        if not os.path.exists(path):
+            print(f"Asset source {source} is missing, leaving it out")
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            texts[source] = f.read()
+    return texts
+
+
+def _write(path: str, data: bytes):
+    if os.path.exists(path):
+        return  # Same content hash, same bytes
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    # Several workers may build at once; each replace is atomic
+    os.replace(tmp_path, path)
+
+
+def build_bundle(name: str, sources: List[str], minify: bool = ASSETS_MINIFY) -> Optional[Dict]:
+    texts = _read_sources(sources)
+    if not texts:
+        return None
+    is_js = name.endswith('.js')
+    if minify:
+        texts = {source: (minify_js if is_js else minify_css)(text) for source, text in texts.items()}
+    # Separate script files never run into each other; keep it that way when joined
+    data = (';\n' if is_js else '\n').join(texts.values()).encode('utf-8')
+
+    stem, ext = os.path.splitext(name)
+    fingerprint = hashlib.sha256(data).hexdigest()[:12]
+    filename = f"{stem}.{fingerprint}{ext}"
+    path = os.path.join(ASSETS_DIR, filename)
+    _write(path, data)
+    entry = {"file": filename, "sources": list(texts), "bytes": len(data)}
+
+    gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+    _write(f"{path}.gz", gzipped)
+    entry["gzip"] = len(gzipped)
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        _write(f"{path}.br", compressed)
+        entry["br"] = len(compressed)
+    return entry
+
+
+def sources_hash(minify: bool = ASSETS_MINIFY) -> str:
+    digest = hashlib.sha256(f"minify={minify} brotli={brotli is not None}".encode())
+    for name, sources in sorted(BUNDLES.items()):
+        digest.update(name.encode())
+        for source in sources:
+            path = os.path.join(STATIC_DIR, source)
+            digest.update(source.encode())
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_manifest() -> Optional[Dict]:
+    path = os.path.join(ASSETS_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable asset manifest {path}: {e}")
+        return None
+
+
+def build(force: bool = False) -> Dict:
+    """Build every bundle unless the manifest already matches the sources."""
+    current = sources_hash()
+    manifest = load_manifest()
+    if manifest and manifest.get("sources_hash") == current and not force:
+        return manifest
+
+    started = time.perf_counter()
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    bundles = {}
+    for name, sources in BUNDLES.items():
+        entry = build_bundle(name, sources)
+        if entry is not None:
+            bundles[name] = entry
+    manifest = {"sources_hash": current, "built_at": time.time(), "bundles": bundles}
+    _write_manifest(manifest)
+    _prune(manifest)
+    total = sum(b["bytes"] for b in bundles.values())
+    print(f"Built {len(bundles)} asset bundles ({total} bytes) in {time.perf_counter() - started:.2f}s")
+    return manifest
+
+
+def _write_manifest(manifest: Dict):
+    path = os.path.join(ASSETS_DIR, MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _prune(manifest: Dict):
+    current = {b["file"] for b in manifest["bundles"].values()}
+    current |= {f"{name}.gz" for name in current} | {f"{name}.br" for name in current}
+    cutoff = time.time() - ASSETS_KEEP
+    for name in os.listdir(ASSETS_DIR):
+        path = os.path.join(ASSETS_DIR, name)
+        if name == MANIFEST_NAME or name in current or name.endswith('.tmp'):
+            continue
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+class Assets:
+    """Manifest lookups for templates and the long-cached /assets route."""
+
+    def __init__(self):
+        self.enabled = False
+        self.manifest: Dict = {"bundles": {}}
+
+    def init(self, enabled: bool):
+        self.enabled = enabled
+        if not enabled:
+            return
+        try:
+            self.manifest = build()
+        except OSError as e:
+            # A read-only deploy without a prebuilt manifest still serves the sources
+            print(f"Could not build assets, serving sources instead: {e}")
+            self.enabled = False
+
+    def urls(self, name: str, static_url) -> List[str]:
+        entry = self.manifest["bundles"].get(name) if self.enabled else None
+        if entry is not None:
+            return [f"{ASSETS_URL}/{entry['file']}"]
+        return [static_url(source) for source in BUNDLES.get(name, [])]
+
+    def serves(self, filename: str) -> bool:
+        """Any fingerprinted bundle on disk, not just this manifest's: superseded builds
+        and those of other workers during a rolling restart stay reachable."""
+        if not FINGERPRINTED.fullmatch(filename):
+            return False
+        path = os.path.join(ASSETS_DIR, filename)
+        # The pattern already excludes separators; make sure nothing resolves outside anyway
+        if os.path.dirname(os.path.realpath(path)) != os.path.realpath(ASSETS_DIR):
+            return False
+        return os.path.isfile(path)
+
+
+assets = Assets()
+
+
+def accepts(accept_encoding: str, coding: str) -> bool:
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        if name.strip().lower() in (coding, '*'):
+            quality = params.strip()
+            return not re.fullmatch(r"q=0(\.0*)?", quality)
+    return False
+
+
+def init_assets(app):
+    from flask import abort, request, send_from_directory, url_for
+
+    enabled = ASSETS_BUNDLE.lower() in ['true', '1', 'yes'] if ASSETS_BUNDLE else not app.debug
+    assets.init(enabled)
+
+    @app.context_processor
+    def inject_assets():
+        return {"asset_urls": lambda name: assets.urls(name, lambda f: url_for('static', filename=f))}
+
+    @app.route(f"{ASSETS_URL}/<path:filename>")
+    def serve_asset(filename):
+        if not assets.serves(filename):
+            abort(404)
+        accept_encoding = request.headers.get('Accept-Encoding', '')
+        served, encoding = filename, None
+        for coding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if accepts(accept_encoding, coding) and os.path.exists(os.path.join(ASSETS_DIR, filename + suffix)):
+                served, encoding = filename + suffix, coding
+                break
+        response = send_from_directory(
+            ASSETS_DIR, served,
+            mimetype=mimetypes.guess_type(filename)[0],
+            max_age=ASSETS_MAX_AGE
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        # The name changes with the content, so browsers never need to revalidate
+        response.headers['Cache-Control'] = f'public, max-age={ASSETS_MAX_AGE}, immutable'
+        return response
+
+
+if __name__ == '__main__':
+    manifest = build(force=True)
+    for name, entry in sorted(manifest["bundles"].items()):
+        sizes = ', '.join(f"{k} {entry[k]}" for k in ('gzip', 'br') if k in entry)
+        print(f"  {name:14} {entry['file']:32} {entry['bytes']:>7} bytes ({sizes})")
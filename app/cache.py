@@ -0,0 +1,143 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from shared_store import shared_store
+
+_MISSING = object()
+
+# All caches register themselves here so stats can be reported in one place
+CACHES: Dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """Thread-safe LRU cache where every entry also expires after `ttl` seconds.
+
+    A cache created with shared=True keeps its entries in the cross-worker
+    store when SHARED_CACHE is set; values must then be JSON-serializable.
+    Without a shared store it stays in process memory.
+    """
+
+    def __init__(self, name: str, maxsize: int = 128, ttl: float = 300, shared: bool = False):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.store = shared_store if shared else None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        CACHES[name] = self
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if self.store is not None:
+            value = self.store.get(self.name, key, _MISSING)
+            with self._lock:
+                if value is _MISSING:
+                    self.misses += 1
+                    return default
+                self.hits += 1
+                return value
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires = entry
+                if expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        if self.store is not None:
+            self.store.set(self.name, key, value, self.ttl if ttl is None else ttl, self.maxsize)
+            return
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key: str, load: Callable[[], Any]) -> Any:
+        """get(), falling back to load() and set(). With a shared store, only one
+        worker loads a missing key while the others wait for its result."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.store is None:
+            value = load()
+            self.set(key, value)
+            return value
+        with self.store.lease(f"{self.name}\x00{key}",
+                              lambda: self.store.get(self.name, key, _MISSING) is not _MISSING):
+            value = self.store.get(self.name, key, _MISSING)
+            if value is _MISSING:
+                value = load()
+                self.set(key, value)
+            return value
+
+    def invalidate(self, key: str):
+        if self.store is not None:
+            self.store.delete(self.name, key)
+            return
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        if self.store is not None:
+            return self.store.delete_prefix(self.name, prefix)
+        with self._lock:
+            keys = [key for key in self._data if isinstance(key, str) and key.startswith(prefix)]
+            for key in keys:
+                del self._data[key]
+        return len(keys)
+
+    def clear(self):
+        if self.store is not None:
+            self.store.clear(self.name)
+            return
+        with self._lock:
+            self._data.clear()
+
+    def dump(self) -> List[list]:
+        """Live entries as [key, value, expires_at] with wall-clock expiry, for persisting."""
+        if self.store is not None:
+            return [list(entry) for entry in self.store.items(self.name)]
+        now_mono, now_wall = time.monotonic(), time.time()
+        with self._lock:
+            return [[key, value, now_wall + expires - now_mono]
+                    for key, (value, expires) in self._data.items() if expires > now_mono]
+
+    def load(self, entries: List[list]) -> int:
+        """Restore entries from dump(), skipping the ones that expired meanwhile."""
+        now_wall = time.time()
+        restored = 0
+        for key, value, expires_at in entries:
+            if expires_at > now_wall:
+                self.set(key, value, ttl=expires_at - now_wall)
+                restored += 1
+        return restored
+
+    def stats(self) -> Dict[str, Any]:
+        size = self.store.count(self.name) if self.store is not None else None
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data) if size is None else size,
+                "shared": self.store is not None,
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def cache_stats():
+    return [cache.stats() for cache in CACHES.values()]
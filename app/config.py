@@ -3,9 +3,17 @@ import os
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY')
     MOCK_MODE = os.environ.get('MOCK_MODE', 'True').lower() in ['true', '1', 'yes']
+    MOCK_SIMULATOR = os.environ.get('MOCK_SIMULATOR', 'False').lower() in ['true', '1', 'yes']
     ZOS_HOST = os.environ.get('ZOS_HOST')
     ZOS_PORT = os.environ.get('ZOS_PORT')
     ZOS_USER = os.environ.get('ZOS_USER')
+    # Production server (gunicorn.conf.py): worker processes x threads per worker
+    WEB_BIND = os.environ.get('WEB_BIND', '0.0.0.0:6767')
+    WEB_WORKERS = int(os.environ.get('WEB_WORKERS', 4))
+    WEB_THREADS = int(os.environ.get('WEB_THREADS', 8))
+    WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT', 120))
+    # Reverse proxies in front of the app whose X-Forwarded-* headers are trusted
+    TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
     
     @classmethod
     def validate(cls):
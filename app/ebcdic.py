@@ -0,0 +1,106 @@
+"""EBCDIC data set records to UTF-8 text.
+
+/api/datasets/download fetches data sets untranslated (binary mode for
+fixed-length records, record mode otherwise) and converts them here, so the
+mainframe does no code page work. Records are cut out of each buffer as
+bytes, joined with the EBCDIC newline and translated in one table-driven
+pass over the whole buffer.
+"""
+import codecs
+import os
+import struct
+from typing import Dict, Iterable, Iterator, List
+
+DATASET_CODEPAGE = os.environ.get('DATASET_CODEPAGE', 'IBM-1047')
+
+# Single-byte EBCDIC code pages Python ships a codec for
+_CODECS = {
+    'IBM-037': 'cp037',
+    'IBM-273': 'cp273',
+    'IBM-500': 'cp500',
+    'IBM-875': 'cp875',
+    'IBM-1026': 'cp1026',
+    'IBM-1140': 'cp1140',
+}
+# IBM-1047 (the z/OS UNIX code page) is IBM-037 with ^/¬, [/Ý and ]/¨ swapped
+_IBM1047_SWAPS = ((0x5F, 0xB0), (0xAD, 0xBA), (0xBD, 0xBB))
+
+EBCDIC_NEWLINE = b'\x25'  # LF in every code page above
+EBCDIC_BLANK = b'\x40'
+RECORD_PREFIX = struct.Struct('>I')
+
+
+def _decoding_tables() -> Dict[str, str]:
+    tables = {name: bytes(range(256)).decode(codec) for name, codec in _CODECS.items()}
+    table = list(tables['IBM-037'])
+    for a, b in _IBM1047_SWAPS:
+        table[a], table[b] = table[b], table[a]
+    tables['IBM-1047'] = ''.join(table)
+    return tables
+
+
+DECODING_TABLES = _decoding_tables()
+ENCODING_MAPS = {name: codecs.charmap_build(table) for name, table in DECODING_TABLES.items()}
+CODEPAGES = sorted(DECODING_TABLES, key=lambda name: int(name[4:]))
+
+
+def codepage_name(value: str) -> str:
+    """The IBM-nnn name for 'IBM-1047', 'ibm1047', 'cp1047' or '1047'."""
+    digits = value.upper().replace('IBM', '').replace('CP', '').strip('-_ ')
+    name = f"IBM-{int(digits):03d}" if digits.isdigit() else value
+    if name not in DECODING_TABLES:
+        raise ValueError(f"Unsupported code page {value}, use one of {', '.join(CODEPAGES)}")
+    return name
+
+
+def encode(text: str, codepage: str) -> bytes:
+    return codecs.charmap_encode(text, 'replace', ENCODING_MAPS[codepage])[0]
+
+
+def fixed_records(chunks: Iterable[bytes], lrecl: int) -> Iterator[List[bytes]]:
+    """Binary mode FB data: the records of each chunk, LRECL bytes each.
+
+    A record split across chunks is carried over to the next one.
+    """
+    carry = b''
+    for chunk in chunks:
+        data = carry + chunk if carry else chunk
+        end = len(data) - len(data) % lrecl
+        carry = data[end:]
+        if end:
+            yield [data[i:i + lrecl] for i in range(0, end, lrecl)]
+    if carry:
+        yield [carry]
+
+
+def prefixed_records(chunks: Iterable[bytes]) -> Iterator[List[bytes]]:
+    """Record mode data: each record follows a 4-byte big-endian length (in place of the RDW)."""
+    carry = b''
+    for chunk in chunks:
+        data = carry + chunk if carry else chunk
+        records = []
+        pos, size = 0, len(data)
+        while pos + 4 <= size:
+            (length,) = RECORD_PREFIX.unpack_from(data, pos)
+            if pos + 4 + length > size:
+                break
+            records.append(data[pos + 4:pos + 4 + length])
+            pos += 4 + length
+        carry = data[pos:]
+        if records:
+            yield records
+    if carry:
+        raise ValueError(f"Record mode data ends inside a record ({len(carry)} bytes left)")
+
+
+def records_to_text(batches: Iterable[List[bytes]], codepage: str, trim: bool = True) -> Iterator[bytes]:
+    """UTF-8 text with one line per record, a buffer per batch of records.
+
+    trim drops trailing blanks, as z/OSMF text mode does.
+    """
+    table = DECODING_TABLES[codepage]
+    for records in batches:
+        if trim:
+            records = [record.rstrip(EBCDIC_BLANK) for record in records]
+        data = EBCDIC_NEWLINE.join(records) + EBCDIC_NEWLINE
+        yield codecs.charmap_decode(data, 'strict', table)[0].encode('utf-8')
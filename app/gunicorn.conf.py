@@ -0,0 +1,57 @@
+"""Production server: `cd app && gunicorn -c gunicorn.conf.py app:app`.
+
+Workers and threads come from Config (WEB_WORKERS, WEB_THREADS, ...). The
+workers share their caches through SHARED_CACHE, a SQLite file in shared
+memory, so adding workers does not add mainframe calls.
+"""
+import os
+import stat
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+os.environ.setdefault('FLASK_ENV', 'production')
+
+from config import ProductionConfig  # noqa: E402  (reads the environment loaded above)
+
+
+
+def _private_dir(parent, name):
+    """parent/name, created 0700; refuses a directory someone else owns or can enter."""
+    path = os.path.join(parent, name)
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise RuntimeError(f"{path} is not a directory owned by this user; set SHARED_CACHE elsewhere")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+
+_port = ProductionConfig.WEB_BIND.rsplit(':', 1)[-1]
+if 'SHARED_CACHE' not in os.environ:
+    # The cache holds every identity's data sets and spool: keep it out of other users' reach
+    _shm = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    os.environ['SHARED_CACHE'] = os.path.join(_private_dir(_shm, f"mfcc-{os.getuid()}"), f"cache-{_port}.db")
+
+bind = ProductionConfig.WEB_BIND
+workers = ProductionConfig.WEB_WORKERS
+threads = ProductionConfig.WEB_THREADS
+# Threaded workers keep streamed responses (USS find, NDJSON batches) off the heartbeat
+worker_class = 'gthread'
+timeout = ProductionConfig.WEB_TIMEOUT
+graceful_timeout = 30
+# Each worker imports the app itself: warm-up and pool threads do not survive a fork
+preload_app = False
+
+
+def on_starting(server):
+    # Start from an empty shared cache; the warm-up restores the saved snapshot
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(os.environ['SHARED_CACHE'] + suffix)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,420 @@
+import base64
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, deque
+from typing import Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+from shared_store import SharedStore, shared_store
+
+# A fresh snapshot is shared by every viewer instead of re-running `zowe jobs list`
+JOBS_SNAPSHOT_TTL = float(os.environ.get('JOBS_SNAPSHOT_TTL', 5))
+# Versions kept for since= deltas; older clients get a full resync
+JOBS_DELTA_HISTORY = int(os.environ.get('JOBS_DELTA_HISTORY', 200))
+JOBS_PAGE_MAX = int(os.environ.get('JOBS_PAGE_MAX', 1000))
+# Shared snapshots nobody refreshed for this long are dropped from the cross-worker store
+JOBS_SNAPSHOT_KEEP = float(os.environ.get('JOBS_SNAPSHOT_KEEP', 86400))
+
+SORT_FIELDS = {'jobid': 'jobid', 'name': 'jobname', 'jobname': 'jobname', 'owner': 'owner', 'retcode': 'retcode'}
+
+
+class JobSnapshot:
+    """One JES job list as returned by zowe, plus lazily built sort orders."""
+
+    def __init__(self, version: int, jobs: Dict[str, Dict], fetched_at: float):
+        self.version = version
+        self.jobs = jobs
+        self.fetched_at = fetched_at
+        self.status_counts = dict(Counter(job.get('status') or 'UNKNOWN' for job in jobs.values()))
+        self._orders: Dict[str, Tuple[List[tuple], List[Dict]]] = {}
+        self._lock = threading.Lock()
+
+    def ordered(self, field: str) -> Tuple[List[tuple], List[Dict]]:
+        """Sort keys and jobs ascending by (field, jobid), built once per snapshot."""
+        with self._lock:
+            order = self._orders.get(field)
+            if order is None:
+                pairs = sorted(((job.get(field) or '', job['jobid']), job) for job in self.jobs.values())
+                order = self._orders[field] = ([k for k, _ in pairs], [j for _, j in pairs])
+            return order
+
+
+def diff_jobs(previous: Dict[str, Dict], jobs: Dict[str, Dict]) -> Tuple[List[str], List[str], List[str]]:
+    """Job ids added, changed and removed between two job lists."""
+    added = [jobid for jobid in jobs if jobid not in previous]
+    removed = [jobid for jobid in previous if jobid not in jobs]
+    changed = [jobid for jobid, job in jobs.items() if jobid in previous and previous[jobid] != job]
+    return added, changed, removed
+
+
+def shared_key(key: Hashable) -> str:
+    return json.dumps(list(key) if isinstance(key, tuple) else key)
+
+
+class JobSnapshotStore:
+    """Versioned job lists per (owner, prefix) query with a bounded change log.
+
+    Every refresh is diffed against the previous snapshot. When something
+    changed the store assigns a new version and records which jobs were
+    added, changed or removed, so clients can ask for `since=<version>`.
+
+    With a shared store, snapshots, change logs and versions live there so
+    every worker serves the same versions. Only one worker refetches a
+    stale query, and each worker keeps a decoded copy until the version
+    changes.
+    """
+
+    def __init__(self, ttl: float = JOBS_SNAPSHOT_TTL, history: int = JOBS_DELTA_HISTORY,
+                 store: Optional[SharedStore] = None):
+        self.ttl = ttl
+        self.history = history
+        self.store = store
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshots: Dict[Hashable, JobSnapshot] = {}
+        self._changes: Dict[Hashable, deque] = {}
+        self._refresh_locks: Dict[Hashable, threading.Lock] = {}
+        self._listeners: List[Callable] = []
+
+    def add_listener(self, listener: Callable):
+        """Call listener(key, previous, snapshot) whenever a query's job list changes."""
+        self._listeners.append(listener)
+
+    def get(self, key: Hashable) -> Optional[JobSnapshot]:
+        if self.store is not None:
+            return self._sync(key)
+        with self._lock:
+            return self._snapshots.get(key)
+
+    def find_job(self, jobid: str) -> Optional[Dict]:
+        """The job as last seen in any snapshot this worker holds."""
+        with self._lock:
+            for snapshot in self._snapshots.values():
+                job = snapshot.jobs.get(jobid)
+                if job is not None:
+                    return job
+        return None
+
+    def is_fresh(self, key: Hashable) -> bool:
+        snapshot = self.get(key)
+        return snapshot is not None and time.time() - snapshot.fetched_at < self.ttl
+
+    def refresh(self, key: Hashable, fetch: Callable[[], List[Dict]]) -> JobSnapshot:
+        """Return a fresh snapshot, calling fetch() at most once across concurrent callers."""
+        if self.is_fresh(key):
+            return self.get(key)
+        with self._lock:
+            lock = self._refresh_locks.setdefault(key, threading.Lock())
+        with lock:
+            # Another request may have refreshed while we waited
+            if self.is_fresh(key):
+                return self.get(key)
+            if self.store is None:
+                return self.update(key, fetch())
+            # Workers waiting here pick up the snapshot the lease holder publishes
+            with self.store.lease(f"jobs\x00{shared_key(key)}", lambda: self.is_fresh(key)):
+                if self.is_fresh(key):
+                    return self.get(key)
+                return self.update(key, fetch())
+
+    def update(self, key: Hashable, jobs_list: List[Dict]) -> JobSnapshot:
+        jobs = {job['jobid']: job for job in jobs_list if job.get('jobid')}
+        now = time.time()
+        if self.store is not None:
+            return self._update_shared(key, jobs, now)
+        with self._lock:
+            previous = self._snapshots.get(key)
+            if previous is not None:
+                added, changed, removed = diff_jobs(previous.jobs, jobs)
+                if not (added or removed or changed):
+                    previous.fetched_at = now
+                    return previous
+            self._version += 1
+            snapshot = JobSnapshot(self._version, jobs, now)
+            self._snapshots[key] = snapshot
+            if previous is not None:
+                log = self._changes.setdefault(key, deque(maxlen=self.history))
+                log.append((previous.version, snapshot.version, added, changed, removed))
+        self._notify(key, previous, snapshot)
+        return snapshot
+
+    def _update_shared(self, key: Hashable, jobs: Dict[str, Dict], now: float) -> JobSnapshot:
+        skey = shared_key(key)
+        with self.store.transaction():
+            row = self.store.get('job_snapshots', skey)
+            diff = diff_jobs({job['jobid']: job for job in row['jobs']}, jobs) if row is not None else None
+            if diff is None or any(diff):
+                version = self.store.increment('job_version')
+                changes = []
+                if row is not None:
+                    changes = (row['changes'] + [[row['version'], version, *diff]])[-self.history:]
+                row = {"version": version, "jobs": list(jobs.values()), "changes": changes}
+                self.store.set('job_snapshots', skey, row, JOBS_SNAPSHOT_KEEP)
+            self.store.set('job_meta', skey, {"version": row['version'], "fetched_at": now, "jobs": len(jobs)},
+                           JOBS_SNAPSHOT_KEEP)
+        return self._install(key, row, now)
+
+    def _sync(self, key: Hashable) -> Optional[JobSnapshot]:
+        """This worker's copy of the shared snapshot, reloaded when another worker published a newer one."""
+        with self._lock:
+            local = self._snapshots.get(key)
+        skey = shared_key(key)
+        meta = self.store.get('job_meta', skey)
+        if meta is None:
+            return local
+        if local is not None and local.version == meta['version']:
+            local.fetched_at = meta['fetched_at']
+            return local
+        row = self.store.get('job_snapshots', skey)
+        if row is None:
+            return local
+        return self._install(key, row, meta['fetched_at'])
+
+    def _install(self, key: Hashable, row: Dict, fetched_at: float) -> JobSnapshot:
+        with self._lock:
+            previous = self._snapshots.get(key)
+            if previous is not None and previous.version >= row['version']:
+                previous.fetched_at = fetched_at
+                return previous
+            snapshot = JobSnapshot(row['version'], {job['jobid']: job for job in row['jobs']}, fetched_at)
+            self._snapshots[key] = snapshot
+            self._changes[key] = deque((tuple(change) for change in row['changes']), maxlen=self.history)
+            self._version = max(self._version, snapshot.version)
+        # Every worker sees each new version once, so its listeners still fire per worker
+        self._notify(key, previous, snapshot)
+        return snapshot
+
+    def _notify(self, key: Hashable, previous: Optional[JobSnapshot], snapshot: JobSnapshot):
+        for listener in self._listeners:
+            try:
+                listener(key, previous, snapshot)
+            except Exception as e:
+                print(f"Job snapshot listener failed: {e}")
+
+    def expire(self, key: Optional[Hashable] = None):
+        """Force the next request to refetch (e.g. after a purge)."""
+        if self.store is not None:
+            with self.store.transaction():
+                for skey, meta, _ in self.store.items('job_meta'):
+                    if key is None or skey == shared_key(key):
+                        self.store.set('job_meta', skey, dict(meta, fetched_at=0), JOBS_SNAPSHOT_KEEP)
+        with self._lock:
+            for k, snapshot in self._snapshots.items():
+                if key is None or k == key:
+                    snapshot.fetched_at = 0
+
+    def changes_since(self, key: Hashable, version: int) -> Optional[Tuple[JobSnapshot, Dict[str, List[str]]]]:
+        """The current snapshot and the job ids added/changed/removed after `version`.
+
+        Both are read under one lock, so every id is in that snapshot. None if
+        `version` is too old to diff.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            log = list(self._changes.get(key, ()))
+        if snapshot is None or version > snapshot.version:
+            return None
+        if version == snapshot.version:
+            return snapshot, {"added": [], "changed": [], "removed": []}
+        if not log or version < log[0][0]:
+            return None
+
+        state: Dict[str, str] = {}
+        for base, _, added, changed, removed in log:
+            if base < version:
+                continue
+            for jobid in added:
+                state[jobid] = 'changed' if state.get(jobid) == 'removed' else 'added'
+            for jobid in changed:
+                state.setdefault(jobid, 'changed')
+            for jobid in removed:
+                if state.get(jobid) == 'added':
+                    del state[jobid]
+                else:
+                    state[jobid] = 'removed'
+        result = {"added": [], "changed": [], "removed": []}
+        for jobid, kind in state.items():
+            result[kind].append(jobid)
+        return snapshot, result
+
+    def dump(self) -> Dict:
+        if self.store is not None:
+            metas = {skey: meta for skey, meta, _ in self.store.items('job_meta')}
+            return {
+                "version": self.store.counter('job_version'),
+                "snapshots": [[json.loads(skey), row['version'], row['jobs'], metas[skey]['fetched_at']]
+                              for skey, row, _ in self.store.items('job_snapshots') if skey in metas]
+            }
+        with self._lock:
+            return {
+                "version": self._version,
+                "snapshots": [[list(key), s.version, list(s.jobs.values()), s.fetched_at]
+                              for key, s in self._snapshots.items()]
+            }
+
+    def load(self, state: Dict) -> int:
+        """Restore dumped snapshots. Versions continue from the dump, so clients keep
+        sending since= values the store understands; their change logs are gone, so
+        they resync once."""
+        if self.store is not None:
+            self.store.raise_counter('job_version', state.get("version", 0))
+            with self.store.transaction():
+                for key, version, jobs, fetched_at in state.get("snapshots", []):
+                    skey = shared_key(tuple(key))
+                    if self.store.get('job_meta', skey) is None:
+                        self.store.set('job_snapshots', skey, {"version": version, "jobs": jobs, "changes": []},
+                                       JOBS_SNAPSHOT_KEEP)
+                        self.store.set('job_meta', skey, {"version": version, "fetched_at": fetched_at,
+                                                          "jobs": len(jobs)}, JOBS_SNAPSHOT_KEEP)
+            return self.store.count('job_meta')
+        with self._lock:
+            self._version = max(self._version, state.get("version", 0))
+            for key, version, jobs, fetched_at in state.get("snapshots", []):
+                key = tuple(key)
+                if key not in self._snapshots:
+                    self._snapshots[key] = JobSnapshot(
+                        version, {job['jobid']: job for job in jobs if job.get('jobid')}, fetched_at
+                    )
+            return len(self._snapshots)
+
+    def stats(self) -> Dict:
+        if self.store is not None:
+            return {
+                "version": self.store.counter('job_version'),
+                "shared": True,
+                "snapshots": [
+                    {"key": json.loads(skey), "version": meta['version'], "jobs": meta['jobs'],
+                     "age_s": round(time.time() - meta['fetched_at'], 1)}
+                    for skey, meta, _ in self.store.items('job_meta')
+                ]
+            }
+        with self._lock:
+            return {
+                "version": self._version,
+                "snapshots": [
+                    {"key": list(key) if isinstance(key, tuple) else key, "version": s.version,
+                     "jobs": len(s.jobs), "age_s": round(time.time() - s.fetched_at, 1)}
+                    for key, s in self._snapshots.items()
+                ]
+            }
+
+
+job_store = JobSnapshotStore(store=shared_store)
+
+
+def encode_cursor(sort_key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(sort_key)).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, jobid = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (str(value), str(jobid))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def project(job: Dict, fields: Optional[List[str]]) -> Dict:
+    if not fields:
+        return job
+    return {field: job.get(field) for field in fields}
+
+
+def _parse_fields(args: Mapping) -> Optional[List[str]]:
+    raw = (args.get('fields') or '').strip()
+    if not raw:
+        return None
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    # jobid is the identity the client merges deltas on
+    return ['jobid'] + [f for f in fields if f != 'jobid']
+
+
+def _int_arg(args: Mapping, name: str) -> Optional[int]:
+    raw = (args.get(name) or '').strip()
+    if not raw:
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+
+def page(snapshot: JobSnapshot, status: str, sort: str, descending: bool,
+         limit: Optional[int], cursor: Optional[str]) -> Tuple[List[Dict], Optional[str]]:
+    keys, ordered = snapshot.ordered(sort)
+    if descending:
+        start = bisect_left(keys, decode_cursor(cursor)) - 1 if cursor else len(keys) - 1
+        indexes = range(start, -1, -1)
+    else:
+        start = bisect_right(keys, decode_cursor(cursor)) if cursor else 0
+        indexes = range(start, len(keys))
+
+    result = []
+    last_key = None
+    for i in indexes:
+        job = ordered[i]
+        if status and job.get('status') != status:
+            continue
+        if limit is not None and len(result) == limit:
+            # Only hand out a cursor when another matching job exists
+            return result, encode_cursor(last_key)
+        result.append(job)
+        last_key = keys[i]
+    return result, None
+
+
+def jobs_response(store: JobSnapshotStore, key: Hashable, args: Mapping, mock: bool = False) -> Tuple[int, Dict]:
+    """Build the /api/jobs payload from the current snapshot for `key`.
+
+    Shared by the Flask route and the async entry point. Raises ValueError
+    for malformed parameters.
+    """
+    snapshot = store.get(key)
+    status = (args.get('status') or '').strip()
+    if status == 'ALL':
+        status = ''
+    fields = _parse_fields(args)
+    since = _int_arg(args, 'since')
+
+    if since is not None:
+        delta = store.changes_since(key, since)
+        if delta is not None:
+            snapshot, changes = delta
+            jobs = snapshot.jobs
+            # With a status filter, a job that left that status is gone from the client's view
+            hidden = {j for j in changes["added"] + changes["changed"] if status and jobs[j].get('status') != status}
+            return 200, {
+                "delta": True,
+                "version": snapshot.version,
+                "added": [project(jobs[j], fields) for j in changes["added"] if j not in hidden],
+                "changed": [project(jobs[j], fields) for j in changes["changed"] if j not in hidden],
+                "removed": changes["removed"] + sorted(hidden),
+                "counts": snapshot.status_counts,
+                "total": snapshot.status_counts.get(status, 0) if status else len(jobs),
+                "mock": mock
+            }
+
+    sort_name = (args.get('sort') or 'jobid').strip()
+    if sort_name not in SORT_FIELDS:
+        raise ValueError(f"sort must be one of: {', '.join(sorted(SORT_FIELDS))}")
+    descending = (args.get('order') or 'asc').strip().lower() == 'desc'
+    limit = _int_arg(args, 'limit')
+    if limit is not None:
+        limit = max(1, min(limit, JOBS_PAGE_MAX))
+    cursor = (args.get('cursor') or '').strip() or None
+
+    jobs, next_cursor = page(snapshot, status, SORT_FIELDS[sort_name], descending, limit, cursor)
+    body = {
+        "jobs": [project(job, fields) for job in jobs],
+        "version": snapshot.version,
+        "next_cursor": next_cursor,
+        "total": snapshot.status_counts.get(status, 0) if status else len(snapshot.jobs),
+        "counts": snapshot.status_counts,
+        "mock": mock
+    }
+    if since is not None:
+        # The client's version is older than the change log: start over
+        body["resync"] = True
+    return 200, body
@@ -0,0 +1,292 @@
+import os
+import threading
+import time
+from bisect import insort
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from job_snapshots import job_store
+from shared_store import SharedStore, shared_store
+
+# Completions are counted into fixed buckets; rollups add and evict whole buckets
+JOB_STATS_BUCKET_SECONDS = int(os.environ.get('JOB_STATS_BUCKET_SECONDS', 300))
+
+WINDOWS = {'1h': 3600, '24h': 86400, '7d': 7 * 86400}
+DIMENSIONS = ('all', 'owner', 'jobname', 'class')
+SUCCESS_RETCODES = ('CC 0000',)
+
+
+def completion_time(job: Dict) -> Optional[float]:
+    """End time from z/OSMF's exec-ended field, when the system reports it."""
+    ended = job.get('exec-ended')
+    if not ended:
+        return None
+    try:
+        return datetime.fromisoformat(ended.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def is_failure(retcode: Optional[str]) -> bool:
+    return bool(retcode) and retcode not in SUCCESS_RETCODES
+
+
+class Rollup:
+    """Running totals over a sliding window, kept as the sum of its buckets."""
+
+    def __init__(self, seconds: int, bucket_seconds: int):
+        self.seconds = seconds
+        self.bucket_seconds = bucket_seconds
+        self.starts: List[int] = []
+        self.totals: Counter = Counter()
+
+    def evict(self, buckets: Dict[int, Counter], now: float):
+        cutoff = now - self.seconds
+        while self.starts and self.starts[0] + self.bucket_seconds <= cutoff:
+            start = self.starts.pop(0)
+            self.totals.subtract(buckets.get(start, Counter()))
+        # Counter += drops the zero entries left by subtract()
+        self.totals += Counter()
+
+
+class JobStats:
+    """Job completion counts by owner, job name and class with 1h/24h/7d rollups.
+
+    Fed from job list snapshots: a job is counted once, when it is first seen
+    in OUTPUT status. Each completion increments its bucket and every window's
+    running totals, and buckets are subtracted again as they age out, so
+    queries never rescan the job list.
+
+    With a shared store, completions are appended to an event log there
+    (once per job id) and every worker folds new events into its own rollups
+    before answering, so all workers report the same numbers.
+    """
+
+    def __init__(self, bucket_seconds: int = JOB_STATS_BUCKET_SECONDS, store: Optional[SharedStore] = None):
+        self.bucket_seconds = bucket_seconds
+        self.retention = max(WINDOWS.values())
+        self.store = store
+        self._lock = threading.Lock()
+        self._buckets: Dict[int, Counter] = {}
+        self._rollups = {name: Rollup(seconds, bucket_seconds) for name, seconds in WINDOWS.items()}
+        # jobid -> completion time, to count each job once across snapshots
+        self._completed: Dict[str, float] = {}
+        # Key of the last shared event folded in
+        self._seen = ''
+
+    def observe_snapshot(self, key, previous, snapshot):
+        """JobSnapshotStore listener: record jobs that reached OUTPUT."""
+        now = time.time()
+        first = previous is None
+        completions = []
+        with self._lock:
+            for jobid, job in snapshot.jobs.items():
+                if job.get('status') != 'OUTPUT' or jobid in self._completed:
+                    continue
+                ended = completion_time(job)
+                if ended is None and first:
+                    # Finished before this query was first watched, with no end time to place it
+                    self._completed[jobid] = now
+                    continue
+                completions.append((jobid, job, ended or now))
+        self._add(completions, now)
+
+    def record(self, job: Dict, ended: Optional[float] = None):
+        now = time.time()
+        self._add([(job['jobid'], job, ended or now)], now)
+
+    def _add(self, completions: List[Tuple[str, Dict, float]], now: float):
+        if self.store is None:
+            with self._lock:
+                for jobid, job, ended in completions:
+                    if jobid not in self._completed:
+                        self._completed[jobid] = ended
+                        self._apply(self._bucket_start(ended), self._entries(job), now)
+                self._expire(now)
+            return
+        if completions:
+            with self.store.transaction():
+                for jobid, job, ended in completions:
+                    # Every worker sees the same snapshots; the first to log a job wins
+                    if self.store.get('job_stats_completed', jobid) is not None:
+                        continue
+                    self.store.set('job_stats_completed', jobid, ended, self._keep)
+                    self._log(jobid, self._bucket_start(ended), ended, self._entries(job))
+        self._sync(now)
+
+    @property
+    def _keep(self) -> float:
+        return self.retention + self.bucket_seconds
+
+    def _log(self, jobid: Optional[str], start: int, ended: Optional[float], entries: List[list]):
+        seq = self.store.increment('job_stats_seq')
+        self.store.set('job_stats_events', f"{seq:012d}", [jobid, start, ended, entries], self._keep)
+
+    def _sync(self, now: Optional[float] = None):
+        """Fold the shared events this worker has not applied yet into its rollups."""
+        if self.store is None:
+            return
+        now = now or time.time()
+        with self._lock:
+            for key, (jobid, start, ended, entries), _ in self.store.items_after('job_stats_events', self._seen):
+                self._seen = key
+                if jobid is not None:
+                    self._completed[jobid] = ended
+                self._apply(start, entries, now)
+            self._expire(now)
+
+    def _bucket_start(self, ended: float) -> int:
+        return int(ended // self.bucket_seconds) * self.bucket_seconds
+
+    @staticmethod
+    def _entries(job: Dict) -> List[list]:
+        retcode = job.get('retcode') or 'UNKNOWN'
+        return [[dimension, '*' if dimension == 'all' else (job.get(dimension) or 'UNKNOWN'), retcode, 1]
+                for dimension in DIMENSIONS]
+
+    def _apply(self, start: int, entries: List[list], now: float):
+        """Add (dimension, value, retcode, count) entries to a bucket and the windows covering it."""
+        if start + self.bucket_seconds <= now - self.retention:
+            return
+        bucket = self._buckets.get(start)
+        if bucket is None:
+            bucket = self._buckets[start] = Counter()
+        for dimension, value, retcode, count in entries:
+            key = (dimension, value, retcode)
+            bucket[key] += count
+            for rollup in self._rollups.values():
+                if start + self.bucket_seconds > now - rollup.seconds:
+                    rollup.totals[key] += count
+                    if start not in rollup.starts:
+                        insort(rollup.starts, start)
+
+    def _expire(self, now: float):
+        for rollup in self._rollups.values():
+            rollup.evict(self._buckets, now)
+        cutoff = now - self.retention - self.bucket_seconds
+        for start in [s for s in self._buckets if s < cutoff]:
+            del self._buckets[start]
+        for jobid in [j for j, t in self._completed.items() if t < cutoff]:
+            del self._completed[jobid]
+
+    def dump(self) -> Dict:
+        self._sync()
+        with self._lock:
+            return {
+                "buckets": {str(start): [[*key, count] for key, count in bucket.items()]
+                            for start, bucket in self._buckets.items()},
+                "completed": dict(self._completed)
+            }
+
+    def load(self, state: Dict):
+        """Restore dumped buckets and rebuild every window's totals from them."""
+        now = time.time()
+        if self.store is not None:
+            with self.store.transaction():
+                # Only the first worker to restore seeds the shared log
+                if self.store.counter('job_stats_seq') == 0:
+                    for start, entries in state.get("buckets", {}).items():
+                        self._log(None, int(start), None, entries)
+                    for jobid, ended in state.get("completed", {}).items():
+                        self.store.set('job_stats_completed', jobid, ended, self._keep)
+                        self._completed.setdefault(jobid, ended)
+            self._sync(now)
+            return
+        with self._lock:
+            for start, entries in state.get("buckets", {}).items():
+                bucket = self._buckets.setdefault(int(start), Counter())
+                for dimension, value, retcode, count in entries:
+                    bucket[(dimension, value, retcode)] += count
+            for jobid, ended in state.get("completed", {}).items():
+                self._completed.setdefault(jobid, ended)
+            for rollup in self._rollups.values():
+                rollup.starts = sorted(s for s in self._buckets
+                                       if s + self.bucket_seconds > now - rollup.seconds)
+                rollup.totals = Counter()
+                for start in rollup.starts:
+                    rollup.totals.update(self._buckets[start])
+            self._expire(now)
+
+    def query(self, window: str = '24h', group_by: str = 'all', top: int = 20) -> Dict:
+        if window not in WINDOWS:
+            raise ValueError(f"window must be one of: {', '.join(WINDOWS)}")
+        if group_by not in DIMENSIONS:
+            raise ValueError(f"group_by must be one of: {', '.join(DIMENSIONS)}")
+        self._sync()
+        with self._lock:
+            self._expire(time.time())
+            totals = dict(self._rollups[window].totals)
+
+        groups: Dict[str, Dict] = {}
+        for (dimension, value, retcode), count in totals.items():
+            if dimension != group_by or count <= 0:
+                continue
+            group = groups.setdefault(value, {"key": value, "count": 0, "failed": 0, "rc": {}})
+            group["count"] += count
+            group["rc"][retcode] = group["rc"].get(retcode, 0) + count
+            if is_failure(retcode):
+                group["failed"] += count
+        for group in groups.values():
+            group["failure_rate"] = round(group["failed"] / group["count"] * 100, 1)
+
+        ranked = sorted(groups.values(), key=lambda g: (-g["count"], g["key"]))
+        overall = self._overall(totals)
+        return {
+            "window": window,
+            "group_by": group_by,
+            **overall,
+            "groups": ranked[:top] if group_by != 'all' else []
+        }
+
+    def _overall(self, totals: Dict) -> Dict:
+        rc: Dict[str, int] = {}
+        for (dimension, _, retcode), count in totals.items():
+            if dimension == 'all' and count > 0:
+                rc[retcode] = rc.get(retcode, 0) + count
+        count = sum(rc.values())
+        failed = sum(n for retcode, n in rc.items() if is_failure(retcode))
+        return {
+            "count": count,
+            "failed": failed,
+            "failure_rate": round(failed / count * 100, 1) if count else 0.0,
+            "rc": rc
+        }
+
+    def series(self, window: str = '24h', points: int = 24) -> List[Dict]:
+        """Completions and failures per interval across the window, oldest first."""
+        if window not in WINDOWS:
+            raise ValueError(f"window must be one of: {', '.join(WINDOWS)}")
+        seconds = WINDOWS[window]
+        step = max(self.bucket_seconds, seconds // max(1, points))
+        now = time.time()
+        end = (int(now // self.bucket_seconds) + 1) * self.bucket_seconds
+        start = end - (seconds // step) * step
+        result = [{"start": start + i * step, "count": 0, "failed": 0} for i in range(seconds // step)]
+        self._sync()
+        with self._lock:
+            for bucket_start, bucket in self._buckets.items():
+                if bucket_start < start or bucket_start >= end:
+                    continue
+                slot = result[(bucket_start - start) // step]
+                for (dimension, _, retcode), count in bucket.items():
+                    if dimension != 'all':
+                        continue
+                    slot["count"] += count
+                    if is_failure(retcode):
+                        slot["failed"] += count
+        return result
+
+    def count_since(self, since: float) -> int:
+        """Completions at or after `since` (bucket granularity)."""
+        floor = int(since // self.bucket_seconds) * self.bucket_seconds
+        self._sync()
+        with self._lock:
+            return sum(
+                count
+                for start, bucket in self._buckets.items() if start >= floor
+                for (dimension, _, _), count in bucket.items() if dimension == 'all'
+            )
+
+
+job_stats = JobStats(store=shared_store)
+job_store.add_listener(job_stats.observe_snapshot)
@@ -0,0 +1,217 @@
+"""Server-side watches on individual jobs.
+
+Every client waiting for a job (`/api/jobs/<jobid>/wait`) shares one
+poller thread per job and identity. The poller asks for the job's status
+quickly at first and backs off while nothing changes, so a long-running
+job costs few zowe calls. Each status change wakes all of the job's
+waiters at once.
+"""
+import contextvars
+import os
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterator, List, Optional
+from zowe_identity import Identity, set_identity
+
+# Poll interval: starts at MIN, grows by BACKOFF per unchanged poll up to MAX.
+# Between polls the caches are checked every MIN seconds.
+JOB_WATCH_MIN_INTERVAL = float(os.environ.get('JOB_WATCH_MIN_INTERVAL', 2))
+JOB_WATCH_MAX_INTERVAL = float(os.environ.get('JOB_WATCH_MAX_INTERVAL', 30))
+JOB_WATCH_BACKOFF = float(os.environ.get('JOB_WATCH_BACKOFF', 1.5))
+# A poller nobody has waited on for this long stops
+JOB_WATCH_IDLE = float(os.environ.get('JOB_WATCH_IDLE', 60))
+# Finished watches answer late waiters from memory for this long
+JOB_WATCH_KEEP = float(os.environ.get('JOB_WATCH_KEEP', 300))
+JOB_WATCH_MAX = int(os.environ.get('JOB_WATCH_MAX', 200))
+JOB_WATCH_MAX_FAILURES = int(os.environ.get('JOB_WATCH_MAX_FAILURES', 3))
+# /api/jobs/<jobid>/wait: long-poll hold time (default and cap), SSE heartbeat and lifetime
+JOB_WAIT_TIMEOUT = float(os.environ.get('JOB_WAIT_TIMEOUT', 25))
+JOB_WAIT_MAX = float(os.environ.get('JOB_WAIT_MAX', 60))
+JOB_EVENTS_HEARTBEAT = float(os.environ.get('JOB_EVENTS_HEARTBEAT', 15))
+JOB_EVENTS_MAX = float(os.environ.get('JOB_EVENTS_MAX', 900))
+
+FINISHED_STATUSES = {'OUTPUT'}
+
+
+class WatchLimitError(Exception):
+    """JOB_WATCH_MAX jobs are already being watched."""
+
+
+class JobWatch:
+    """One job's poller plus the clients waiting on it.
+
+    fetch() returns the job's current status entry (one zowe call at most);
+    peek() returns it only if the caches already show the job finished.
+    """
+
+    def __init__(self, jobid: str, fetch: Callable[[], Dict], peek: Callable[[], Optional[Dict]],
+                 identity: Identity):
+        self.jobid = jobid
+        self.fetch = fetch
+        self.peek = peek
+        self.identity = identity
+        self.job: Optional[Dict] = None
+        self.done = False
+        self.stopped = False
+        self.error: Optional[str] = None
+        self.polls = 0
+        self.interval = JOB_WATCH_MIN_INTERVAL
+        self.waiters = 0
+        self.last_wait = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self._cond = threading.Condition()
+
+    @property
+    def status(self) -> Optional[str]:
+        return self.job.get('status') if self.job else None
+
+    def run(self):
+        # Runs in an empty context: the poller outlives the request that started it
+        set_identity(self.identity)
+        failures = 0
+        while True:
+            try:
+                job = self.fetch()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                print(f"Job watch poll for {self.jobid} failed ({failures}/{JOB_WATCH_MAX_FAILURES}): {e}")
+                if failures >= JOB_WATCH_MAX_FAILURES:
+                    self._finish(error=str(e))
+                    return
+                job = None
+            if job is not None and self._publish(job):
+                return
+            with self._cond:
+                if self.waiters == 0 and time.monotonic() - self.last_wait >= JOB_WATCH_IDLE:
+                    self.stopped = True
+                    return
+            if self._sleep():
+                return
+
+    def _sleep(self) -> bool:
+        """Wait out the interval; True if peek() saw the job finish meanwhile."""
+        deadline = time.monotonic() + self.interval
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, JOB_WATCH_MIN_INTERVAL))
+            try:
+                job = self.peek()
+            except Exception as e:
+                print(f"Job watch peek for {self.jobid} failed: {e}")
+                job = None
+            if job is not None and self._publish(job):
+                return True
+
+    def _publish(self, job: Dict) -> bool:
+        """Record a poll result and wake waiters on a change; True once the job finished."""
+        with self._cond:
+            self.polls += 1
+            changed = self.status != job.get('status')
+            self.job = job
+            # A status change (e.g. the job started) resets the backoff
+            self.interval = JOB_WATCH_MIN_INTERVAL if changed else min(
+                self.interval * JOB_WATCH_BACKOFF, JOB_WATCH_MAX_INTERVAL)
+            if job.get('status') in FINISHED_STATUSES:
+                self.done = True
+                self.finished_at = time.monotonic()
+            if changed or self.done:
+                self._cond.notify_all()
+            return self.done
+
+    def _finish(self, error: str):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self.finished_at = time.monotonic()
+            self._cond.notify_all()
+
+    def _ready(self, status: Optional[str]) -> bool:
+        if self.done:
+            return True
+        # With a known status, any other status is news; without one only the end is
+        return status is not None and self.job is not None and self.status != status
+
+    def wait(self, timeout: float, status: Optional[str] = None) -> Dict:
+        """Block until the job finished, or its status differs from `status`, or timeout."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self.waiters += 1
+            try:
+                while not self._ready(status):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                return self.state()
+            finally:
+                self.waiters -= 1
+                self.last_wait = time.monotonic()
+
+    def events(self, heartbeat: float, max_duration: float) -> Iterator[Optional[Dict]]:
+        """Yield the state on every status change until the job finished; None as a heartbeat."""
+        deadline = time.monotonic() + max_duration
+        status = ''  # Never a real status: the first poll result is sent right away
+        while time.monotonic() < deadline:
+            state = self.wait(min(heartbeat, max(0.0, deadline - time.monotonic())), status)
+            if state["status"] != status or state["done"]:
+                status = state["status"]
+                yield state
+                if state["done"]:
+                    return
+            else:
+                yield None
+
+    def state(self) -> Dict:
+        job = self.job or {}
+        return {
+            "jobid": job.get('jobid', self.jobid),
+            "jobname": job.get('jobname'),
+            "status": self.status,
+            "retcode": job.get('retcode'),
+            "done": self.done,
+            "error": self.error,
+            "polls": self.polls
+        }
+
+
+class JobWatcher:
+    """The running JobWatch per (identity, jobid)."""
+
+    def __init__(self, max_watches: int = JOB_WATCH_MAX):
+        self.max_watches = max_watches
+        self._watches: Dict[Hashable, JobWatch] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, key: Hashable, jobid: str, fetch: Callable[[], Dict],
+              peek: Callable[[], Optional[Dict]], identity: Identity) -> JobWatch:
+        """The watch for key, starting a poller if none is running."""
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            watch = self._watches.get(key)
+            if watch is not None and not watch.stopped:
+                watch.last_wait = now
+                return watch
+            if len(self._watches) >= self.max_watches:
+                raise WatchLimitError(f"Already watching {len(self._watches)} jobs")
+            watch = self._watches[key] = JobWatch(jobid, fetch, peek, identity)
+        threading.Thread(target=contextvars.Context().run, args=(watch.run,),
+                         name=f"job-watch-{jobid}", daemon=True).start()
+        return watch
+
+    def _prune(self, now: float):
+        for key, watch in list(self._watches.items()):
+            # A failed watch is dropped at once, so the next waiter starts over
+            if watch.stopped or watch.error or (watch.done and now - watch.finished_at >= JOB_WATCH_KEEP):
+                del self._watches[key]
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            watches = list(self._watches.values())
+        return [dict(w.state(), waiters=w.waiters, interval_s=round(w.interval, 1)) for w in watches]
+
+
+job_watcher = JobWatcher()
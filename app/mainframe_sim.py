@@ -0,0 +1,812 @@
+import fnmatch
+import hashlib
+import json
+import os
+import random
+import re
+import shlex
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from ebcdic import EBCDIC_BLANK, RECORD_PREFIX, encode
+from zowe_backend import ZoweBackend, ZoweResult
+from metrics import command_family
+
+SIM_SEED = int(os.environ.get('SIM_SEED', 42))
+SIM_JOBS = int(os.environ.get('SIM_JOBS', 50000))
+SIM_DATASETS = int(os.environ.get('SIM_DATASETS', 20000))
+SIM_USERS = int(os.environ.get('SIM_USERS', 50))
+SIM_MEMBERS_MAX = int(os.environ.get('SIM_MEMBERS_MAX', 5000))
+SIM_USS_DEPTH = int(os.environ.get('SIM_USS_DEPTH', 8))
+SIM_USS_FANOUT = int(os.environ.get('SIM_USS_FANOUT', 12))
+SIM_SPOOL_KB = int(os.environ.get('SIM_SPOOL_KB', 2048))
+SIM_TIME_SCALE = float(os.environ.get('SIM_TIME_SCALE', 1.0))
+SIM_LATENCY_MS = float(os.environ.get('SIM_LATENCY_MS', 0))
+
+JOB_PREFIXES = ['PAYROLL', 'COMPILE', 'SMFDUMPS', 'BACKUP', 'DB2LOAD', 'CICSREF', 'NIGHTLY', 'REPORT', 'SORTX', 'ASMBLD']
+PROGRAMS = ['IEFBR14', 'IEBGENER', 'SORT', 'IGYCRCTL', 'IEWL', 'IKJEFT01', 'IDCAMS', 'ADRDSSU', 'DFSRRC00', 'IFASMFDP']
+OUTCOMES = [
+    ('CC 0000', 70), ('CC 0004', 12), ('CC 0008', 6), ('CC 0012', 2),
+    ('ABEND S0C7', 3), ('ABEND S806', 2), ('ABEND U4038', 2), ('JCL ERROR', 3)
+]
+LLQS = ['JCL', 'COBOL', 'COPYLIB', 'REXX', 'PROCLIB', 'LOAD', 'DATA', 'LISTING', 'SMF', 'EXTRACT', 'BACKUP', 'PARMLIB']
+PDS_LLQS = {'JCL', 'COBOL', 'COPYLIB', 'REXX', 'PROCLIB', 'LOAD', 'PARMLIB'}
+USS_DIRS = ['src', 'data', 'logs', 'scripts', 'bin', 'lib', 'config', 'archive', 'tmp', 'build']
+USS_EXTS = ['.sh', '.rexx', '.py', '.jcl', '.txt', '.log', '.json', '.cbl', '.dat']
+WEEK = 7 * 24 * 3600
+BOOLEAN_FLAGS = {'rfj', 'attributes', 'for-sure', 'recursive', 'binary', 'record', 'wait-for-output', 'wait-for-active', 'exec-data'}
+
+
+def _rng(*parts) -> random.Random:
+    digest = hashlib.sha256(':'.join(str(p) for p in parts).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def _weighted(rng: random.Random, choices) -> str:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _unquote(value: str) -> str:
+    return value.strip().strip('"').strip("'")
+
+
+def parse_args(args: List[str]) -> Tuple[List[str], Dict[str, object]]:
+    """Split zowe arguments into positional words and --options."""
+    positional, options = [], {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith('--'):
+            name = arg[2:]
+            if name not in BOOLEAN_FLAGS and i + 1 < len(args):
+                options[name] = args[i + 1]
+                i += 1
+            else:
+                options[name] = True
+        elif not arg.startswith('-'):
+            positional.append(arg)
+        i += 1
+    return positional, options
+
+
+def _parse_range(spec: str) -> Tuple[int, Optional[int]]:
+    """z/OSMF record range "SSS,NNN" (start, count) or "SSS-EEE" (start, end) -> (start, count)."""
+    spec = _unquote(spec)
+    if ',' in spec:
+        start, count = spec.split(',', 1)
+        return int(start), int(count)
+    start, _, end = spec.partition('-')
+    return int(start), (int(end) - int(start) + 1) if end else None
+
+
+def _split_dsn(spec: str) -> Tuple[str, Optional[str]]:
+    spec = _unquote(spec).upper()
+    if spec.endswith(')') and '(' in spec:
+        name, member = spec[:-1].split('(', 1)
+        return name, member
+    return spec, None
+
+
+class MainframeSimulator(ZoweBackend):
+    """Deterministic, stateful stand-in for a z/OS system reached through Zowe.
+
+    The job queue, catalog and USS tree are generated from a seed at the
+    configured scale. PDS directories, USS directories and spool files are
+    built lazily on first access, so a 50k-job / 20k-data-set system costs
+    little until it is browsed. Jobs move INPUT -> ACTIVE -> OUTPUT as the
+    simulated clock advances, and every mutation (save, delete, purge,
+    mkdir) shows up in later reads.
+    """
+
+    name = 'simulator'
+
+    def __init__(self, seed: int = SIM_SEED, jobs: int = SIM_JOBS, datasets: int = SIM_DATASETS,
+                 users: int = SIM_USERS, user: Optional[str] = None, time_scale: float = SIM_TIME_SCALE,
+                 latency_ms: float = SIM_LATENCY_MS):
+        self.seed = seed
+        self.time_scale = time_scale
+        self.latency_ms = latency_ms
+        self.started = time.time()
+        self.user = (user or os.environ.get('ZOS_USER') or 'IBMUSER').upper()
+        self.users = [self.user] + [f"USER{i:02d}" for i in range(1, max(1, users))]
+        self._lock = threading.RLock()
+
+        self.jobs = self._generate_jobs(jobs)
+        self.purged = set()
+        self.datasets = self._generate_datasets(datasets)
+        self.member_overlay: Dict[str, Dict[str, Optional[str]]] = {}
+        # ISPF statistics of members written through the simulator
+        self.member_stats: Dict[str, Dict[str, Dict]] = {}
+        self.content_overlay: Dict[str, str] = {}
+        self.uss_files: Dict[str, str] = {}
+        self.uss_dirs = set()
+        self.uss_deleted = set()
+
+    # Clock
+
+    def now(self) -> float:
+        """Seconds since the simulator started, in simulated time."""
+        return (time.time() - self.started) * self.time_scale
+
+    # Jobs
+
+    def _generate_jobs(self, count: int) -> Dict[str, Dict]:
+        rng = random.Random(self.seed)
+        jobs = {}
+        for i in range(count):
+            jobid = f"JOB{i + 1:05d}" if i < 99999 else f"J{i + 1:07d}"
+            owner = rng.choice(self.users)
+            # Most jobs finished during the last week; some are queued for the next hour
+            submitted = rng.uniform(-WEEK, 3600)
+            duration = min(4 * 3600, rng.lognormvariate(4, 1.2))
+            jobs[jobid] = {
+                "jobid": jobid,
+                "jobname": f"{rng.choice(JOB_PREFIXES)[:6]}{rng.randint(0, 99):02d}",
+                "owner": owner,
+                "class": _weighted(rng, [('A', 50), ('B', 20), ('C', 15), ('S', 10), ('X', 5)]),
+                "submitted": submitted,
+                "duration": duration,
+                "outcome": _weighted(rng, OUTCOMES),
+                "steps": rng.randint(1, 8)
+            }
+        return jobs
+
+    def job_view(self, job: Dict) -> Dict:
+        t = self.now()
+        if t < job["submitted"]:
+            status, retcode, phase = "INPUT", None, "Job is queued for execution"
+        elif t < job["submitted"] + job["duration"]:
+            status, retcode, phase = "ACTIVE", None, "Job is actively executing"
+        else:
+            status, retcode, phase = "OUTPUT", job["outcome"], "Job is on the hard copy queue"
+        started = job["submitted"] + min(5.0, job["duration"] / 10)
+        return {
+            "jobid": job["jobid"],
+            "jobname": job["jobname"],
+            "owner": job["owner"],
+            "status": status,
+            "retcode": retcode,
+            "class": job["class"],
+            "subsystem": "JES2",
+            "type": "JOB",
+            "phase-name": phase,
+            "exec-submitted": self._timestamp(job["submitted"]) if status != "INPUT" else None,
+            "exec-started": self._timestamp(started) if status != "INPUT" else None,
+            "exec-ended": self._timestamp(job["submitted"] + job["duration"]) if status == "OUTPUT" else None
+        }
+
+    def _timestamp(self, sim_seconds: float) -> str:
+        # z/OSMF style: 2024-01-15T10:00:00.000Z
+        moment = datetime.fromtimestamp(self.started + sim_seconds, timezone.utc)
+        return moment.strftime('%Y-%m-%dT%H:%M:%S.') + f"{moment.microsecond // 1000:03d}Z"
+
+    def _job(self, jobid: str) -> Optional[Dict]:
+        job = self.jobs.get(jobid.upper())
+        if job is None or job["jobid"] in self.purged:
+            return None
+        return job
+
+    def _job_steps(self, job: Dict) -> List[Dict]:
+        rng = _rng(self.seed, job["jobid"], 'steps')
+        steps = []
+        final = job["outcome"]
+        for n in range(job["steps"]):
+            last = n == job["steps"] - 1
+            if last:
+                rc = final
+            else:
+                rc = _weighted(rng, [('CC 0000', 85), ('CC 0004', 15)])
+            steps.append({
+                "stepname": f"STEP{n + 1:02d}",
+                "procstep": rng.choice([None, None, None, 'COMPILE', 'LKED', 'GO']),
+                "program": rng.choice(PROGRAMS),
+                "retcode": rc,
+                "cpu": round(rng.uniform(0.01, 30), 2),
+                "elapsed": round(job["duration"] / job["steps"], 2)
+            })
+        return steps
+
+    def _spool_files(self, job: Dict) -> List[Dict]:
+        files = [
+            {"id": 2, "ddname": "JESMSGLG", "stepname": "JES2", "procstep": None},
+            {"id": 3, "ddname": "JESJCL", "stepname": "JES2", "procstep": None},
+            {"id": 4, "ddname": "JESYSMSG", "stepname": "JES2", "procstep": None},
+        ]
+        for n, step in enumerate(self._job_steps(job)):
+            files.append({"id": 101 + n, "ddname": "SYSPRINT", "stepname": step["stepname"], "procstep": step["procstep"]})
+        for f in files:
+            f["jobid"] = job["jobid"]
+            f["jobname"] = job["jobname"]
+        return files
+
+    def _spool_content(self, job: Dict, spool_id: int) -> Optional[str]:
+        view = self.job_view(job)
+        steps = self._job_steps(job) if view["status"] == "OUTPUT" else []
+        name, jobid = job["jobname"], job["jobid"]
+        if spool_id == 2:
+            lines = [
+                "                         J E S 2  J O B  L O G  --  S Y S T E M  S 0 W 1  --  N O D E  N1",
+                f" 10.00.00 {jobid} ---- SIMULATED ----",
+                f" 10.00.00 {jobid}  IRR010I  USERID {job['owner']} IS ASSIGNED TO THIS JOB.",
+                f" 10.00.00 {jobid}  $HASP373 {name} STARTED - INIT 1    - CLASS {job['class']}        - SYS S0W1",
+                f" 10.00.00 {jobid}  -JOBNAME  STEPNAME PROCSTEP    RC   EXCP    CPU    SRB  CLOCK   SERV",
+            ]
+            for step in steps:
+                rc = step["retcode"].replace("CC ", "") if step["retcode"].startswith("CC") else step["retcode"].split()[-1]
+                lines.append(
+                    f" 10.00.01 {jobid}  -{name:8} {step['stepname']:8} {(step['procstep'] or ''):8} {rc:>6}"
+                    f"    120 {step['cpu'] / 60:6.2f}    .00 {step['elapsed'] / 60:6.1f}   1234"
+                )
+            if view["status"] == "OUTPUT":
+                lines.append(f" 10.00.02 {jobid}  $HASP395 {name} ENDED - RC={view['retcode']}")
+            return '\n'.join(lines) + '\n'
+        if spool_id == 3:
+            lines = [f"        1 //{name:8} JOB (ACCT),'SIMULATED',CLASS={job['class']},MSGCLASS=H"]
+            for n, step in enumerate(self._job_steps(job), start=2):
+                lines.append(f"        {n} //{step['stepname']:8} EXEC PGM={step['program']}")
+            return '\n'.join(lines) + '\n'
+        if spool_id == 4:
+            lines = []
+            for step in steps:
+                qualified = f"{step['stepname']}" + (f" {step['procstep']}" if step['procstep'] else "")
+                if step["retcode"].startswith("ABEND"):
+                    code = step["retcode"].split()[-1]
+                    lines.append(f"IEF450I {name} {qualified} - ABEND={code} U0000 REASON=00000000")
+                    lines.append(f"IEF472I {name} {qualified} - COMPLETION CODE - SYSTEM={code[1:]} USER=0000 REASON=00000000")
+                elif step["retcode"] == "JCL ERROR":
+                    lines.append(f"IEF453I {name} - JOB FAILED - JCL ERROR")
+                    break
+                else:
+                    lines.append(f"IEF142I {name} {qualified} - STEP WAS EXECUTED - COND CODE {step['retcode'][3:]}")
+                lines.append(f"IEF373I STEP/{step['stepname']:8}/START 2024001.1000")
+                lines.append(f"IEF032I STEP/{step['stepname']:8}/STOP  2024001.1000")
+                lines.append(f"        CPU:     0 HR  00 MIN  {step['cpu']:05.2f} SEC    SRB:     0 HR  00 MIN  00.00 SEC")
+            return '\n'.join(lines) + '\n'
+        steps_all = self._job_steps(job)
+        index = spool_id - 101
+        if 0 <= index < len(steps_all):
+            step = steps_all[index]
+            header = f"1{step['program']} OUTPUT FOR {name}.{step['stepname']}\n"
+            line = f" {step['program']} PROCESSING RECORD  {'X' * 60}\n"
+            return header + line * max(1, (SIM_SPOOL_KB * 1024) // len(line))
+        return None
+
+    # Data sets
+
+    def _generate_datasets(self, count: int) -> Dict[str, Dict]:
+        rng = random.Random(self.seed + 1)
+        datasets = {}
+        owners = self.users
+        i = 0
+        while len(datasets) < count:
+            hlq = owners[i % len(owners)]
+            middle = rng.choice(['PROD', 'TEST', 'DEV', 'SRC', 'WORK', 'ARCH', 'SYS'])
+            llq = rng.choice(LLQS)
+            name = f"{hlq}.{middle}{rng.randint(0, 999):03d}.{llq}"
+            i += 1
+            if name in datasets:
+                continue
+            pds = llq in PDS_LLQS
+            datasets[name] = {
+                "name": name,
+                "dsorg": "PO" if pds else "PS",
+                "recfm": "VB" if llq in ('SMF', 'LISTING') else "FB",
+                "lrecl": 133 if llq == 'LISTING' else (32756 if llq == 'SMF' else 80),
+                # Skewed directory sizes: most PDSes are small, a few are huge
+                "members": min(SIM_MEMBERS_MAX, int(rng.paretovariate(1.2) * 10)) if pds else 0,
+                "records": 0 if pds else int(rng.paretovariate(1.1) * 200)
+            }
+        return datasets
+
+    def _members(self, dsname: str) -> Dict[str, Dict]:
+        ds = self.datasets.get(dsname)
+        if ds is None or ds["dsorg"] != "PO":
+            return {}
+        members = dict(self._base_members(dsname, ds["members"]))
+        for name, content in self.member_overlay.get(dsname, {}).items():
+            if content is None:
+                members.pop(name, None)
+            else:
+                members[name] = self.member_stats[dsname][name]
+        return members
+
+    def _touch_member(self, dsname: str, member: str, content: str):
+        """ISPF statistics after a save: today's change date and the next version.mod."""
+        previous = self._members(dsname).get(member)
+        lines = len(content.splitlines())
+        self.member_stats.setdefault(dsname, {})[member] = {
+            "vers": previous["vers"] if previous else 1,
+            "mod": min(previous["mod"] + 1, 99) if previous else 0,
+            "c4date": previous["c4date"] if previous else time.strftime("%Y/%m/%d"),
+            "m4date": time.strftime("%Y/%m/%d"),
+            "mtime": time.strftime("%H:%M"),
+            "msec": time.strftime("%S"),
+            "cnorc": lines,
+            "inorc": previous["inorc"] if previous else lines,
+            "mnorc": 0,
+            "user": self.user,
+            "sclm": "N"
+        }
+
+    @lru_cache(maxsize=1024)
+    def _base_members(self, dsname: str, count: int) -> Tuple[Tuple[str, Dict], ...]:
+        rng = _rng(self.seed, dsname, 'members')
+        prefix = dsname.split('.')[-1][:3]
+        result = []
+        for n in range(count):
+            # z/OSMF's ISPF statistics fields
+            created = f"20{rng.randint(18, 24)}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}"
+            modified = f"2025/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}"
+            lines = rng.randint(10, 400)
+            result.append((f"{prefix}{n:05d}", {
+                "vers": 1,
+                "mod": rng.randint(0, 40),
+                "c4date": created,
+                "m4date": modified,
+                "mtime": f"{rng.randint(6, 19):02d}:{rng.randint(0, 59):02d}",
+                "msec": f"{rng.randint(0, 59):02d}",
+                "cnorc": lines,
+                "inorc": lines,
+                "mnorc": 0,
+                "user": rng.choice(self.users),
+                "sclm": "N"
+            }))
+        return tuple(result)
+
+    def _member_content(self, dsname: str, member: str) -> str:
+        llq = dsname.split('.')[-1]
+        rng = _rng(self.seed, dsname, member)
+        if llq in ('JCL', 'PROCLIB'):
+            lines = [f"//{member:8} JOB (ACCT),'GENERATED',CLASS=A,MSGCLASS=H"]
+            for n in range(rng.randint(1, 12)):
+                lines.append(f"//STEP{n + 1:02d}   EXEC PGM={rng.choice(PROGRAMS)}")
+                lines.append("//SYSPRINT DD SYSOUT=*")
+                lines.append(f"//SYSIN    DD DSN={rng.choice(list(self.datasets))},DISP=SHR")
+            return '\n'.join(lines) + '\n'
+        if llq in ('COBOL', 'COPYLIB'):
+            lines = [
+                "       IDENTIFICATION DIVISION.",
+                f"       PROGRAM-ID. {member}.",
+                "       DATA DIVISION.",
+                "       WORKING-STORAGE SECTION.",
+            ]
+            lines += [f"       01 WS-FIELD-{n:03d} PIC X({rng.randint(1, 80)})." for n in range(rng.randint(5, 60))]
+            lines.append("       PROCEDURE DIVISION.")
+            for p in range(rng.randint(3, 40)):
+                lines.append(f"       PARA-{p:03d}.")
+                lines += [f"           MOVE WS-FIELD-{rng.randint(0, 4):03d} TO WS-FIELD-{rng.randint(0, 4):03d}." for _ in range(rng.randint(1, 15))]
+            lines.append("           STOP RUN.")
+            return '\n'.join(lines) + '\n'
+        if llq == 'REXX':
+            return f"/* REXX {member} */\nsay 'Hello from {member}'\ncall sub\nexit 0\nsub: procedure\n  return\n"
+        return '\n'.join(f"{member} PARM{n:03d}=VALUE{rng.randint(0, 999)}" for n in range(rng.randint(1, 40))) + '\n'
+
+    def _sequential_records(self, ds: Dict, start: int = 0, count: Optional[int] = None) -> Iterator[str]:
+        rng = _rng(self.seed, ds["name"], 'records')
+        width = min(ds["lrecl"], 200)
+        pool = [''.join(rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 ') for _ in range(width - 9))
+                for _ in range(min(ds["records"], 64))]
+        stop = ds["records"] if count is None else min(ds["records"], start + count)
+        # Repeat a small pool of generated records so huge data sets stay cheap to produce
+        for n in range(start, stop):
+            yield f"{n:08d} {pool[n % len(pool)]}"
+
+    def _sequential_content(self, ds: Dict) -> str:
+        return ''.join(f"{record}\n" for record in self._sequential_records(ds))
+
+    def _attributes(self, ds: Dict) -> Dict:
+        """z/OSMF-style catalog attributes, with space sized to the generated records."""
+        blksize = 27998 if ds["recfm"] == 'VB' else (27920 // ds["lrecl"]) * ds["lrecl"]
+        used_tracks = max(1, -(-ds["records"] * ds["lrecl"] // 55996)) if ds["dsorg"] == 'PS' else \
+            max(1, ds["members"] // 4)
+        allocated = max(15, used_tracks + used_tracks // 4)
+        return {
+            "dsname": ds["name"],
+            "dsorg": ds["dsorg"],
+            "recfm": ds["recfm"],
+            "lrecl": str(ds["lrecl"]),
+            "blksz": str(blksize),
+            "dev": "3390",
+            "vol": f"SIM{zlib.crc32(ds['name'].encode()) % 1000:03d}",
+            "spacu": "TRACKS",
+            "sizex": str(allocated),
+            "used": str(used_tracks * 100 // allocated),
+            "extx": "1"
+        }
+
+    # USS
+
+    def _normalize(self, path: str) -> str:
+        path = '/' + '/'.join(p for p in _unquote(path).split('/') if p)
+        return path
+
+    @lru_cache(maxsize=8192)
+    def _base_children(self, path: str) -> Tuple[Tuple[str, bool], ...]:
+        if path == '/':
+            return (('u', True), ('tmp', True), ('etc', True), ('var', True))
+        if path == '/u':
+            return tuple((user.lower(), True) for user in self.users)
+        depth = path.count('/')
+        rng = _rng(self.seed, path, 'uss')
+        entries = []
+        count = rng.randint(max(1, SIM_USS_FANOUT // 2), SIM_USS_FANOUT * 2)
+        for n in range(count):
+            is_dir = depth < SIM_USS_DEPTH and rng.random() < 0.3
+            if is_dir:
+                entries.append((f"{rng.choice(USS_DIRS)}{n}", True))
+            else:
+                entries.append((f"file{n}{rng.choice(USS_EXTS)}", False))
+        return tuple(entries)
+
+    def _children(self, path: str) -> Dict[str, bool]:
+        children = {}
+        # Directories created through mkdir start out empty
+        base = () if path in self.uss_dirs else self._base_children(path)
+        for name, is_dir in base:
+            child = f"{path.rstrip('/')}/{name}"
+            if not self._deleted(child):
+                children[name] = is_dir
+        prefix = path.rstrip('/') + '/'
+        for created in self.uss_dirs:
+            if created.startswith(prefix) and '/' not in created[len(prefix):]:
+                children[created[len(prefix):]] = True
+        for created in self.uss_files:
+            if created.startswith(prefix) and '/' not in created[len(prefix):]:
+                children[created[len(prefix):]] = False
+        return children
+
+    def _deleted(self, path: str) -> bool:
+        return any(path == d or path.startswith(d + '/') for d in self.uss_deleted)
+
+    def _lookup(self, path: str) -> Optional[str]:
+        if path == '/':
+            return 'dir'
+        if path in self.uss_dirs:
+            return 'dir'
+        if path in self.uss_files:
+            return 'file'
+        parent, _, name = path.rpartition('/')
+        parent = parent or '/'
+        if self._lookup(parent) != 'dir' or self._deleted(path):
+            return None
+        for child, is_dir in self._base_children(parent):
+            if child == name:
+                return 'dir' if is_dir else 'file'
+        return None
+
+    def _uss_stat(self, path: str, is_dir: bool) -> Tuple[int, int]:
+        """(size in bytes, age in days) for find's -size/-mtime tests."""
+        rng = _rng(self.seed, path, 'stat')
+        return (8192 if is_dir else rng.randint(0, 4 * 1024 * 1024)), rng.randint(0, 730)
+
+    def _find(self, command: str) -> Iterator[str]:
+        """Lazy depth-first `find`, so a capped search stops walking early."""
+        args = shlex.split(command.replace('2>&1', '').replace('; [ $? -le 1 ]', ''))
+        root = self._normalize(args[1]) if len(args) > 1 else '/'
+        max_depth, names, kind, tests = None, [], '', []
+        i = 2
+        while i < len(args):
+            arg, value = args[i], args[i + 1] if i + 1 < len(args) else ''
+            if arg == '-level':
+                max_depth = int(value) + 1
+            elif arg == '-maxdepth':
+                max_depth = int(value)
+            elif arg == '-name':
+                names.append(value)
+            elif arg == '-type':
+                kind = value
+            elif arg in ('-size', '-mtime'):
+                tests.append((arg, value))
+            else:
+                i += 1  # ( ) -o
+                continue
+            i += 2
+
+        def compare(actual: int, spec: str) -> bool:
+            number = int(spec.lstrip('+-').rstrip('c'))
+            if spec.startswith('+'):
+                return actual > number
+            if spec.startswith('-'):
+                return actual < number
+            return actual == number
+
+        def matches(path: str, is_dir: bool) -> bool:
+            if names and not any(fnmatch.fnmatchcase(path.rsplit('/', 1)[-1], n) for n in names):
+                return False
+            if kind and kind != ('d' if is_dir else 'f'):
+                return False
+            size, age = self._uss_stat(path, is_dir)
+            return all(compare(size if test == '-size' else age, spec) for test, spec in tests)
+
+        with self._lock:
+            found = self._lookup(root)
+        if found is None:
+            yield f"find: {root}: No such file or directory"
+            return
+        if matches(root, found == 'dir'):
+            yield root
+        if found != 'dir':
+            return
+
+        stack = [(root, 0)]
+        while stack:
+            path, depth = stack.pop()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            with self._lock:
+                children = sorted(self._children(path).items())
+            subdirs = []
+            for name, is_dir in children:
+                child = f"{path.rstrip('/')}/{name}"
+                if matches(child, is_dir):
+                    yield child
+                if is_dir:
+                    subdirs.append((child, depth + 1))
+            stack.extend(reversed(subdirs))
+
+    def stream(self, cmd_list: List[str]) -> Iterator[str]:
+        if command_family(cmd_list) == 'dataset_view':
+            operands, options = parse_args(cmd_list[1:])
+            dsname, member = _split_dsn(operands[3]) if len(operands) > 3 else ('', None)
+            ds = self.datasets.get(dsname)
+            if ds is not None and not member and dsname not in self.content_overlay:
+                # Generated record by record, like a large data set coming off the wire
+                start, count = _parse_range(str(options['range'])) if 'range' in options else (0, None)
+                return self._sequential_records(ds, start, count)
+        if command_family(cmd_list) == 'uss_ssh':
+            operands, _ = parse_args(cmd_list[1:])
+            command = _unquote(operands[-1]) if len(operands) > 3 else ''
+            if command.startswith('find '):
+                if self.latency_ms:
+                    time.sleep(self.latency_ms / 1000)
+                return self._find(command)
+        return super().stream(cmd_list)
+
+    def _uss_content(self, path: str) -> str:
+        if path in self.uss_files:
+            return self.uss_files[path]
+        rng = _rng(self.seed, path, 'content')
+        return '\n'.join(f"# {path} line {n}: {rng.random():.6f}" for n in range(rng.randint(5, 200))) + '\n'
+
+    # Command dispatch
+
+    def execute(self, cmd_list: List[str]) -> ZoweResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        family = command_family(cmd_list)
+        operands, options = parse_args(cmd_list[1:])
+        operands = operands[3:]
+
+        handler = getattr(self, f"_cmd_{family}", None)
+        if handler is None:
+            return ZoweResult(1, '', f"Simulator does not support: {' '.join(cmd_list)}")
+        with self._lock:
+            try:
+                return handler(operands, options)
+            except KeyError as e:
+                return ZoweResult(1, '', f"Not found: {e}")
+
+    def _ok(self, stdout: str) -> ZoweResult:
+        return ZoweResult(0, stdout, '')
+
+    def _cmd_zosmf_status(self, operands, options) -> ZoweResult:
+        return self._ok(
+            f"The user {self.user.lower()} successfully connected to z/OSMF on 'simulator'.\n"
+        )
+
+    def _cmd_jobs_list(self, operands, options) -> ZoweResult:
+        owner = str(options.get('owner', self.user)).upper()
+        prefix = str(options.get('prefix', '*')).upper()
+        if '*' not in prefix and '?' not in prefix:
+            prefix += '*'
+        data = [
+            self.job_view(job) for jobid, job in self.jobs.items()
+            if jobid not in self.purged
+            and fnmatch.fnmatchcase(job["owner"], owner)
+            and fnmatch.fnmatchcase(job["jobname"], prefix)
+        ]
+        if 'exec-data' not in options:
+            # Like z/OSMF, the exec-* times only come with --exec-data
+            data = [{k: v for k, v in job.items() if not k.startswith('exec-')} for job in data]
+        return self._ok(json.dumps({"success": True, "data": data}))
+
+    def _cmd_job_status(self, operands, options) -> ZoweResult:
+        job = self._job(operands[0])
+        if job is None:
+            return ZoweResult(1, '', f"Job {operands[0]} not found")
+        return self._ok(json.dumps({"success": True, "data": self.job_view(job)}))
+
+    def _cmd_spool_list(self, operands, options) -> ZoweResult:
+        job = self._job(operands[0])
+        if job is None:
+            return ZoweResult(1, '', f"Job {operands[0]} not found")
+        return self._ok(json.dumps({"success": True, "data": self._spool_files(job)}))
+
+    def _cmd_spool_view(self, operands, options) -> ZoweResult:
+        job = self._job(operands[0])
+        content = self._spool_content(job, int(operands[1])) if job else None
+        if content is None:
+            return ZoweResult(1, '', f"Spool file {operands[1:2]} not found for {operands[0]}")
+        return self._ok(content)
+
+    def _cmd_job_purge(self, operands, options) -> ZoweResult:
+        if self._job(operands[0]) is None:
+            return ZoweResult(1, '', f"Job {operands[0]} not found")
+        self.purged.add(operands[0].upper())
+        return self._ok(f"Successfully deleted job {operands[0]}")
+
+    def _cmd_dataset_list(self, operands, options) -> ZoweResult:
+        pattern = _unquote(operands[0]).upper()
+        names = sorted(name for name in self.datasets if fnmatch.fnmatchcase(name, pattern))
+        if 'attributes' in options and 'rfj' in options:
+            items = [self._attributes(self.datasets[name]) for name in names]
+            return self._ok(json.dumps({
+                "success": True,
+                "data": {"apiResponse": {"items": items, "returnedRows": len(items), "moreRows": False}}
+            }))
+        return self._ok('\n'.join(names) + ('\n' if names else ''))
+
+    def _cmd_member_list(self, operands, options) -> ZoweResult:
+        dsname, _ = _split_dsn(operands[0])
+        if dsname not in self.datasets:
+            return ZoweResult(1, '', f"Data set {dsname} not found")
+        members = sorted(self._members(dsname).items())
+        if 'attributes' not in options:
+            # Like the real CLI: bare member names
+            lines = [name for name, _ in members]
+        elif 'rfj' in options:
+            items = [{"member": name, **stats} for name, stats in members]
+            return self._ok(json.dumps({
+                "success": True,
+                "data": {"apiResponse": {"items": items, "returnedRows": len(items), "JSONversion": 1}}
+            }))
+        else:
+            lines = [f"{name} {s['vers']} {s['mod']} {s['c4date']} {s['m4date']} {s['cnorc']} {s['inorc']} "
+                     f"{s['mnorc']} {s['mtime']} {s['msec']} {s['user']} {s['sclm']}" for name, s in members]
+        return self._ok('\n'.join(lines) + ('\n' if lines else ''))
+
+    def _cmd_dataset_view(self, operands, options) -> ZoweResult:
+        dsname, member = _split_dsn(operands[0])
+        ds = self.datasets.get(dsname)
+        if ds is None:
+            return ZoweResult(1, '', f"Data set {dsname} not found")
+        key = f"{dsname}({member})" if member else dsname
+        start, count = _parse_range(str(options['range'])) if 'range' in options else (0, None)
+        if key not in self.content_overlay and not member:
+            return self._ok(''.join(f"{record}\n" for record in self._sequential_records(ds, start, count)))
+        if key in self.content_overlay:
+            content = self.content_overlay[key]
+        elif member not in self._members(dsname):
+            return ZoweResult(1, '', f"Member {member} not found in {dsname}")
+        else:
+            content = self._member_content(dsname, member)
+        if 'range' in options:
+            records = content.splitlines()[start:None if count is None else start + count]
+            content = ''.join(f"{record}\n" for record in records)
+        return self._ok(content)
+
+    def _cmd_dataset_download(self, operands, options) -> ZoweResult:
+        """Untranslated IBM-1047 records: padded to LRECL for FB, length-prefixed with --record."""
+        dsname, member = _split_dsn(operands[0])
+        ds = self.datasets.get(dsname)
+        if ds is None:
+            return ZoweResult(1, '', f"Data set {dsname} not found")
+        key = f"{dsname}({member})" if member else dsname
+        if key in self.content_overlay:
+            records = self.content_overlay[key].splitlines()
+        elif not member:
+            records = self._sequential_records(ds)
+        elif member not in self._members(dsname):
+            return ZoweResult(1, '', f"Member {member} not found in {dsname}")
+        else:
+            records = self._member_content(dsname, member).splitlines()
+        lrecl = ds["lrecl"] if ds["recfm"].startswith('F') else None
+        with open(_unquote(str(options['file'])), 'wb') as f:
+            for record in records:
+                data = encode(record, 'IBM-1047')
+                if lrecl:
+                    data = data[:lrecl].ljust(lrecl, EBCDIC_BLANK)
+                f.write(RECORD_PREFIX.pack(len(data)) + data if 'record' in options else data)
+        return self._ok(f"Data set downloaded successfully to {options['file']}")
+
+    def _cmd_dataset_upload(self, operands, options) -> ZoweResult:
+        local, target = operands[0], operands[1]
+        dsname, member = _split_dsn(target)
+        ds = self.datasets.get(dsname)
+        if ds is None:
+            return ZoweResult(1, '', f"Data set {dsname} not found")
+        with open(_unquote(local), 'r') as f:
+            content = f.read()
+        if member:
+            self._touch_member(dsname, member, content)
+            self.member_overlay.setdefault(dsname, {})[member] = content
+            self.content_overlay[f"{dsname}({member})"] = content
+        else:
+            self.content_overlay[dsname] = content
+        return self._ok(f"Data set uploaded successfully to {target}")
+
+    def _cmd_uss_list(self, operands, options) -> ZoweResult:
+        path = self._normalize(operands[0])
+        if self._lookup(path) != 'dir':
+            return ZoweResult(1, '', f"Path {path} not found")
+        lines = [f"{name}/" if is_dir else name for name, is_dir in sorted(self._children(path).items())]
+        return self._ok('\n'.join(['.', '..'] + lines) + '\n')
+
+    def _cmd_uss_view(self, operands, options) -> ZoweResult:
+        path = self._normalize(operands[0])
+        if self._lookup(path) != 'file':
+            return ZoweResult(1, '', f"File {path} not found")
+        return self._ok(self._uss_content(path))
+
+    def _cmd_uss_upload(self, operands, options) -> ZoweResult:
+        local, path = _unquote(operands[0]), self._normalize(operands[1])
+        parent = path.rpartition('/')[0] or '/'
+        if self._lookup(parent) != 'dir':
+            return ZoweResult(1, '', f"Directory {parent} not found")
+        with open(local, 'r') as f:
+            self.uss_files[path] = f.read()
+        self.uss_deleted.discard(path)
+        return self._ok(f"USS file uploaded successfully to {path}")
+
+    def _cmd_uss_download(self, operands, options) -> ZoweResult:
+        path = self._normalize(operands[0])
+        if self._lookup(path) != 'file':
+            return ZoweResult(1, '', f"File {path} not found")
+        with open(_unquote(str(options['file'])), 'w') as f:
+            f.write(self._uss_content(path))
+        return self._ok(f"USS file downloaded successfully to {options['file']}")
+
+    def _cmd_uss_delete(self, operands, options) -> ZoweResult:
+        path = self._normalize(operands[0])
+        kind = self._lookup(path)
+        if kind is None:
+            return ZoweResult(1, '', f"Path {path} not found")
+        if kind == 'dir' and 'recursive' not in options and self._children(path):
+            return ZoweResult(1, '', f"Directory {path} is not empty")
+        self.uss_files.pop(path, None)
+        self.uss_dirs = {d for d in self.uss_dirs if not (d == path or d.startswith(path + '/'))}
+        self.uss_files = {f: c for f, c in self.uss_files.items() if not f.startswith(path + '/')}
+        self.uss_deleted.add(path)
+        return self._ok(f"Deleted {path}")
+
+    def _cmd_uss_mkdir(self, operands, options) -> ZoweResult:
+        path = self._normalize(operands[0])
+        parent = path.rpartition('/')[0] or '/'
+        if self._lookup(parent) != 'dir':
+            return ZoweResult(1, '', f"Directory {parent} not found")
+        if self._lookup(path) is not None:
+            return ZoweResult(1, '', f"Path {path} already exists")
+        self.uss_deleted.discard(path)
+        self.uss_dirs.add(path)
+        return self._ok(f"Created directory {path}")
+
+    def _cmd_uss_ssh(self, operands, options) -> ZoweResult:
+        command = _unquote(operands[-1]) if operands else ''
+        if command.startswith('df'):
+            return self._ok("Filesystem  1K-blocks   Used Available Use% Mounted on\n"
+                            "OMVS.ROOT    4194304 2516582   1677722  60% /\n")
+        if command.startswith('find '):
+            return self._ok(''.join(f"{line}\n" for line in self._find(command)))
+        counted = re.search(r"""cat "//'([^']+)'"; echo \$\? >&3; \} \| wc -l""", command)
+        if counted:
+            dsname, member = _split_dsn(counted.group(1))
+            ds = self.datasets.get(dsname)
+            key = f"{dsname}({member})" if member else dsname
+            if ds is None or (member and key not in self.content_overlay and member not in self._members(dsname)):
+                # wc still counts the empty stream; the command fails with cat's status
+                return ZoweResult(1, f"{0:8d}\n", f"cat: //'{key}': EDC5049I The specified file name could not be located.")
+            if key in self.content_overlay:
+                records = len(self.content_overlay[key].splitlines())
+            elif member:
+                records = len(self._member_content(dsname, member).splitlines())
+            else:
+                records = ds["records"]
+            return self._ok(f"{records:8d}\n")
+        if 'who' in command:
+            active = sum(1 for job in self.jobs.values() if self.job_view(job)["status"] == "ACTIVE")
+            return self._ok(f"{min(len(self.users), 1 + active // 10)}\n")
+        return ZoweResult(1, '', f"Simulator does not support ssh command: {command}")
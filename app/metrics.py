@@ -0,0 +1,329 @@
+import atexit
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+ZOWE_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+STORE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+# With SHARED_CACHE, each worker publishes its samples this often and /metrics
+# adds up every worker's, so a scrape is not a sample of one random process
+METRICS_PUBLISH_INTERVAL = float(os.environ.get('METRICS_PUBLISH_INTERVAL', 15))
+# A stopped worker's counters keep counting towards the totals this long
+METRICS_KEEP = float(os.environ.get('METRICS_KEEP', 7 * 86400))
+
+# zowe positional arguments -> command family label
+ZOWE_FAMILIES = {
+    ('jobs', 'list', 'jobs'): 'jobs_list',
+    ('jobs', 'view', 'job-status-by-jobid'): 'job_status',
+    ('jobs', 'list', 'spool-files-by-jobid'): 'spool_list',
+    ('jobs', 'view', 'spool-file-by-id'): 'spool_view',
+    ('jobs', 'delete', 'job'): 'job_purge',
+    ('jobs', 'submit'): 'job_submit',
+    ('files', 'list', 'data-set'): 'dataset_list',
+    ('files', 'list', 'all-members'): 'member_list',
+    ('files', 'view', 'data-set'): 'dataset_view',
+    ('files', 'upload', 'file-to-data-set'): 'dataset_upload',
+    ('files', 'download', 'data-set'): 'dataset_download',
+    ('files', 'list', 'uss-files'): 'uss_list',
+    ('files', 'view', 'uss-file'): 'uss_view',
+    ('files', 'upload', 'file-to-uss'): 'uss_upload',
+    ('files', 'download', 'uss-file'): 'uss_download',
+    ('files', 'delete', 'uss'): 'uss_delete',
+    ('files', 'create', 'uss-directory'): 'uss_mkdir',
+    ('zos-uss', 'issue', 'ssh'): 'uss_ssh',
+    ('zosmf', 'check', 'status'): 'zosmf_status',
+}
+
+
+def command_family(cmd_list: Sequence[str]) -> str:
+    words = [arg for arg in cmd_list[1:] if not arg.startswith('-')]
+    for length in (3, 2):
+        family = ZOWE_FAMILIES.get(tuple(words[:length]))
+        if family:
+            return family
+    return '_'.join(words[:3]).replace('-', '_') or 'other'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def snapshot(self) -> list:
+        """This process's samples as JSON, for the shared store."""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def merge(self, snapshots: List[list]) -> Dict[Tuple[str, ...], float]:
+        values: Dict[Tuple[str, ...], float] = {}
+        for snapshot in snapshots:
+            for key, value in snapshot:
+                key = tuple(key)
+                values[key] = values.get(key, 0) + value
+        return values
+
+    def render(self, values: Optional[Dict] = None) -> List[str]:
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in sorted(values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def __init__(self, *args, aggregate: str = 'sum', **kwargs):
+        super().__init__(*args, **kwargs)
+        # Across workers: 'sum' (e.g. processes running) or 'max' (e.g. a 0/1 state)
+        self.aggregate = aggregate
+
+    def merge(self, snapshots: List[list]) -> Dict[Tuple[str, ...], float]:
+        if self.aggregate == 'sum':
+            return super().merge(snapshots)
+        values: Dict[Tuple[str, ...], float] = {}
+        for snapshot in snapshots:
+            for key, value in snapshot:
+                key = tuple(key)
+                values[key] = max(values.get(key, value), value)
+        return values
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = HTTP_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[list(key), [list(s[0]), s[1], s[2]]] for key, s in self._values.items()]
+
+    def merge(self, snapshots: List[list]) -> Dict[Tuple[str, ...], list]:
+        values: Dict[Tuple[str, ...], list] = {}
+        for snapshot in snapshots:
+            for key, (counts, total, count) in snapshot:
+                state = values.setdefault(tuple(key), [[0] * len(self.buckets), 0.0, 0])
+                state[0] = [a + b for a, b in zip(state[0], counts)]
+                state[1] += total
+                state[2] += count
+        return values
+
+    def render(self, values: Optional[Dict] = None) -> List[str]:
+        if values is None:
+            with self._lock:
+                values = {key: [list(s[0]), s[1], s[2]] for key, s in self._values.items()}
+        lines = self.header()
+        for key, (counts, total, count) in sorted(values.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+REGISTRY: List[Metric] = []
+
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route',
+    ('route', 'method')
+)
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by route and status code',
+    ('route', 'method', 'status')
+)
+ZOWE_COMMAND_DURATION = Histogram(
+    'zowe_command_duration_seconds', 'Zowe CLI call latency by command family',
+    ('family', 'outcome'), buckets=ZOWE_BUCKETS
+)
+ZOWE_INFLIGHT = Gauge(
+    'zowe_inflight_processes', 'Zowe CLI subprocesses currently running', ('mode',)
+)
+ZOWE_RETRIES = Counter(
+    'zowe_retries_total', 'Zowe CLI calls retried after a transient failure', ('family',)
+)
+ZOWE_STALE_RESPONSES = Counter(
+    'zowe_stale_responses_total', 'Last-known-good answers served while a target was failing', ('family',)
+)
+ZOWE_BREAKER_OPEN = Gauge(
+    'zowe_circuit_open', '1 while the circuit breaker for a Zowe target is open', ('target',),
+    aggregate='max'
+)
+ACTIVITY_STORE_DURATION = Histogram(
+    'activity_store_duration_seconds', 'activities.json read/write latency',
+    ('operation',), buckets=STORE_BUCKETS
+)
+ZBOT_UPSTREAM_DURATION = Histogram(
+    'zbot_upstream_duration_seconds', 'Z-Bot model server latency',
+    ('endpoint', 'model', 'outcome'), buckets=ZOWE_BUCKETS
+)
+
+
+def _cache_snapshot() -> Dict[str, list]:
+    from cache import cache_stats
+    return {stat["name"]: [stat["hits"], stat["misses"], stat["size"]] for stat in cache_stats()}
+
+
+def _render_caches(caches: Dict[str, list]) -> List[str]:
+    lines = []
+    for name, index, kind, doc in (
+        ('cache_hits_total', 0, 'counter', 'Cache hits'),
+        ('cache_misses_total', 1, 'counter', 'Cache misses'),
+        ('cache_hit_ratio', None, 'gauge', 'Cache hit ratio since start'),
+        ('cache_entries', 2, 'gauge', 'Entries currently cached'),
+    ):
+        lines += [f"# HELP {name} {doc}", f"# TYPE {name} {kind}"]
+        for cache, (hits, misses, size) in caches.items():
+            if index is None:
+                value = round(hits / (hits + misses), 4) if hits + misses else 0.0
+            else:
+                value = (hits, misses, size)[index]
+            lines.append(f'{name}{{cache="{_escape(cache)}"}} {value}')
+    return lines
+
+
+def snapshot() -> Dict:
+    return {
+        "at": time.time(),
+        "metrics": {metric.name: metric.snapshot() for metric in REGISTRY},
+        "caches": _cache_snapshot()
+    }
+
+
+def publish():
+    """Store this worker's samples where the other workers' /metrics can add them up."""
+    from shared_store import shared_store
+    if shared_store is not None:
+        shared_store.set('metrics', shared_store.owner, snapshot(), METRICS_KEEP)
+
+
+def _merge_caches(snapshots: List[Dict], live: List[Dict]) -> Dict[str, list]:
+    caches: Dict[str, list] = {}
+    for snap in snapshots:
+        for name, (hits, misses, _) in snap.get("caches", {}).items():
+            merged = caches.setdefault(name, [0, 0, 0])
+            merged[0] += hits
+            merged[1] += misses
+    for snap in live:
+        for name, (_, _, size) in snap.get("caches", {}).items():
+            # Shared caches report the same size from every worker
+            caches[name][2] = max(caches[name][2], size)
+    return caches
+
+
+def render() -> str:
+    from shared_store import shared_store
+    if shared_store is None:
+        snapshots = live = [snapshot()]
+    else:
+        publish()
+        snapshots = [value for _, value, _ in shared_store.items('metrics')]
+        # Stopped workers still count for counters and histograms, not for gauges
+        cutoff = time.time() - 3 * METRICS_PUBLISH_INTERVAL
+        live = [snap for snap in snapshots if snap["at"] >= cutoff]
+    lines = []
+    for metric in REGISTRY:
+        sources = live if metric.kind == 'gauge' else snapshots
+        lines += metric.render(metric.merge([snap["metrics"].get(metric.name, []) for snap in sources]))
+    lines += _render_caches(_merge_caches(snapshots, live))
+    return '\n'.join(lines) + '\n'
+
+
+def _publish_loop():
+    while True:
+        time.sleep(METRICS_PUBLISH_INTERVAL)
+        try:
+            publish()
+        except Exception as e:
+            print(f"Could not publish metrics: {e}")
+
+
+def init_metrics(app):
+    from flask import Response, request, g
+
+    @app.before_request
+    def start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, route=route, method=request.method)
+            HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        return response
+
+    from shared_store import shared_store
+    if shared_store is not None:
+        threading.Thread(target=_publish_loop, name="metrics-publish", daemon=True).start()
+        atexit.register(publish)
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(render(), mimetype='text/plain; version=0.0.4')
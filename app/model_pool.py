@@ -0,0 +1,155 @@
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import requests
+
+
+class NoHealthyEndpointError(Exception):
+    pass
+
+
+class Endpoint:
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.ejected_at = None
+        self.latency = None
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def generate_url(self) -> str:
+        return f"{self.base_url}/api/generate"
+
+    @property
+    def probe_url(self) -> str:
+        return f"{self.base_url}/api/tags"
+
+    def stats(self) -> Dict:
+        return {
+            "url": self.base_url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "consecutive_failures": self.consecutive_failures,
+            "latency_ms": round(self.latency * 1000) if self.latency is not None else None,
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+
+class ModelPool:
+    """Routes model requests to the healthy endpoint with the fewest outstanding
+    requests. Endpoints are ejected after repeated failures and re-admitted once
+    an active health probe succeeds again."""
+
+    def __init__(self, urls: List[str], model: str, fallback_model: Optional[str] = None,
+                 max_per_node: int = 2, eject_after: int = 3, probe_interval: float = 10.0,
+                 readmit_after: float = 30.0, session: Optional[requests.Session] = None):
+        self.endpoints = [Endpoint(url) for url in urls if url.strip()]
+        self.model = model
+        self.fallback_model = fallback_model
+        self.max_per_node = max_per_node
+        self.eject_after = eject_after
+        self.probe_interval = probe_interval
+        self.readmit_after = readmit_after
+        self.session = session or requests.Session()
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+        self._prober = None
+        self._stop = threading.Event()
+
+    def start(self):
+        with self._lock:
+            if self._prober is not None or self.probe_interval <= 0:
+                return
+            self._prober = threading.Thread(target=self._probe_loop, name="model-pool-probe", daemon=True)
+            self._prober.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def acquire(self) -> Tuple[Endpoint, str]:
+        self.start()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.healthy]
+            if not candidates:
+                raise NoHealthyEndpointError("No healthy model endpoints available")
+            endpoint = min(
+                candidates,
+                key=lambda e: (e.outstanding, e.latency if e.latency is not None else 0.0)
+            )
+            model = self.model
+            # Every node is busy: answer with the smaller model instead of queueing behind the big one
+            if self.fallback_model and endpoint.outstanding >= self.max_per_node:
+                model = self.fallback_model
+                self.fallbacks += 1
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint, model
+
+    def release(self, endpoint: Endpoint, ok: bool, elapsed: Optional[float] = None):
+        with self._lock:
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+            if ok:
+                endpoint.consecutive_failures = 0
+                if elapsed is not None:
+                    endpoint.latency = elapsed if endpoint.latency is None else 0.8 * endpoint.latency + 0.2 * elapsed
+            else:
+                endpoint.failures += 1
+                self._record_failure(endpoint)
+
+    def _record_failure(self, endpoint: Endpoint):
+        endpoint.consecutive_failures += 1
+        if endpoint.healthy and endpoint.consecutive_failures >= self.eject_after:
+            endpoint.healthy = False
+            endpoint.ejected_at = time.monotonic()
+            print(f"⚠️  Ejected model endpoint {endpoint.base_url} after {endpoint.consecutive_failures} failures")
+
+    def probe(self, endpoint: Endpoint):
+        if not endpoint.healthy and time.monotonic() - endpoint.ejected_at < self.readmit_after:
+            return
+        started = time.monotonic()
+        try:
+            response = self.session.get(endpoint.probe_url, timeout=3)
+            ok = response.status_code == 200
+        except Exception:
+            ok = False
+        elapsed = time.monotonic() - started
+
+        with self._lock:
+            if ok:
+                endpoint.consecutive_failures = 0
+                if not endpoint.healthy:
+                    endpoint.healthy = True
+                    endpoint.ejected_at = None
+                    print(f"✅ Re-admitted model endpoint {endpoint.base_url}")
+                if endpoint.latency is None:
+                    endpoint.latency = elapsed
+            elif endpoint.healthy:
+                self._record_failure(endpoint)
+            else:
+                # Still down: restart the cool-down before the next attempt
+                endpoint.ejected_at = time.monotonic()
+
+    def probe_all(self):
+        for endpoint in list(self.endpoints):
+            self.probe(endpoint)
+
+    def _probe_loop(self):
+        while not self._stop.wait(self.probe_interval):
+            try:
+                self.probe_all()
+            except Exception as e:
+                print(f"Error probing model endpoints: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "model": self.model,
+                "fallback_model": self.fallback_model,
+                "fallbacks": self.fallbacks,
+                "max_per_node": self.max_per_node,
+                "endpoints": [e.stats() for e in self.endpoints]
+            }
@@ -0,0 +1,309 @@
+import gzip
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from zowe_identity import Identity, reset_identity, set_identity
+
+PDS_INDEX_DIR = os.environ.get('PDS_INDEX_DIR', 'pds_index')
+# Parallel `zowe files view data-set` calls while (re)indexing one library
+PDS_INDEX_WORKERS = int(os.environ.get('PDS_INDEX_WORKERS', 8))
+# A library's member list is re-checked at most this often; searches in between never call zowe
+PDS_INDEX_REFRESH = float(os.environ.get('PDS_INDEX_REFRESH', 120))
+PDS_INDEX_MAX_LOADED = int(os.environ.get('PDS_INDEX_MAX_LOADED', 32))
+PDS_SEARCH_MAX_RESULTS = int(os.environ.get('PDS_SEARCH_MAX_RESULTS', 500))
+
+# COBOL/JCL/assembler words: WS-CUST-ID, SYSUT1, #CUSTREC, @PROC; data set names split on dots
+TOKEN_PATTERN = re.compile(r"[A-Z0-9@#$][A-Z0-9@#$_-]*")
+
+
+def tokenize(line: str) -> List[str]:
+    return TOKEN_PATTERN.findall(line.upper())
+
+
+class LibraryIndex:
+    """Inverted index over the members of one PDS: token -> member -> line numbers.
+
+    Member text is kept so matches can be shown with surrounding lines.
+    Each member carries the stamp (ISPF change date, time and version) it was
+    indexed at, so a refresh only refetches members whose stamp changed.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.members: Dict[str, Dict] = {}
+        self.postings: Dict[str, Dict[str, List[int]]] = {}
+        self.checked_at = 0.0
+        self.dirty = False
+        self._tokens: Optional[List[str]] = None
+
+    def add(self, member: str, stamp: str, text: Optional[str]):
+        self.remove(member)
+        lines = text.splitlines() if text is not None else []
+        self.members[member] = {"stamp": stamp, "lines": [l.rstrip() for l in lines], "error": text is None}
+        for number, line in enumerate(lines):
+            for token in set(tokenize(line)):
+                self.postings.setdefault(token, {}).setdefault(member, []).append(number)
+        self._tokens = None
+        self.dirty = True
+
+    def remove(self, member: str):
+        entry = self.members.pop(member, None)
+        if entry is None:
+            return
+        for token in {t for line in entry["lines"] for t in tokenize(line)}:
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.pop(member, None)
+                if not posting:
+                    del self.postings[token]
+        self._tokens = None
+        self.dirty = True
+
+    def _matching_tokens(self, term: str) -> List[str]:
+        if not term.endswith('*'):
+            return [term] if term in self.postings else []
+        prefix = term.rstrip('*')
+        if self._tokens is None:
+            self._tokens = sorted(self.postings)
+        tokens = []
+        for i in range(bisect_left(self._tokens, prefix), len(self._tokens)):
+            if not self._tokens[i].startswith(prefix):
+                break
+            tokens.append(self._tokens[i])
+        return tokens
+
+    def lines_for(self, term: str) -> Dict[str, Set[int]]:
+        found: Dict[str, Set[int]] = {}
+        for token in self._matching_tokens(term):
+            for member, numbers in self.postings[token].items():
+                found.setdefault(member, set()).update(numbers)
+        return found
+
+    def search(self, terms: List[str]) -> Iterator[Tuple[str, int]]:
+        """(member, line) pairs where every term occurs on the line, in member order."""
+        if not terms:
+            return
+        # Start from the rarest term; the rest only narrow it down
+        candidates = sorted((self.lines_for(term) for term in terms), key=len)
+        for member in sorted(candidates[0]):
+            lines = candidates[0][member]
+            for other in candidates[1:]:
+                lines = lines & other.get(member, set())
+                if not lines:
+                    break
+            for number in sorted(lines):
+                yield member, number
+
+    def snippet(self, member: str, number: int, context: int) -> Dict:
+        lines = self.members[member]["lines"]
+        start = max(0, number - context)
+        return {
+            "library": self.name,
+            "member": member,
+            "line": number + 1,
+            "text": lines[number],
+            "before": lines[start:number],
+            "after": lines[number + 1:number + 1 + context]
+        }
+
+    def to_json(self) -> Dict:
+        return {
+            "name": self.name,
+            "checked_at": self.checked_at,
+            "members": self.members,
+            "postings": self.postings
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> 'LibraryIndex':
+        index = cls(data["name"])
+        index.checked_at = data.get("checked_at", 0.0)
+        index.members = data.get("members", {})
+        index.postings = data.get("postings", {})
+        return index
+
+
+class PdsIndexStore:
+    """Loaded library indexes (LRU) backed by one gzip JSON file per library."""
+
+    def __init__(self, directory: str = PDS_INDEX_DIR, workers: int = PDS_INDEX_WORKERS,
+                 refresh_after: float = PDS_INDEX_REFRESH, max_loaded: int = PDS_INDEX_MAX_LOADED):
+        self.directory = directory
+        self.workers = workers
+        self.refresh_after = refresh_after
+        self.max_loaded = max_loaded
+        self._loaded: "OrderedDict[str, LibraryIndex]" = OrderedDict()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        # (identity, library) -> last time that identity could list the library
+        self._access: Dict[Tuple[str, str], float] = {}
+
+    def _path(self, library: str) -> str:
+        name = f"{library}.json.gz"
+        # Callers validate data set names; never let one point outside the index directory
+        if os.path.basename(name) != name or name.startswith('.'):
+            raise ValueError(f"Invalid library name: {library}")
+        return os.path.join(self.directory, name)
+
+    def library_lock(self, library: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(library, threading.Lock())
+
+    def get(self, library: str) -> LibraryIndex:
+        with self._lock:
+            index = self._loaded.get(library)
+            if index is not None:
+                self._loaded.move_to_end(library)
+                return index
+        index = self._read(library) or LibraryIndex(library)
+        with self._lock:
+            index = self._loaded.setdefault(library, index)
+            while len(self._loaded) > self.max_loaded:
+                self._loaded.popitem(last=False)
+        return index
+
+    def _read(self, library: str) -> Optional[LibraryIndex]:
+        path = self._path(library)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return LibraryIndex.from_json(json.load(f))
+        except (OSError, ValueError, EOFError) as e:
+            print(f"Rebuilding unreadable index {path}: {e}")
+            return None
+
+    def save(self, index: LibraryIndex):
+        path = self._path(index.name)
+        # Indexes hold member source text, so keep them private to the service user
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{index.name}.", suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                json.dump(index.to_json(), f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        index.dirty = False
+
+    def refresh(self, library: str, identity: Identity,
+                list_members: Callable[[str], List[Dict]],
+                fetch_member: Callable[[str, str], str]) -> Dict:
+        """Bring a library's index up to date and check that `identity` may read it.
+
+        The member list is fetched as the identity at most every refresh_after
+        seconds; members that are new or whose stamp changed are fetched in
+        parallel and merged as they arrive.
+        """
+        index = self.get(library)
+        access_key = (identity.name, library)
+        now = time.time()
+        if now - self._access.get(access_key, 0) < self.refresh_after and now - index.checked_at < self.refresh_after:
+            return {"library": library, "members": len(index.members), "fetched": 0, "cached": True}
+
+        with self.library_lock(library):
+            members = _as(identity, list_members, library)
+            self._access[access_key] = time.time()
+            if time.time() - index.checked_at < self.refresh_after:
+                # Another search refreshed the library while we listed it
+                return {"library": library, "members": len(index.members), "fetched": 0, "cached": True}
+
+            listed = {m["name"]: m.get("stamp") or f"{m.get('created', '')} {m.get('modified', '')}".strip()
+                      for m in members}
+            for gone in [name for name in index.members if name not in listed]:
+                index.remove(gone)
+            stale = [name for name, stamp in listed.items()
+                     if name not in index.members or index.members[name]["stamp"] != stamp]
+
+            started = time.perf_counter()
+            failed = 0
+            completed = False
+            pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pds-index")
+            try:
+                futures = {pool.submit(_as, identity, fetch_member, library, name): name for name in stale}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        text = future.result()
+                    except Exception as e:
+                        # Load modules and unreadable members are remembered, not retried every search
+                        print(f"Could not index {library}({name}): {e}")
+                        text = None
+                        failed += 1
+                    index.add(name, listed[name], text)
+                completed = True
+            finally:
+                # Also reached when the searching client disconnects mid-refresh: keep
+                # what was fetched, but leave the library due for another check
+                pool.shutdown(wait=False, cancel_futures=True)
+                if completed:
+                    index.checked_at = time.time()
+                if index.dirty:
+                    self.save(index)
+            print(f"Indexed {len(stale)} members of {library} in {time.perf_counter() - started:.1f}s")
+            return {"library": library, "members": len(index.members), "fetched": len(stale),
+                    "failed": failed, "cached": False}
+
+    def search(self, library: str, terms: List[str], limit: int, context: int) -> List[Dict]:
+        """Matches with snippets, collected under the library lock so a refresh cannot interleave."""
+        index = self.get(library)
+        results = []
+        with self.library_lock(library):
+            for member, number in index.search(terms):
+                if len(results) == limit:
+                    break
+                results.append(index.snippet(member, number, context))
+        return results
+
+    def invalidate(self, library: str, member: Optional[str] = None):
+        """Force a refetch after the app itself changed a member (its stamp may not move)."""
+        with self._lock:
+            known = library in self._loaded
+        if not known and not os.path.exists(self._path(library)):
+            return
+        index = self.get(library)
+        with self.library_lock(library):
+            if member and member in index.members:
+                index.members[member]["stamp"] = None
+            index.checked_at = 0.0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            loaded = list(self._loaded.values())
+        return {
+            "directory": self.directory,
+            "libraries": [{"name": i.name, "members": len(i.members), "tokens": len(i.postings),
+                           "age_s": round(time.time() - i.checked_at, 1)} for i in loaded]
+        }
+
+
+def _as(identity: Identity, fn: Callable, *args):
+    """Run fn under identity; pool threads do not inherit the request's context."""
+    token = set_identity(identity)
+    try:
+        return fn(*args)
+    finally:
+        reset_identity(token)
+
+
+def parse_query(query: str) -> List[str]:
+    """Search terms: tokens, each optionally ending in * for a prefix match."""
+    terms = []
+    for word in query.upper().split():
+        prefix = word.endswith('*')
+        for token in tokenize(word):
+            terms.append(token)
+        if prefix and terms:
+            terms[-1] += '*'
+    return terms
+
+
+pds_index = PdsIndexStore()
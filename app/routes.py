@@ -1,8 +1,24 @@
-from flask import Blueprint, render_template, jsonify, current_app, request
-import subprocess
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    g,
+    has_request_context,
+    jsonify,
+    render_template,
+    request,
+    session,
+    stream_with_context
+)
+import contextvars
 import os
 import json
 import re
+import shlex
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from cache import TTLCache
 from activity_logger import (
     ActivityLogger, 
     log_job_completed, 
@@ -12,38 +28,659 @@ from activity_logger import (
     log_uss_upload,
     log_dataset_created
 )
+from admission import QueueFullError, QueueTimeoutError
+from metrics import (
+    command_family,
+    ZOWE_COMMAND_DURATION,
+    ZOWE_INFLIGHT
+)
+from tracing import start_span
+from zowe_backend import get_backend, ZoweResult
+from zowe_replay import get_recorder
+from job_snapshots import job_store, jobs_response
+from job_stats import job_stats
+from ebcdic import (
+    CODEPAGES,
+    DATASET_CODEPAGE,
+    RECORD_PREFIX,
+    codepage_name,
+    encode,
+    fixed_records,
+    prefixed_records,
+    records_to_text
+)
+from job_watch import (
+    JOB_EVENTS_HEARTBEAT,
+    JOB_EVENTS_MAX,
+    JOB_WAIT_MAX,
+    JOB_WAIT_TIMEOUT,
+    WatchLimitError,
+    job_watcher
+)
+from pds_index import PDS_SEARCH_MAX_RESULTS, parse_query, pds_index
+from spool_parser import SYSTEM_DDNAMES, parse_steps
+from zowe_resilience import (
+    TIMEOUT_RETURNCODE,
+    CircuitOpenError,
+    ClientDisconnected,
+    ZoweCall,
+    breaker_for,
+    breaker_stats,
+    is_transient,
+    run_process,
+    stream_process,
+    target_for,
+    timeout_for
+)
+from zowe_identity import (
+    SESSION_KEY,
+    ZOWE_IDENTITY_HEADER,
+    current_identity,
+    identity_info,
+    lookup,
+    may_use,
+    reset_identity,
+    resolve,
+    set_identity,
+    with_profile,
+    zowe_scheduler
+)
 
 api = Blueprint("api", __name__)
 
+# Catalog listings change rarely; the dashboard and data set browser share them
+CATALOG_CACHE_TTL = float(os.environ.get('CATALOG_CACHE_TTL', 60))
+catalog_cache = TTLCache("catalog", maxsize=256, ttl=CATALOG_CACHE_TTL, shared=True)
+
+# Status, spool list and spool files of finished jobs no longer change
+SPOOL_CACHE_TTL = float(os.environ.get('SPOOL_CACHE_TTL', 3600))
+SPOOL_CACHE_MAX_BYTES = int(os.environ.get('SPOOL_CACHE_MAX_BYTES', 1024 * 1024))
+spool_cache = TTLCache("spool", maxsize=512, ttl=SPOOL_CACHE_TTL, shared=True)
+
+# /api/uss/find runs one remote `find`; these keep a search from / in check
+USS_FIND_TIMEOUT = float(os.environ.get('USS_FIND_TIMEOUT', 120))
+USS_FIND_MAX_RESULTS = int(os.environ.get('USS_FIND_MAX_RESULTS', 5000))
+USS_FIND_MAX_DEPTH = int(os.environ.get('USS_FIND_MAX_DEPTH', 20))
+
+# Paged /api/datasets/content: records per page by default and at most
+CONTENT_PAGE_SIZE = int(os.environ.get('CONTENT_PAGE_SIZE', 1000))
+CONTENT_PAGE_MAX = int(os.environ.get('CONTENT_PAGE_MAX', 10000))
+CONTENT_STREAM_TIMEOUT = float(os.environ.get('CONTENT_STREAM_TIMEOUT', 600))
+# Counting reads the whole data set on the mainframe, so counts are kept a while
+RECORD_COUNT_TIMEOUT = float(os.environ.get('RECORD_COUNT_TIMEOUT', 300))
+RECORD_COUNT_TTL = float(os.environ.get('RECORD_COUNT_TTL', 600))
+record_counts = TTLCache("record_counts", maxsize=1024, ttl=RECORD_COUNT_TTL, shared=True)
+
+# Member and USS file text for the content endpoints; the app's own saves invalidate it
+CONTENT_CACHE_TTL = float(os.environ.get('CONTENT_CACHE_TTL', 30))
+CONTENT_CACHE_MAX_BYTES = int(os.environ.get('CONTENT_CACHE_MAX_BYTES', 256 * 1024))
+content_cache = TTLCache("content", maxsize=256, ttl=CONTENT_CACHE_TTL, shared=True)
+
+# /api/datasets/download reads the downloaded file back in chunks of this size
+DATASET_DOWNLOAD_CHUNK = int(os.environ.get('DATASET_DOWNLOAD_CHUNK', 1024 * 1024))
+DOWNLOAD_MODES = ('text', 'binary', 'record')
+
+# /api/content/batch: references per request and concurrent zowe calls per request
+CONTENT_BATCH_MAX_ITEMS = int(os.environ.get('CONTENT_BATCH_MAX_ITEMS', 100))
+CONTENT_BATCH_WORKERS = int(os.environ.get('CONTENT_BATCH_WORKERS', 8))
+
+DSN_PATTERN = re.compile(r"^[A-Z@#$][A-Z0-9@#$-]{0,7}(\.[A-Z@#$][A-Z0-9@#$-]{0,7})*$")
+MEMBER_PATTERN = re.compile(r"^[A-Z@#$][A-Z0-9@#$]{0,7}$")
+
+def client_id():
+    # X-Forwarded-For is only honoured through ProxyFix, for TRUSTED_PROXIES hops
+    return request.remote_addr or 'anonymous'
+
+
+def static_mock():
+    """True when routes should answer from their built-in mock data.
+
+    With a simulator backend installed, MOCK_MODE goes through run_zowe instead.
+    """
+    return current_app.config.get('MOCK_MODE', True) and get_backend() is None
+
+
 def run_zowe(cmd):
     print(f"Executing: {cmd}")
     
     if isinstance(cmd, str):
-        import shlex
         cmd_list = shlex.split(cmd)
     else:
         cmd_list = cmd
     
-    result = subprocess.run(
-        cmd_list,
-        shell=False,  # Important: avoid shell globbing
-        stdout=subprocess.PIPE, 
-        stderr=subprocess.PIPE, 
-        text=True
-    )
+    identity = current_identity()
+    cmd_list = with_profile(cmd_list, identity)
+    call = ZoweCall(cmd_list, on_stale=flag_stale)
+    
+    if not call.admit():
+        return call.unavailable()
+    
+    fair_key = fair_key_for(identity)
+    
+    while True:
+        try:
+            with zowe_scheduler.slot(fair_key):
+                result = execute_zowe(cmd_list, call.family)
+        except QueueFullError as e:
+            call.abandon()
+            if has_request_context():
+                g.zowe_busy = e
+            raise
+        except ClientDisconnected:
+            call.abandon()
+            raise
+        
+        delay = call.settle(result)
+        if delay is None:
+            return call.output
+        time.sleep(delay)
+
+
+def flag_stale():
+    # Picked up by flag_stale_response, which adds X-Zowe-Stale
+    if has_request_context():
+        g.zowe_stale = True
+
+
+def fair_key_for(identity):
+    # Users with their own profile queue separately; on the shared identity, per client
+    if identity.personal:
+        return identity.name
+    return client_id() if has_request_context() else 'system'
+
+
+def stream_zowe(cmd, timeout):
+    """Yield a zowe command's output lines as they arrive.
+
+    Goes through the same profile, circuit breaker and fair scheduling as
+    run_zowe, but is never retried or cached. Closing the generator kills the
+    command. With a recorder, the lines seen and the outcome are recorded when
+    the stream ends.
+    """
+    cmd_list = shlex.split(cmd) if isinstance(cmd, str) else cmd
+    identity = current_identity()
+    cmd_list = with_profile(cmd_list, identity)
+    family = command_family(cmd_list)
+    breaker = breaker_for(target_for(cmd_list))
+    print(f"Streaming: {' '.join(cmd_list)}")
+    
+    if not breaker.allow():
+        raise CircuitOpenError(f"Mainframe target {breaker.target} is unavailable")
+    
+    started = time.perf_counter()
+    outcome = 'cancelled'
+    recorder = get_recorder()
+    seen = [] if recorder is not None else None
+    error = ''
+    try:
+        with zowe_scheduler.slot(fair_key_for(identity)):
+            ZOWE_INFLIGHT.inc(mode='sync')
+            try:
+                backend = get_backend()
+                if backend is not None:
+                    lines = backend.stream(cmd_list)
+                else:
+                    lines = stream_process(cmd_list, timeout, request_socket())
+                for line in lines:
+                    if seen is not None:
+                        seen.append(line)
+                    yield line
+                outcome = 'ok'
+                breaker.success()
+            except TimeoutError as e:
+                outcome = 'timeout'
+                error = str(e)
+                breaker.failure()
+                raise
+            except ClientDisconnected:
+                raise
+            except Exception as e:
+                outcome = 'error'
+                error = str(e)
+                if is_transient(ZoweResult(1, '', str(e))):
+                    breaker.failure()
+                else:
+                    breaker.success()
+                raise
+            finally:
+                ZOWE_INFLIGHT.dec(mode='sync')
+                if seen is not None:
+                    # Replayed through ZoweBackend.stream, which splits stdout back into lines
+                    returncode = {'ok': 0, 'cancelled': 0, 'timeout': TIMEOUT_RETURNCODE}.get(outcome, 1)
+                    recorder.record(cmd_list, ZoweResult(returncode, ''.join(f"{line}\n" for line in seen), error),
+                                    time.perf_counter() - started, partial=outcome == 'cancelled')
+    finally:
+        if outcome == 'cancelled':
+            # Stopped by the caller (result cap, disconnect): says nothing about the target
+            breaker.abandon()
+        ZOWE_COMMAND_DURATION.observe(time.perf_counter() - started, family=family, outcome=outcome)
+
+
+def request_socket():
+    if not has_request_context():
+        return None
+    return request.environ.get('werkzeug.socket') or request.environ.get('gunicorn.socket')
+
+
+def execute_zowe(cmd_list, family):
+    """One zowe invocation with metrics, tracing, recording and a deadline."""
+    started = time.perf_counter()
+    ZOWE_INFLIGHT.inc(mode='sync')
+    with start_span(f"zowe {family}", **{"zowe.family": family, "zowe.command": ' '.join(cmd_list)}) as span:
+        try:
+            backend = get_backend()
+            if backend is not None:
+                result = backend.execute(cmd_list)
+            else:
+                result = run_process(cmd_list, timeout_for(family), request_socket())
+        except ClientDisconnected:
+            ZOWE_COMMAND_DURATION.observe(time.perf_counter() - started, family=family, outcome='cancelled')
+            raise
+        finally:
+            ZOWE_INFLIGHT.dec(mode='sync')
+        span.set_attribute("zowe.returncode", result.returncode)
+        span.set_attribute("zowe.stdout_bytes", len(result.stdout))
+    elapsed = time.perf_counter() - started
+    outcome = 'ok' if result.returncode == 0 else ('timeout' if result.returncode == TIMEOUT_RETURNCODE else 'error')
+    ZOWE_COMMAND_DURATION.observe(elapsed, family=family, outcome=outcome)
+    recorder = get_recorder()
+    if recorder is not None:
+        recorder.record(cmd_list, result, elapsed)
     
     print(f"Return code: {result.returncode}")
     print(f"stdout: {result.stdout[:200]}")
     
     if result.returncode != 0:
         print(f"stderr: {result.stderr}")
-        raise Exception(result.stderr)
     
-    return result.stdout
+    return result
+
+
+def ndjson(record):
+    """One line of a streamed application/x-ndjson response."""
+    return json.dumps(record) + '\n'
+
+
+def sse(event, data):
+    """One event of a text/event-stream response."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def load_json(output, source):
+    with start_span("json.parse", **{"json.source": source, "json.bytes": len(output)}):
+        return json.loads(output)
+
+
+def jobs_list_cmd(owner='*', prefix='*'):
+    # --exec-data adds exec-ended, which places completions at their real end time
+    cmd = f'zowe jobs list jobs --owner {owner} --exec-data --rfj'
+    if prefix != '*':
+        cmd += f' --prefix {prefix}'
+    return cmd
+
+
+def jobs_key(owner='*', prefix='*'):
+    # JES only shows a user the jobs it may see, so snapshots are kept per identity
+    return (current_identity().name, owner, prefix)
+
+
+def refresh_jobs(owner='*', prefix='*'):
+    """Job list for (owner, prefix) from the shared snapshot store, refetched when stale."""
+    def fetch():
+        cmd = jobs_list_cmd(owner, prefix)
+        print(f"Listing jobs with command: {cmd}")
+        return parse_jobs_output(run_zowe(cmd))
+    return job_store.refresh(jobs_key(owner, prefix), fetch)
+
+
+def catalog_key(pattern):
+    return f"{current_identity().name}\x00{pattern}"
+
+
+def list_catalog(pattern):
+    """`zowe files list data-set` output for a pattern, cached per identity."""
+    return catalog_cache.get_or_load(catalog_key(pattern), lambda: run_zowe(f'zowe files list data-set "{pattern}"'))
+
+
+def spool_key(jobid, part):
+    # Job id first, so a purge drops every identity's copy at once
+    return f"{jobid}\x00{current_identity().name}\x00{part}"
+
+
+def job_finished(jobid):
+    """True once a status call or this worker's job list saw the job in OUTPUT."""
+    if spool_cache.get(spool_key(jobid, 'status')) is not None:
+        return True
+    job = job_store.find_job(jobid)
+    return job is not None and job.get('status') == 'OUTPUT'
+
+
+def remember_job_output(jobid, part, output, finished=None):
+    """Keep a finished job's status, spool list or spool file in spool_cache."""
+    if finished is None:
+        finished = job_finished(jobid)
+    if finished and len(output) <= SPOOL_CACHE_MAX_BYTES:
+        spool_cache.set(spool_key(jobid, part), output)
+
+
+def job_output(jobid, part, cmd, finished=None):
+    """run_zowe through spool_cache; finished(output) decides for the status call itself."""
+    output = spool_cache.get(spool_key(jobid, part))
+    if output is None:
+        output = run_zowe(cmd)
+        remember_job_output(jobid, part, output, finished(output) if finished else None)
+    return output
+
+
+def status_finished(output):
+    return load_json(output, 'job_status').get('data', {}).get('status') == 'OUTPUT'
+
+
+def peek_job_status(jobid):
+    """A finished job's status entry if the caches already know it, else None.
+
+    The job list snapshots and a status call by any worker both count, so a
+    watch ends without polling once someone else saw the job finish.
+    """
+    output = spool_cache.get(spool_key(jobid, 'status'))
+    if output is not None:
+        return load_json(output, 'job_status').get('data', {})
+    job = job_store.find_job(jobid)
+    if job is not None and job.get('status') == 'OUTPUT':
+        return job
+    return None
+
+
+def poll_job_status(jobid):
+    """The job's status entry: from the caches when finished, else one status call."""
+    job = peek_job_status(jobid)
+    if job is not None:
+        return job
+    output = job_output(jobid, 'status', f'zowe jobs view job-status-by-jobid {jobid} --rfj',
+                        finished=status_finished)
+    return load_json(output, 'job_status').get('data', {})
+
+
+def spool_lines(jobid, spool_id):
+    # A spool file someone already opened is in spool_cache; others are streamed
+    cached = spool_cache.get(spool_key(jobid, str(spool_id)))
+    if cached is not None:
+        return iter(cached.splitlines())
+    return stream_zowe(f'zowe jobs view spool-file-by-id {jobid} {spool_id}', timeout_for('spool_view'))
+
+
+def job_steps(jobid, spool_files):
+    """Steps of a finished job parsed from its JES system files, kept in spool_cache.
+
+    Returns [] when the files cannot be read, without caching that.
+    """
+    key = spool_key(jobid, 'steps')
+    steps = spool_cache.get(key)
+    if steps is not None:
+        return steps
+    files = [(f['ddname'], f['id']) for f in spool_files if f.get('ddname') in SYSTEM_DDNAMES]
+    try:
+        with start_span("spool.parse_steps", **{"job.id": jobid, "spool.files": len(files)}):
+            steps = parse_steps((ddname, spool_lines(jobid, spool_id)) for ddname, spool_id in files)
+    except Exception as e:
+        print(f"Could not parse steps of {jobid}: {e}")
+        return []
+    spool_cache.set(key, steps)
+    return steps
+
+
+def uss_find_cmd(path, names=(), kind='', min_size=None, max_size=None,
+                 newer_than=None, older_than=None, max_depth=None):
+    """`zowe zos-uss issue ssh` running a single find; every operand is shell-quoted."""
+    args = ['find', path]
+    if max_depth is not None:
+        # z/OS find: -level n descends at most n directories below the start
+        args += ['-level', str(max(0, max_depth - 1))]
+    if names:
+        args.append('(')
+        for i, name in enumerate(names):
+            args += (['-o'] if i else []) + ['-name', name]
+        args.append(')')
+    if kind:
+        args += ['-type', kind]
+    if min_size:
+        args += ['-size', f'+{min_size - 1}c']
+    if max_size is not None:
+        args += ['-size', f'-{max_size + 1}c']
+    if newer_than is not None:
+        args += ['-mtime', f'-{newer_than}']
+    if older_than is not None:
+        args += ['-mtime', f'+{older_than}']
+    # Permission errors come back in-band and are reported as warnings. find then
+    # exits 1 although every readable match was printed; only 2+ is a failure
+    remote = ' '.join(shlex.quote(arg) for arg in args) + ' 2>&1; [ $? -le 1 ]'
+    return ['zowe', 'zos-uss', 'issue', 'ssh', remote]
+
+
+def data_set_target(dataset, member=''):
+    return f"{dataset}({member})" if member else dataset
+
+
+def view_data_set_cmd(dataset, member='', offset=None, limit=None):
+    cmd = f'zowe files view data-set "{data_set_target(dataset, member)}"'
+    if offset is not None:
+        # z/OSMF record range: first record (0-based), number of records
+        cmd += f' --range "{offset},{limit}"'
+    return cmd
+
+
+def read_content(target, cmd):
+    """(text, cached) for a member, data set or USS file, through content_cache."""
+    # Target first so a save can drop every identity's copy by prefix
+    key = f"{target}\x00{current_identity().name}"
+    content = content_cache.get(key)
+    if content is not None:
+        return content, True
+    content = run_zowe(cmd)
+    if len(content) <= CONTENT_CACHE_MAX_BYTES:
+        content_cache.set(key, content)
+    return content, False
+
+
+def read_data_set(dataset, member=''):
+    return read_content(data_set_target(dataset, member).upper(), view_data_set_cmd(dataset, member))
+
+
+def read_uss_file(path):
+    return read_content(path, f'zowe files view uss-file "{path}"')
+
+
+def parse_content_ref(ref):
+    """A batch reference: "HLQ.LIB(MEMBER)", "HLQ.SEQ", "/u/path" or the same as a dict."""
+    if isinstance(ref, dict):
+        if ref.get('path'):
+            ref = str(ref['path'])
+        else:
+            ref = data_set_target(str(ref.get('dataset', '')).strip(), str(ref.get('member', '') or '').strip())
+    if not isinstance(ref, str) or not ref.strip():
+        raise ValueError(f"Invalid content reference: {ref!r}")
+    ref = ref.strip()
+    if ref.startswith('/'):
+        return {"ref": ref, "kind": "uss", "path": ref}
+    target = ref.upper()
+    dataset, member = target, ''
+    if target.endswith(')') and '(' in target:
+        dataset, member = target[:-1].split('(', 1)
+    if not DSN_PATTERN.match(dataset) or len(dataset) > 44 or (member and not MEMBER_PATTERN.match(member)):
+        raise ValueError(f"Invalid data set reference: {ref}")
+    return {"ref": ref, "kind": "dataset", "dataset": dataset, "member": member}
+
+
+def data_set_attributes(dataset):
+    """Catalog attributes (dsorg, recfm, lrecl, ...) of one data set."""
+    output = run_zowe(f'zowe files list data-set "{dataset}" --attributes --rfj')
+    items = load_json(output, 'dataset_attributes').get('data', {}).get('apiResponse', {}).get('items', [])
+    for item in items:
+        if item.get('dsname', '').upper() == dataset.upper():
+            return item
+    raise Exception(f"Data set {dataset} not found")
+
+
+def record_count_key(target):
+    # Target first, so a save drops every identity's count at once
+    return f"{target}\x00{current_identity().name}"
+
+
+def record_count_cmd(target):
+    # A pipeline exits with wc's status; cat's comes back through fd 3, so a failed read fails the command
+    remote = f"exec 4>&1; rc=$({{ {{ cat \"//'{target}'\"; echo $? >&3; }} | wc -l >&4; }} 3>&1); exit $rc"
+    return ['zowe', 'zos-uss', 'issue', 'ssh', remote]
+
+
+def count_records(dataset, member=''):
+    """Exact record count, counted on the mainframe by `cat | wc -l` over SSH, cached per identity."""
+    target = data_set_target(dataset, member).upper()
+    key = record_count_key(target)
+    count = record_counts.get(key)
+    if count is None:
+        lines = [line.strip() for line in stream_zowe(record_count_cmd(target), RECORD_COUNT_TIMEOUT)]
+        counted = [line for line in lines if line.isdigit()]
+        if len(counted) != 1:
+            raise Exception(' '.join(lines) or f"Could not count the records of {target}")
+        count = int(counted[0])
+        record_counts.set(key, count)
+    return count
+
+
+def parse_jobs_output(output):
+    try:
+        data = load_json(output, 'jobs_list')
+        return data.get('data', [])
+    except json.JSONDecodeError:
+        # Fallback: parse table format
+        jobs_list = []
+        for line in output.splitlines():
+            if line.strip() and not line.startswith('JOBID'):
+                parts = line.split()
+                if len(parts) >= 4:
+                    jobs_list.append({
+                        "jobid": parts[0],
+                        "jobname": parts[1],
+                        "owner": parts[2],
+                        "status": parts[3],
+                        "retcode": parts[4] if len(parts) > 4 else None,
+                        "class": parts[5] if len(parts) > 5 else "A"
+                    })
+        return jobs_list
+
+
+def parse_dataset_list(output):
+    datasets = []
+    for line in output.splitlines():
+        line = line.strip()
+        if line and not line.startswith('Data Set'):
+            parts = line.split()
+            if parts:
+                ds_name = parts[0]
+                ds_type = "PDS" if any(x in ds_name.upper() for x in ['JCL', 'SOURCE', 'LOAD', 'LIB']) else "PS"
+                datasets.append({
+                    "name": ds_name,
+                    "type": ds_type,
+                    "members": 0
+                })
+    return datasets
+
+
+def member_list_cmd(dataset):
+    # Without attributes the CLI prints bare names, which says nothing about changes
+    return f'zowe files list all-members "{dataset}" --attributes --rfj'
+
+
+def parse_members(output):
+    """Members from `zowe files list all-members --attributes --rfj` (or a plain name list).
+
+    "stamp" changes whenever the member does: ISPF statistics give the change
+    date, time and version.mod; load modules and members without statistics
+    only have their name, so they keep an empty stamp.
+    """
+    if output.lstrip().startswith('{'):
+        members = []
+        for item in json.loads(output).get('data', {}).get('apiResponse', {}).get('items', []):
+            modified = ' '.join(part for part in (item.get('m4date'), item.get('mtime')) if part)
+            version = f"{item['vers']}.{item['mod']}" if item.get('vers') is not None else ''
+            changed = f"{modified}:{item['msec']}" if modified and item.get('msec') else modified
+            members.append({
+                "name": item.get('member', ''),
+                "created": item.get('c4date') or "",
+                "modified": modified,
+                "version": version,
+                "stamp": ' '.join(part for part in (changed, version) if part)
+            })
+        return members
+    members = []
+    for line in output.splitlines():
+        line = line.strip()
+        if line and not line.startswith('Name'):
+            parts = line.split()
+            if parts:
+                members.append({
+                    "name": parts[0],
+                    "created": parts[1] if len(parts) > 1 else "",
+                    "modified": parts[2] if len(parts) > 2 else ""
+                })
+    return members
+
+
+def parse_uss_listing(output):
+    files = []
+    lines = [l.strip() for l in output.splitlines() if l.strip()]
+    
+    for line in lines:
+        if line in ['.', '..']:
+            continue
+        
+        is_directory = line.endswith('/')
+        name = line.rstrip('/')
+        
+        if not name:
+            continue
+        
+        files.append({
+            "name": name,
+            "type": "directory" if is_directory else "file",
+            "permissions": "drwxr-xr-x" if is_directory else "-rw-r--r--",
+            "size": 4096 if is_directory else 0,
+            "modified": "Unknown"
+        })
+    return files
 
 
 def init_routes(app):
     
+    @app.before_request
+    def bind_identity():
+        g.proxy_user = request.headers.get(ZOWE_IDENTITY_HEADER) if ZOWE_IDENTITY_HEADER else None
+        # Without SECRET_KEY there is no session to read a choice from
+        chosen = session.get(SESSION_KEY) if current_app.secret_key else None
+        g.identity_token = set_identity(resolve(g.proxy_user, chosen))
+    
+    @app.teardown_request
+    def unbind_identity(exc):
+        token = g.pop('identity_token', None)
+        if token is not None:
+            reset_identity(token)
+    
+    @app.context_processor
+    def inject_identity():
+        return {"zos_session": identity_info(current_identity(), g.get('proxy_user'))}
+    
+    @app.after_request
+    def flag_stale_response(response):
+        # Set by flag_stale when a failing mainframe target was answered from cache
+        if g.get('zowe_stale'):
+            response.headers['X-Zowe-Stale'] = '1'
+        # Set by run_zowe when the user's share of mainframe capacity stayed taken
+        busy = g.get('zowe_busy')
+        if busy is not None and response.status_code == 500:
+            response.status_code = 503 if isinstance(busy, QueueTimeoutError) else 429
+            response.headers['Retry-After'] = str(busy.retry_after)
+        return response
+    
     @app.route("/")
     def index():
         return render_template("index.html")
@@ -70,19 +707,78 @@ def init_routes(app):
         return jsonify({
             "status": "ok",
             "mock_mode": mock_mode,
-            "zos_user": os.environ.get('ZOS_USER', 'Not set')
+            "zos_user": current_identity().user or 'Not set',
+            "zowe_circuits": breaker_stats(),
+            "job_watches": len(job_watcher.stats())
         })
-        
+
+    @app.route("/api/session", methods=["GET"])
+    def get_session_identity():
+        identity = current_identity()
+        return jsonify({
+            **identity_info(identity, g.get('proxy_user')),
+            "queue": zowe_scheduler.user_status(fair_key_for(identity)),
+            "scheduler": zowe_scheduler.stats()
+        })
+
+    @app.route("/api/session", methods=["POST"])
+    def select_session_profile():
+        try:
+            data = request.get_json() or {}
+            name = (data.get('profile') or '').strip()
+
+            if not current_app.secret_key:
+                return jsonify({"error": "Profile selection needs a session; set SECRET_KEY"}), 503
+
+            identity = lookup(name)
+            if identity is None:
+                return jsonify({"error": f"Unknown Zowe profile: {name}"}), 400
+
+            # Only an authenticated proxy user, and only for their own or allow-listed profiles
+            if not may_use(g.get('proxy_user'), identity.name):
+                return jsonify({"error": f"Not allowed to use Zowe profile {identity.name}"}), 403
+
+            session[SESSION_KEY] = identity.name
+            print(f"Session switched to Zowe profile {identity.name} ({identity.user}) by {g.proxy_user}")
+            return jsonify({"success": True, **identity_info(identity, g.proxy_user)})
+
+        except Exception as e:
+            import traceback
+            error_trace = traceback.format_exc()
+            print(f"Error selecting Zowe profile:\n{error_trace}")
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/session", methods=["DELETE"])
+    def clear_session_profile():
+        if current_app.secret_key:
+            session.pop(SESSION_KEY, None)
+        return jsonify({"success": True})
+
     @app.route("/api/activities", methods=["GET"])
     def get_activities():
         try:
             limit = request.args.get('limit', 10, type=int)
-            activities = ActivityLogger.get_recent_activities(limit)
-            
-            return jsonify({
-                "activities": activities,
-                "success": True
-            })
+            since = request.args.get('since', '').strip() or None
+            
+            # The newest id identifies the feed's state; an idle feed answers 304.
+            # ETag and body come from the same load, so they always agree.
+            stored = ActivityLogger.load()
+            latest_id = ActivityLogger.latest_id(stored)
+            etag = f"activities-{latest_id}-{limit}-{since or ''}"
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                activities = ActivityLogger.get_recent_activities(limit, since=since, activities=stored)
+                response = jsonify({
+                    "activities": activities,
+                    "latest_id": latest_id,
+                    "success": True
+                })
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        except ValueError as e:
+            return jsonify({"error": str(e), "activities": []}), 400
         except Exception as e:
             import traceback
             error_trace = traceback.format_exc()
@@ -95,12 +791,12 @@ def init_routes(app):
     @app.route("/api/dashboard", methods=["GET"])
     def dashboard_data():
         try:
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             print(f"=" * 50)
             print(f"MOCK_MODE from config: {mock_mode}")
             print(f"MOCK_MODE from env: {os.environ.get('MOCK_MODE')}")
-            print(f"ZOS_USER from env: {os.environ.get('ZOS_USER')}")
+            print(f"ZOS_USER for this session: {current_identity().user}")
             print(f"=" * 50)
             
             if mock_mode:
@@ -113,8 +809,9 @@ def init_routes(app):
                     "mock": True
                 })
             
-            user = os.environ.get("ZOS_USER")
-            profile = os.environ.get("ZOWE_PROFILE", user)
+            identity = current_identity()
+            user = identity.user
+            profile = identity.zosmf_profile or user
             
             if not user:
                 raise Exception("ZOS_USER environment variable not set")
@@ -122,8 +819,7 @@ def init_routes(app):
             print(f"Fetching data for user: {user}, profile: {profile}")
 
             try:
-                ds_cmd = f'zowe files list data-set "{user}.*"'
-                ds_output = run_zowe(ds_cmd)
+                ds_output = list_catalog(f"{user}.*")
                 lines = [line for line in ds_output.splitlines() if line.strip() and not line.startswith('Data Set')]
                 dataset_count = len(lines)
             except Exception as e:
@@ -131,19 +827,10 @@ def init_routes(app):
                 dataset_count = 0
 
             try:
-                jobs_cmd = f'zowe jobs list jobs --owner * --rfj'
-                print(f"Getting ALL jobs with command: {jobs_cmd}")
-                jobs_output = run_zowe(jobs_cmd)
-                
-                try:
-                    data = json.loads(jobs_output)
-                    jobs_list = data.get('data', [])
-                    jobs_today = len(jobs_list)
-                    print(f"✅ Found {jobs_today} total jobs")
-                except json.JSONDecodeError:
-                    lines = [line for line in jobs_output.splitlines() if line.strip() and not line.startswith('JOBID')]
-                    jobs_today = len(lines)
-                    print(f"✅ Found {jobs_today} total jobs (table format)")
+                midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+                refresh_jobs()
+                jobs_today = job_stats.count_since(midnight)
+                print(f"✅ Found {jobs_today} jobs completed today")
             except Exception as e:
                 print(f"Error getting jobs: {e}")
                 jobs_today = 0
@@ -205,7 +892,7 @@ def init_routes(app):
     @app.route("/api/system-status", methods=["GET"])
     def get_system_status():
         try:
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             print("=" * 50)
             print(f"🔍 System status called - MOCK_MODE: {mock_mode}")
@@ -223,7 +910,7 @@ def init_routes(app):
                     "mock": True
                 })
             
-            user = os.environ.get("ZOS_USER")
+            user = current_identity().user
             
             active_jobs = 0
             jobs_today = 0
@@ -231,23 +918,17 @@ def init_routes(app):
             success_rate = 100.0
             
             try:
-                jobs_cmd = 'zowe jobs list jobs --owner * --rfj'
-                jobs_output = run_zowe(jobs_cmd)
-                data = json.loads(jobs_output)
-                jobs_list = data.get('data', [])
-                
-                active_jobs = len([j for j in jobs_list if j.get('status') in ['ACTIVE', 'INPUT']])
-                
-                jobs_today = len(jobs_list)
+                snapshot = refresh_jobs()
+                active_jobs = snapshot.status_counts.get('ACTIVE', 0) + snapshot.status_counts.get('INPUT', 0)
                 
-                failed_jobs = len([j for j in jobs_list if j.get('retcode') and 
-                                j.get('retcode') != 'CC 0000' and 
-                                j.get('status') == 'OUTPUT'])
+                # Completions come from the rolling statistics, not a rescan of the queue
+                midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+                jobs_today = job_stats.count_since(midnight)
                 
-                completed_jobs = len([j for j in jobs_list if j.get('status') == 'OUTPUT'])
-                if completed_jobs > 0:
-                    successful_jobs = completed_jobs - failed_jobs
-                    success_rate = round((successful_jobs / completed_jobs) * 100, 1)
+                day = job_stats.query('24h')
+                failed_jobs = day['failed']
+                if day['count'] > 0:
+                    success_rate = round(100 - day['failure_rate'], 1)
                 
             except Exception as e:
                 print(f"Error getting job statistics: {e}")
@@ -306,9 +987,7 @@ def init_routes(app):
         try:
             owner = request.args.get('owner', '*').strip()
             prefix = request.args.get('prefix', '*').strip()
-            status = request.args.get('status', '').strip()
-            
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 mock_jobs = [
@@ -338,50 +1017,17 @@ def init_routes(app):
                     }
                 ]
                 
-                if status and status != 'ALL':
-                    mock_jobs = [j for j in mock_jobs if j['status'] == status]
-                
-                return jsonify({
-                    "jobs": mock_jobs,
-                    "mock": True
-                })
-            
-            user = os.environ.get("ZOS_USER")
+                key = ('mock', owner, prefix)
+                job_store.refresh(key, lambda: mock_jobs)
+                code, body = jobs_response(job_store, key, request.args, mock=True)
+                return jsonify(body), code
             
-            cmd = f'zowe jobs list jobs --owner {owner} --rfj'
-            if prefix != '*':
-                cmd += f' --prefix {prefix}'
-            
-            print(f"Listing jobs with command: {cmd}")
-            output = run_zowe(cmd)
-            
-            try:
-                data = json.loads(output)
-                jobs_list = data.get('data', [])
-            except json.JSONDecodeError:
-                # Fallback: parse table format
-                jobs_list = []
-                for line in output.splitlines():
-                    if line.strip() and not line.startswith('JOBID'):
-                        parts = line.split()
-                        if len(parts) >= 4:
-                            jobs_list.append({
-                                "jobid": parts[0],
-                                "jobname": parts[1],
-                                "owner": parts[2],
-                                "status": parts[3],
-                                "retcode": parts[4] if len(parts) > 4 else None,
-                                "class": parts[5] if len(parts) > 5 else "A"
-                            })
-            
-            if status and status != 'ALL':
-                jobs_list = [j for j in jobs_list if j.get('status') == status]
-            
-            return jsonify({
-                "jobs": jobs_list,
-                "mock": False
-            })
+            refresh_jobs(owner, prefix)
+            code, body = jobs_response(job_store, jobs_key(owner, prefix), request.args)
+            return jsonify(body), code
             
+        except ValueError as e:
+            return jsonify({"error": str(e), "jobs": []}), 400
         except Exception as e:
             import traceback
             error_trace = traceback.format_exc()
@@ -391,10 +1037,47 @@ def init_routes(app):
                 "jobs": []
             }), 500
 
+    @app.route("/api/jobs/stats", methods=["GET"])
+    def get_job_stats():
+        try:
+            window = request.args.get('window', '24h').strip()
+            group_by = request.args.get('group_by', 'all').strip()
+            top = request.args.get('top', 20, type=int)
+            points = request.args.get('points', 0, type=int)
+            
+            mock_mode = static_mock()
+            
+            if mock_mode:
+                return jsonify({
+                    "window": window,
+                    "group_by": group_by,
+                    "count": 156,
+                    "failed": 9,
+                    "failure_rate": 5.8,
+                    "rc": {"CC 0000": 147, "CC 0008": 5, "ABEND S0C7": 4},
+                    "groups": [],
+                    "mock": True
+                })
+            
+            refresh_jobs()
+            stats = job_stats.query(window, group_by, top)
+            if points > 0:
+                stats["series"] = job_stats.series(window, points)
+            stats["mock"] = False
+            return jsonify(stats)
+            
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            import traceback
+            error_trace = traceback.format_exc()
+            print(f"Error getting job statistics:\n{error_trace}")
+            return jsonify({"error": str(e)}), 500
+
     @app.route("/api/jobs/<jobid>", methods=["GET"])
     def get_job_details(jobid):
         try:
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 return jsonify({
@@ -444,13 +1127,14 @@ def init_routes(app):
             
             cmd = f'zowe jobs view job-status-by-jobid {jobid} --rfj'
             print(f"Getting job details: {cmd}")
-            output = run_zowe(cmd)
+            output = job_output(jobid, 'status', cmd, finished=status_finished)
             
-            job_data = json.loads(output)
+            job_data = load_json(output, 'job_status')
             
             spool_cmd = f'zowe jobs list spool-files-by-jobid {jobid} --rfj'
-            spool_output = run_zowe(spool_cmd)
-            spool_data = json.loads(spool_output)
+            spool_output = job_output(jobid, 'spool', spool_cmd)
+            spool_data = load_json(spool_output, 'spool_list')
+            finished = job_data.get('data', {}).get('status') == 'OUTPUT'
             
             return jsonify({
                 "jobid": job_data.get('data', {}).get('jobid', jobid),
@@ -460,7 +1144,7 @@ def init_routes(app):
                 "retcode": job_data.get('data', {}).get('retcode'),
                 "class": job_data.get('data', {}).get('class', 'A'),
                 "subsystem": job_data.get('data', {}).get('subsystem'),
-                "steps": [],  # Would need additional parsing
+                "steps": job_steps(jobid, spool_data.get('data', [])) if finished else [],
                 "spool": spool_data.get('data', []),
                 "mock": False
             })
@@ -471,10 +1155,65 @@ def init_routes(app):
             print(f"Error getting job details:\n{error_trace}")
             return jsonify({"error": str(e)}), 500
 
+    @app.route("/api/jobs/<jobid>/wait", methods=["GET"])
+    def wait_for_job(jobid):
+        """Long-poll until the job finished or its status changed; SSE with Accept: text/event-stream."""
+        try:
+            mock_mode = static_mock()
+            
+            if mock_mode:
+                return jsonify({
+                    "jobid": jobid,
+                    "jobname": "TESTJOB1",
+                    "status": "OUTPUT",
+                    "retcode": "CC 0000",
+                    "done": True,
+                    "error": None,
+                    "polls": 0,
+                    "mock": True
+                })
+            
+            try:
+                timeout = min(float(request.args.get('timeout', JOB_WAIT_TIMEOUT)), JOB_WAIT_MAX)
+            except ValueError:
+                return jsonify({"error": "timeout must be a number of seconds"}), 400
+            status = request.args.get('status') or None
+            
+            identity = current_identity()
+            jobid = jobid.upper()
+            watch = job_watcher.watch(
+                (identity.name, jobid), jobid,
+                lambda: poll_job_status(jobid), lambda: peek_job_status(jobid), identity
+            )
+            
+            if 'text/event-stream' in request.headers.get('Accept', ''):
+                def generate():
+                    for state in watch.events(JOB_EVENTS_HEARTBEAT, JOB_EVENTS_MAX):
+                        if state is None:
+                            yield ": keepalive\n\n"
+                        else:
+                            yield sse('done' if state["done"] else 'status', dict(state, mock=False))
+                
+                return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+            
+            state = watch.wait(max(0.0, timeout), status)
+            if state["error"]:
+                return jsonify({"error": state["error"]}), 500
+            return jsonify(dict(state, mock=False))
+            
+        except WatchLimitError as e:
+            return jsonify({"error": str(e)}), 503
+        except Exception as e:
+            import traceback
+            error_trace = traceback.format_exc()
+            print(f"Error waiting for job:\n{error_trace}")
+            return jsonify({"error": str(e)}), 500
+
     @app.route("/api/jobs/<jobid>", methods=["DELETE"])
     def purge_job(jobid):
         try:
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 print(f"MOCK: Purging job {jobid}")
@@ -496,6 +1235,8 @@ def init_routes(app):
             cmd = f'zowe jobs delete job {jobid}'
             print(f"Purging job: {cmd}")
             output = run_zowe(cmd)
+            job_store.expire()
+            spool_cache.invalidate_prefix(f"{jobid}\x00")
             
             ActivityLogger.log_activity(
                 activity_type="danger",
@@ -522,7 +1263,7 @@ def init_routes(app):
     @app.route("/api/jobs/<jobid>/spool/<int:spool_id>", methods=["GET"])
     def get_spool_content(jobid, spool_id):
         try:
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 return jsonify({
@@ -532,7 +1273,7 @@ def init_routes(app):
             
             cmd = f'zowe jobs view spool-file-by-id {jobid} {spool_id}'
             print(f"Getting spool content: {cmd}")
-            content = run_zowe(cmd)
+            content = job_output(jobid, str(spool_id), cmd)
             
             return jsonify({
                 "content": content,
@@ -553,7 +1294,7 @@ def init_routes(app):
             if not hlq:
                 return jsonify({"error": "HLQ parameter is required"}), 400
             
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 return jsonify({
@@ -567,23 +1308,9 @@ def init_routes(app):
                     "mock": True
                 })
             
-            user = os.environ.get("ZOS_USER")
-            cmd = f'zowe files list data-set "{hlq}.*"'
-            output = run_zowe(cmd)
-            
-            datasets = []
-            for line in output.splitlines():
-                line = line.strip()
-                if line and not line.startswith('Data Set'):
-                    parts = line.split()
-                    if parts:
-                        ds_name = parts[0]
-                        ds_type = "PDS" if any(x in ds_name.upper() for x in ['JCL', 'SOURCE', 'LOAD', 'LIB']) else "PS"
-                        datasets.append({
-                            "name": ds_name,
-                            "type": ds_type,
-                            "members": 0
-                        })
+            user = current_identity().user
+            output = list_catalog(f"{hlq}.*")
+            datasets = parse_dataset_list(output)
             
             return jsonify({
                 "datasets": datasets,
@@ -604,7 +1331,7 @@ def init_routes(app):
             if not dataset:
                 return jsonify({"error": "Dataset parameter is required"}), 400
             
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 return jsonify({
@@ -617,20 +1344,8 @@ def init_routes(app):
                     "mock": True
                 })
             
-            cmd = f'zowe files list all-members "{dataset}"'
-            output = run_zowe(cmd)
-            
-            members = []
-            for line in output.splitlines():
-                line = line.strip()
-                if line and not line.startswith('Name'):
-                    parts = line.split()
-                    if parts:
-                        members.append({
-                            "name": parts[0],
-                            "created": parts[1] if len(parts) > 1 else "",
-                            "modified": parts[2] if len(parts) > 2 else ""
-                        })
+            output = run_zowe(member_list_cmd(dataset))
+            members = parse_members(output)
             
             return jsonify({
                 "members": members,
@@ -648,32 +1363,85 @@ def init_routes(app):
         try:
             dataset = request.args.get('dataset', '').strip()
             member = request.args.get('member', '').strip()
+            stream = request.args.get('stream', 'false').lower() == 'true'
+            paged = 'offset' in request.args or 'limit' in request.args
             
             if not dataset:
                 return jsonify({"error": "Dataset parameter is required"}), 400
+            try:
+                offset = max(0, int(request.args.get('offset', 0)))
+                limit = max(1, min(int(request.args.get('limit', CONTENT_PAGE_SIZE)), CONTENT_PAGE_MAX))
+            except ValueError:
+                return jsonify({"error": "offset and limit must be integers"}), 400
             
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
-                return jsonify({
-                    "content": f"""//TESTJOB JOB (ACCT),'TEST JOB',CLASS=A,MSGCLASS=H
+                mock_content = f"""//TESTJOB JOB (ACCT),'TEST JOB',CLASS=A,MSGCLASS=H
 //STEP1   EXEC PGM=IEFBR14
 //DD1     DD DSN={dataset},DISP=SHR
 //*
 //* This is a test job
-//*""",
+//*"""
+                if stream:
+                    return Response(mock_content + '\n', mimetype='text/plain')
+                if paged:
+                    records = mock_content.splitlines()[offset:offset + limit]
+                    return jsonify({
+                        "records": records,
+                        "offset": offset,
+                        "limit": limit,
+                        "returned": len(records),
+                        "has_more": False,
+                        "total": len(mock_content.splitlines()),
+                        "mock": True
+                    })
+                return jsonify({
+                    "content": mock_content,
                     "mock": True
                 })
             
-            if member:
-                cmd = f'zowe files view data-set "{dataset}({member})"'
-            else:
-                cmd = f'zowe files view data-set "{dataset}"'
+            if stream:
+                # Records are passed through as the CLI prints them; the worker never holds the data set
+                cmd = view_data_set_cmd(dataset, member, offset, limit) if paged else view_data_set_cmd(dataset, member)
+                
+                lines = stream_zowe(cmd, CONTENT_STREAM_TIMEOUT)
+                # A failure before the first record (unknown data set, open circuit) still gets a JSON error
+                first = next(lines, None)
+                
+                def generate():
+                    try:
+                        if first is not None:
+                            yield first + '\n'
+                        for line in lines:
+                            yield line + '\n'
+                    except Exception as e:
+                        # Re-raised so the server aborts the chunked response instead of ending it
+                        # cleanly; the client sees a truncated transfer, not a short data set
+                        print(f"Error streaming {data_set_target(dataset, member)}: {e}")
+                        raise
+                    finally:
+                        lines.close()
+                
+                return Response(stream_with_context(generate()), mimetype='text/plain')
             
-            content = run_zowe(cmd)
+            if paged:
+                records = run_zowe(view_data_set_cmd(dataset, member, offset, limit)).splitlines()
+                return jsonify({
+                    "records": records,
+                    "offset": offset,
+                    "limit": limit,
+                    "returned": len(records),
+                    "has_more": len(records) == limit,
+                    "total": record_counts.get(record_count_key(data_set_target(dataset, member).upper())),
+                    "mock": False
+                })
+            
+            content, cached = read_data_set(dataset, member)
             
             return jsonify({
                 "content": content,
+                "cached": cached,
                 "mock": False
             })
             
@@ -683,6 +1451,314 @@ def init_routes(app):
             print(f"Error getting content:\n{error_trace}")
             return jsonify({"error": str(e)}), 500
 
+    @app.route("/api/content/batch", methods=["POST"])
+    def get_content_batch():
+        try:
+            data = request.get_json(silent=True) or {}
+            refs = data.get('items')
+            
+            if not isinstance(refs, list) or not refs:
+                return jsonify({"error": "items must be a non-empty list"}), 400
+            if len(refs) > CONTENT_BATCH_MAX_ITEMS:
+                return jsonify({"error": f"At most {CONTENT_BATCH_MAX_ITEMS} items per request"}), 400
+            
+            items = []
+            seen = set()
+            for ref in refs:
+                try:
+                    item = parse_content_ref(ref)
+                except ValueError as e:
+                    return jsonify({"error": str(e)}), 400
+                if item["ref"] not in seen:
+                    seen.add(item["ref"])
+                    items.append(item)
+            
+            mock_mode = static_mock()
+            
+            if mock_mode:
+                mock_lines = [
+                    {"type": "item", "index": i, "ref": item["ref"], "kind": item["kind"], "status": "ok",
+                     "content": f"//* Mock content of {item['ref']}\n", "cached": False}
+                    for i, item in enumerate(items)
+                ]
+                mock_lines.append({"type": "done", "items": len(items), "ok": len(items), "failed": 0,
+                                   "elapsed_ms": 0, "mock": True})
+                return Response(''.join(ndjson(line) for line in mock_lines), mimetype='application/x-ndjson')
+            
+            def fetch(item):
+                if item["kind"] == "uss":
+                    return read_uss_file(item["path"])
+                return read_data_set(item["dataset"], item["member"])
+            
+            def generate():
+                started = time.perf_counter()
+                ok = failed = 0
+                pool = ThreadPoolExecutor(max_workers=min(CONTENT_BATCH_WORKERS, len(items)),
+                                          thread_name_prefix="content-batch")
+                try:
+                    # Each fetch runs in a copy of the request's context, so it keeps the
+                    # caller's profile, fair-queue key and disconnect detection
+                    futures = {pool.submit(contextvars.copy_context().run, fetch, item): (i, item)
+                               for i, item in enumerate(items)}
+                    for future in as_completed(futures):
+                        index, item = futures[future]
+                        record = {"type": "item", "index": index, "ref": item["ref"], "kind": item["kind"]}
+                        try:
+                            content, cached = future.result()
+                            record.update(status="ok", content=content, cached=cached)
+                            ok += 1
+                        except Exception as e:
+                            record.update(status="error", error=str(e))
+                            failed += 1
+                        yield ndjson(record)
+                finally:
+                    # A disconnected client leaves nothing queued behind
+                    pool.shutdown(wait=False, cancel_futures=True)
+                
+                yield ndjson({
+                    "type": "done",
+                    "items": len(items),
+                    "ok": ok,
+                    "failed": failed,
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "mock": False
+                })
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+            
+        except Exception as e:
+            import traceback
+            error_trace = traceback.format_exc()
+            print(f"Error getting content batch:\n{error_trace}")
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/datasets/content/info", methods=["GET"])
+    def get_content_info():
+        try:
+            dataset = request.args.get('dataset', '').strip().upper()
+            member = request.args.get('member', '').strip().upper()
+            count = request.args.get('count', 'false').lower() == 'true'
+            
+            if not dataset:
+                return jsonify({"error": "Dataset parameter is required"}), 400
+            if not DSN_PATTERN.match(dataset) or len(dataset) > 44:
+                return jsonify({"error": f"Invalid data set name: {dataset}"}), 400
+            if member and not MEMBER_PATTERN.match(member):
+                return jsonify({"error": f"Invalid member name: {member}"}), 400
+            
+            mock_mode = static_mock()
+            
+            if mock_mode:
+                return jsonify({
+                    "dataset": dataset,
+                    "member": member or None,
+                    "dsorg": "PO" if member else "PS",
+                    "recfm": "FB",
+                    "lrecl": 80,
+                    "blksize": 27920,
+                    "volume": "MOCK01",
+                    "used_percent": 1,
+                    "extents": 1,
+                    "records": 6,
+                    "bytes": 480,
+                    "page_size": CONTENT_PAGE_SIZE,
+                    "mock": True
+                })
+            
+            # Listing the attributes also checks the caller can see the data set
+            attributes = data_set_attributes(dataset)
+            lrecl = int(attributes.get('lrecl') or 0) or None
+            records = count_records(dataset, member) if count else \
+                record_counts.get(record_count_key(data_set_target(dataset, member).upper()))
+            
+            return jsonify({
+                "dataset": dataset,
+                "member": member or None,
+                "dsorg": attributes.get('dsorg'),
+                "recfm": attributes.get('recfm'),
+                "lrecl": lrecl,
+                "blksize": int(attributes.get('blksz') or 0) or None,
+                "volume": attributes.get('vol'),
+                "used_percent": int(attributes['used']) if str(attributes.get('used', '')).isdigit() else None,
+                "extents": int(attributes['extx']) if str(attributes.get('extx', '')).isdigit() else None,
+                "records": records,
+                # Exact for fixed-length records, an upper bound for variable-length ones
+                "bytes": records * lrecl if records is not None and lrecl else None,
+                "page_size": CONTENT_PAGE_SIZE,
+                "mock": False
+            })
+            
+        except Exception as e:
+            import traceback
+            error_trace = traceback.format_exc()
+            print(f"Error getting content info:\n{error_trace}")
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/datasets/download", methods=["GET"])
+    def download_dataset():
+        try:
+            dataset = request.args.get('dataset', '').strip().upper()
+            member = request.args.get('member', '').strip().upper()
+            mode = request.args.get('mode', 'text').lower()
+            trim = request.args.get('trim', 'true').lower() != 'false'
+            
+            if not dataset:
+                return jsonify({"error": "Dataset parameter is required"}), 400
+            if not DSN_PATTERN.match(dataset) or len(dataset) > 44:
+                return jsonify({"error": f"Invalid data set name: {dataset}"}), 400
+            if member and not MEMBER_PATTERN.match(member):
+                return jsonify({"error": f"Invalid member name: {member}"}), 400
+            if mode not in DOWNLOAD_MODES:
+                return jsonify({"error": f"mode must be one of {', '.join(DOWNLOAD_MODES)}"}), 400
+            try:
+                codepage = codepage_name(request.args.get('codepage', DATASET_CODEPAGE))
+            except ValueError as e:
+                return jsonify({"error": str(e), "codepages": CODEPAGES}), 400
+            
+            target = data_set_target(dataset, member)
+            filename = f"{dataset}.{member}" if member else dataset
+            filename += '.txt' if mode == 'text' else '.bin'
+            
+            mock_mode = static_mock()
+            
+            if mock_mode:
+                content = f"Mock content for {target}\nThis would be the actual data set content.\n"
+                headers = {'Content-Disposition': f'attachment; filename={filename}'}
+                if mode == 'text':
+                    return Response(content, mimetype='text/plain', headers=headers)
+                # Untranslated like the real transfer: EBCDIC records, length-prefixed in record mode
+                records = [encode(line, codepage) for line in content.splitlines()]
+                if mode == 'record':
+                    records = [RECORD_PREFIX.pack(len(record)) + record for record in records]
+                return Response(b''.join(records), mimetype='application/octet-stream', headers=headers)
+            
+            import tempfile
+            import shutil
+            
+            attributes = data_set_attributes(dataset)
+            recfm = (attributes.get('recfm') or '').upper()
+            lrecl = int(attributes.get('lrecl') or 0)
+            # Binary mode keeps FB records LRECL bytes apart; VB and U records need
+            # record mode's length prefixes to be told apart
+            fixed = recfm.startswith('F') and lrecl > 0
+            transfer = 'binary' if mode == 'binary' or (mode == 'text' and fixed) else 'record'
+            
+            tmp_dir = tempfile.mkdtemp(prefix='mfcc-download-')
+            local_path = os.path.join(tmp_dir, 'data')
+            try:
+                cmd = f'zowe files download data-set "{target}" --{transfer} --file "{local_path}"'
+                print(f"Downloading data set: {cmd}")
+                run_zowe(cmd)
+                if not os.path.exists(local_path):
+                    raise Exception(f"Downloading {target} produced no file")
+                size = os.path.getsize(local_path)
+            except Exception:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+            
+            def chunks():
+                with open(local_path, 'rb') as f:
+                    while True:
+                        chunk = f.read(DATASET_DOWNLOAD_CHUNK)
+                        if not chunk:
+                            return
+                        yield chunk
+            
+            headers = {
+                'Content-Disposition': f'attachment; filename={filename}',
+                'X-Dataset-Recfm': recfm,
+                'X-Dataset-Lrecl': str(lrecl)
+            }
+            if mode == 'text':
+                records = fixed_records(chunks(), lrecl) if transfer == 'binary' else prefixed_records(chunks())
+                response = Response(records_to_text(records, codepage, trim),
+                                    mimetype='text/plain', headers=headers)
+            else:
+                headers['Content-Length'] = str(size)
+                response = Response(chunks(), mimetype='application/octet-stream', headers=headers)
+            response.call_on_close(lambda: shutil.rmtree(tmp_dir, ignore_errors=True))
+            return response
+            
+        except Exception as e:
+            import traceback
+            error_trace = traceback.format_exc()
+            print(f"Error downloading data set:\n{error_trace}")
+            return jsonify({"error": str(e)}), 500
+
+    @app.route("/api/datasets/search", methods=["GET"])
+    def search_datasets():
+        try:
+            query = request.args.get('q', '').strip()
+            libraries = [name.strip().upper() for name in request.args.get('libraries', '').split(',') if name.strip()]
+            context = max(0, min(request.args.get('context', 2, type=int), 10))
+            limit = max(1, min(request.args.get('limit', 200, type=int), PDS_SEARCH_MAX_RESULTS))
+            
+            if not query:
+                return jsonify({"error": "q parameter is required"}), 400
+            if not libraries:
+                return jsonify({"error": "libraries parameter is required"}), 400
+            for library in libraries:
+                if not DSN_PATTERN.match(library) or len(library) > 44:
+                    return jsonify({"error": f"Invalid data set name: {library}"}), 400
+            
+            terms = parse_query(query)
+            if not terms:
+                return jsonify({"error": "Query has no searchable words"}), 400
+            
+            mock_mode = static_mock()
+            
+            if mock_mode:
+                mock_lines = [
+                    {"type": "library", "library": libraries[0], "members": 4, "fetched": 0, "cached": True},
+                    {"type": "match", "library": libraries[0], "member": "MEMBER01", "line": 2,
+                     "text": f"           COPY {terms[0].rstrip('*')}.",
+                     "before": ["       WORKING-STORAGE SECTION."], "after": ["       PROCEDURE DIVISION."]},
+                    {"type": "done", "matches": 1, "truncated": False, "elapsed_ms": 0, "mock": True}
+                ]
+                return Response(''.join(ndjson(line) for line in mock_lines), mimetype='application/x-ndjson')
+            
+            identity = current_identity()
+            
+            def list_library(library):
+                return parse_members(run_zowe(member_list_cmd(library)))
+            
+            def read_member(library, member):
+                return run_zowe(view_data_set_cmd(library, member))
+            
+            def generate():
+                started = time.perf_counter()
+                matches = 0
+                for library in libraries:
+                    try:
+                        info = pds_index.refresh(library, identity, list_library, read_member)
+                    except Exception as e:
+                        print(f"Error indexing {library}: {e}")
+                        yield ndjson({"type": "error", "library": library, "error": str(e)})
+                        continue
+                    yield ndjson({"type": "library", **info})
+                    
+                    for match in pds_index.search(library, terms, limit - matches, context):
+                        yield ndjson({"type": "match", **match})
+                        matches += 1
+                    if matches >= limit:
+                        break
+                
+                yield ndjson({
+                    "type": "done",
+                    "matches": matches,
+                    "truncated": matches >= limit,
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "mock": False
+                })
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+            
+        except Exception as e:
+            import traceback
+            error_trace = traceback.format_exc()
+            print(f"Error searching data sets:\n{error_trace}")
+            return jsonify({"error": str(e)}), 500
+
     @app.route("/api/datasets/save", methods=["POST"])
     def save_content():
         try:
@@ -693,8 +1769,12 @@ def init_routes(app):
             
             if not dataset:
                 return jsonify({"error": "Dataset parameter is required"}), 400
+            if not DSN_PATTERN.match(dataset.upper()) or len(dataset) > 44:
+                return jsonify({"error": f"Invalid data set name: {dataset}"}), 400
+            if member and not MEMBER_PATTERN.match(member.upper()):
+                return jsonify({"error": f"Invalid member name: {member}"}), 400
             
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 print(f"MOCK: Saving {dataset}({member})")
@@ -716,6 +1796,10 @@ def init_routes(app):
                     cmd = f'zowe files upload file-to-data-set "{tmp_path}" "{dataset}"'
                 
                 output = run_zowe(cmd)
+                record_counts.invalidate_prefix(f"{data_set_target(dataset, member).upper()}\x00")
+                content_cache.invalidate_prefix(f"{data_set_target(dataset, member).upper()}\x00")
+                if member:
+                    pds_index.invalidate(dataset.upper(), member.upper())
                 
                 return jsonify({
                     "success": True,
@@ -735,6 +1819,82 @@ def init_routes(app):
                 "error": str(e)
             }), 500
 
+    @app.route("/api/uss/find", methods=["GET"])
+    def find_uss_files():
+        try:
+            path = request.args.get('path', '').strip()
+            names = [name.strip() for name in request.args.get('name', '').split(',') if name.strip()]
+            kind = request.args.get('type', '').strip()
+            limit = max(1, min(request.args.get('limit', 1000, type=int), USS_FIND_MAX_RESULTS))
+            max_depth = max(1, min(request.args.get('max_depth', USS_FIND_MAX_DEPTH, type=int), USS_FIND_MAX_DEPTH))
+            
+            if not path.startswith('/'):
+                return jsonify({"error": "An absolute path is required"}), 400
+            if kind not in ('', 'f', 'd'):
+                return jsonify({"error": "type must be f or d"}), 400
+            
+            filters = {}
+            for name in ('min_size', 'max_size', 'newer_than', 'older_than'):
+                raw = request.args.get(name, '').strip()
+                if raw:
+                    if not raw.isdigit():
+                        return jsonify({"error": f"{name} must be a non-negative integer"}), 400
+                    filters[name] = int(raw)
+            
+            mock_mode = static_mock()
+            
+            if mock_mode:
+                base = path.rstrip('/')
+                mock_lines = [
+                    {"type": "match", "path": f"{base}/scripts/backup.sh"},
+                    {"type": "match", "path": f"{base}/jcl/compile.jcl"},
+                    {"type": "done", "matches": 2, "truncated": False, "warnings": [], "elapsed_ms": 0, "mock": True}
+                ]
+                return Response(''.join(ndjson(line) for line in mock_lines), mimetype='application/x-ndjson')
+            
+            cmd = uss_find_cmd(path, names, kind, max_depth=max_depth, **filters)
+            
+            def generate():
+                started = time.perf_counter()
+                matches = 0
+                truncated = False
+                warnings = []
+                lines = stream_zowe(cmd, USS_FIND_TIMEOUT)
+                try:
+                    for line in lines:
+                        if not line.startswith('/'):
+                            if line.strip() and len(warnings) < 20:
+                                warnings.append(line.strip())
+                            continue
+                        if matches == limit:
+                            truncated = True
+                            break
+                        yield ndjson({"type": "match", "path": line})
+                        matches += 1
+                except Exception as e:
+                    print(f"Error finding files under {path}: {e}")
+                    yield ndjson({"type": "error", "error": str(e)})
+                finally:
+                    # Stops the remote find once the cap is hit or the client is gone
+                    lines.close()
+                
+                yield ndjson({
+                    "type": "done",
+                    "matches": matches,
+                    "truncated": truncated,
+                    "warnings": warnings,
+                    "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                    "mock": False
+                })
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+            
+        except Exception as e:
+            import traceback
+            error_trace = traceback.format_exc()
+            print(f"Error finding USS files:\n{error_trace}")
+            return jsonify({"error": str(e)}), 500
+
     @app.route("/api/uss/browse", methods=["GET"])
     def browse_uss():
         try:
@@ -743,7 +1903,7 @@ def init_routes(app):
             if not path:
                 return jsonify({"error": "Path parameter is required"}), 400
             
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 mock_files = [
@@ -800,27 +1960,7 @@ def init_routes(app):
             cmd = f'zowe files list uss-files "{path}"'
             print(f"Browsing USS: {cmd}")
             output = run_zowe(cmd)
-            
-            files = []
-            lines = [l.strip() for l in output.splitlines() if l.strip()]
-            
-            for line in lines:
-                if line in ['.', '..']:
-                    continue
-                
-                is_directory = line.endswith('/')
-                name = line.rstrip('/')
-                
-                if not name:
-                    continue
-                
-                files.append({
-                    "name": name,
-                    "type": "directory" if is_directory else "file",
-                    "permissions": "drwxr-xr-x" if is_directory else "-rw-r--r--",
-                    "size": 4096 if is_directory else 0,
-                    "modified": "Unknown"
-                })
+            files = parse_uss_listing(output)
             
             return jsonify({
                 "path": path,
@@ -842,7 +1982,7 @@ def init_routes(app):
             if not path:
                 return jsonify({"error": "Path parameter is required"}), 400
             
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 return jsonify({
@@ -860,12 +2000,12 @@ def init_routes(app):
                     "mock": True
                 })
             
-            cmd = f'zowe files view uss-file "{path}"'
-            print(f"Reading USS file: {cmd}")
-            content = run_zowe(cmd)
+            print(f"Reading USS file: {path}")
+            content, cached = read_uss_file(path)
             
             return jsonify({
                 "content": content,
+                "cached": cached,
                 "mock": False
             })
             
@@ -886,7 +2026,7 @@ def init_routes(app):
             if not path:
                 return jsonify({"error": "Path parameter is required"}), 400
             
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 print(f"MOCK: Saving USS file {path}")
@@ -906,6 +2046,7 @@ def init_routes(app):
                 cmd = f'zowe files upload file-to-uss "{tmp_path}" "{path}"'
                 print(f"Saving USS file: {cmd}")
                 output = run_zowe(cmd)
+                content_cache.invalidate_prefix(f"{path}\x00")
                 
                 return jsonify({
                     "success": True,
@@ -933,7 +2074,7 @@ def init_routes(app):
             if not path:
                 return jsonify({"error": "Path parameter is required"}), 400
             
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 print(f"MOCK: Deleting USS file/directory {path}")
@@ -952,6 +2093,9 @@ def init_routes(app):
                 cmd = f'zowe files delete uss "{path}" --for-sure'
                 output = run_zowe(cmd)
             
+            # Also drops cached files below a deleted directory
+            content_cache.invalidate_prefix(path)
+            
             return jsonify({
                 "success": True,
                 "message": f"Item {path} deleted successfully",
@@ -976,7 +2120,7 @@ def init_routes(app):
             if not path:
                 return jsonify({"error": "Path parameter is required"}), 400
             
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 print(f"MOCK: Creating USS directory {path}")
@@ -1013,7 +2157,7 @@ def init_routes(app):
             if not path:
                 return jsonify({"error": "Path parameter is required"}), 400
             
-            mock_mode = current_app.config.get('MOCK_MODE', True)
+            mock_mode = static_mock()
             
             if mock_mode:
                 from flask import Response
@@ -1070,6 +2214,7 @@ def init_routes(app):
     def sync_mainframe_activities():
         from activity_sync import ActivitySync
         
+        # The simulator's job history is far too large to replay into the feed
         mock_mode = current_app.config.get('MOCK_MODE', True)
         result = ActivitySync.sync_mainframe_jobs(mock_mode)
         
@@ -1084,12 +2229,26 @@ def init_routes(app):
             data = request.get_json()
             user_message = data.get('message', '').strip()
             code = data.get('code', '').strip()
+            use_cache = not data.get('no_cache', False)
 
             from text_ai import ask_zbot
-            result = ask_zbot(user_message, code)
+            result = ask_zbot(user_message, code, use_cache=use_cache, user=client_id())
 
             return jsonify(result)
 
+        except QueueFullError as e:
+            print(f"Z-Bot request rejected: {e}")
+            response = jsonify({
+                "success": False,
+                "response": f"Nexus is busy right now. Please try again in {e.retry_after} seconds.",
+                "error": str(e),
+                "retry_after": e.retry_after,
+                "queue_position": e.position
+            })
+            response.headers['Retry-After'] = str(e.retry_after)
+            status_code = 503 if isinstance(e, QueueTimeoutError) else 429
+            return response, status_code
+
         except Exception as e:
             import traceback
             error_trace = traceback.format_exc()
@@ -1099,3 +2258,27 @@ def init_routes(app):
                 "response": "Sorry, I encountered an error. Please try again.",
                 "error": str(e)
             }), 500
+
+    @app.route("/api/zbot/queue", methods=["GET"])
+    def zbot_queue_status():
+        from text_ai import scheduler
+        return jsonify({
+            **scheduler.user_status(client_id()),
+            "scheduler": scheduler.stats()
+        })
+
+    @app.route("/api/zbot/endpoints", methods=["GET"])
+    def zbot_endpoints():
+        from text_ai import model_pool
+        return jsonify(model_pool.stats())
+
+    @app.route("/api/zbot/cache", methods=["GET"])
+    def zbot_cache_stats():
+        from text_ai import response_cache
+        return jsonify(response_cache.stats())
+
+    @app.route("/api/zbot/cache", methods=["DELETE"])
+    def zbot_cache_clear():
+        from text_ai import response_cache
+        response_cache.clear()
+        return jsonify({"success": True})
@@ -0,0 +1,199 @@
+"""Cache storage shared by all worker processes.
+
+With several gunicorn workers, per-process caches multiply mainframe
+traffic: every worker fetches the same job list, catalog or spool file
+itself. Setting SHARED_CACHE to a file path (gunicorn.conf.py picks one
+under /dev/shm, i.e. shared memory) puts those caches in one SQLite
+database in WAL mode that every worker reads and writes.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+SHARED_CACHE = os.environ.get('SHARED_CACHE', '')
+# Another worker's refresh is waited for at most this long before fetching anyway
+SHARED_LEASE_TTL = float(os.environ.get('SHARED_LEASE_TTL', 90))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_age ON entries (namespace, stored_at);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL);
+"""
+
+
+class SharedStore:
+    """Namespaced key/value entries with expiry, counters and leases in one SQLite file.
+
+    Values are stored as JSON. Each thread keeps its own connection, and
+    connections are reopened after a fork.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        self._writes = 0
+        # Holds every identity's content: owner-only. SQLite gives the -wal and -shm
+        # files the same mode as the database file
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        os.chmod(path, 0o600)
+        self._db().executescript(SCHEMA)
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            # Cache contents can always be refetched; skip fsyncs
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group reads and writes; other workers' writes wait until it commits."""
+        db = self._db()
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        row = self._db().execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time())
+        ).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float, maxsize: Optional[int] = None):
+        now = time.time()
+        self._db().execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at, stored_at) VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, json.dumps(value), now + ttl, now)
+        )
+        self._writes += 1
+        if maxsize and self._writes % 32 == 0:
+            self.evict(namespace, maxsize)
+
+    def evict(self, namespace: str, maxsize: int):
+        """Drop expired entries, then the oldest ones beyond maxsize."""
+        db = self._db()
+        db.execute("DELETE FROM entries WHERE namespace = ? AND expires_at <= ?", (namespace, time.time()))
+        db.execute(
+            "DELETE FROM entries WHERE namespace = ? AND key IN ("
+            "SELECT key FROM entries WHERE namespace = ? ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (namespace, namespace, maxsize)
+        )
+
+    def delete(self, namespace: str, key: str):
+        self._db().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def delete_prefix(self, namespace: str, prefix: str) -> int:
+        # A key range rather than substr(): keys hold NUL separators, which SQLite's
+        # string functions stop at
+        cursor = self._db().execute(
+            "DELETE FROM entries WHERE namespace = ? AND key >= ? AND key < ?",
+            (namespace, prefix, prefix + '\U0010ffff')
+        )
+        return cursor.rowcount
+
+    def clear(self, namespace: str):
+        self._db().execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def items(self, namespace: str) -> List[Tuple[str, Any, float]]:
+        """Live (key, value, expires_at) entries."""
+        rows = self._db().execute(
+            "SELECT key, value, expires_at FROM entries WHERE namespace = ? AND expires_at > ? ORDER BY stored_at",
+            (namespace, time.time())
+        ).fetchall()
+        return [(key, json.loads(value), expires_at) for key, value, expires_at in rows]
+
+    def items_after(self, namespace: str, key: str) -> List[Tuple[str, Any, float]]:
+        """Live entries with keys after `key`, in key order, e.g. the tail of a log."""
+        rows = self._db().execute(
+            "SELECT key, value, expires_at FROM entries WHERE namespace = ? AND key > ? AND expires_at > ? "
+            "ORDER BY key",
+            (namespace, key, time.time())
+        ).fetchall()
+        return [(key, json.loads(value), expires_at) for key, value, expires_at in rows]
+
+    def count(self, namespace: str) -> int:
+        return self._db().execute(
+            "SELECT COUNT(*) FROM entries WHERE namespace = ? AND expires_at > ?", (namespace, time.time())
+        ).fetchone()[0]
+
+    def increment(self, name: str) -> int:
+        """Atomically bump a counter shared by all workers and return the new value."""
+        return self._db().execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + 1 RETURNING value",
+            (name,)
+        ).fetchone()[0]
+
+    def counter(self, name: str) -> int:
+        row = self._db().execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def raise_counter(self, name: str, value: int):
+        self._db().execute(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = MAX(value, excluded.value)",
+            (name, value)
+        )
+
+    def try_lease(self, name: str, ttl: float = SHARED_LEASE_TTL) -> bool:
+        now = time.time()
+        cursor = self._db().execute(
+            "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at <= ?",
+            (name, self.owner, now + ttl, now)
+        )
+        return cursor.rowcount == 1
+
+    def release(self, name: str):
+        self._db().execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.owner))
+
+    @contextmanager
+    def lease(self, name: str, done: Callable[[], bool], ttl: float = SHARED_LEASE_TTL,
+              poll: float = 0.05) -> Iterator[None]:
+        """Single-flight across workers: enters once this worker holds the lease or
+        done() reports another worker produced the result. The body re-checks."""
+        deadline = time.monotonic() + ttl
+        held = False
+        while not done():
+            held = self.try_lease(name, ttl)
+            if held or time.monotonic() >= deadline:
+                break  # Past the deadline the holder is stuck or gone; do it ourselves
+            time.sleep(poll)
+        try:
+            yield
+        finally:
+            if held:
+                self.release(name)
+
+    def stats(self) -> dict:
+        rows = self._db().execute(
+            "SELECT namespace, COUNT(*) FROM entries WHERE expires_at > ? GROUP BY namespace", (time.time(),)
+        ).fetchall()
+        return {"path": self.path, "entries": dict(rows)}
+
+
+shared_store: Optional[SharedStore] = SharedStore(SHARED_CACHE) if SHARED_CACHE else None
@@ -0,0 +1,212 @@
+"""Job steps from the JES system spool files.
+
+JESMSGLG, JESJCL and JESYSMSG are fed to the parser line by line as zowe
+streams them, so a long job log is never held in memory: only one dict
+per step is kept. The sources complement each other:
+
+- JESMSGLG: the step summary (IEFACTRT) with RC, CPU and clock time
+- JESJCL: the EXEC statements, for the program each step ran
+- JESYSMSG: IEF142I/IEF472I/IEF450I/IEF272I completions and IEF373I/
+  IEF374I/IEF032I start, stop and CPU lines
+"""
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SYSTEM_DDNAMES = ('JESMSGLG', 'JESJCL', 'JESYSMSG')
+
+# IEF142I MYJOB STEP1 [PROCSTEP] - STEP WAS EXECUTED - COND CODE 0004
+STEP_EXECUTED = re.compile(r"IEF142I (\S+) (\S+)(?: (\S+))? - STEP WAS EXECUTED - COND CODE (\d{4})")
+# IEF472I MYJOB STEP1 [PROCSTEP] - COMPLETION CODE - SYSTEM=0C4 USER=0000 REASON=...
+COMPLETION_CODE = re.compile(r"IEF472I (\S+) (\S+)(?: (\S+))? - COMPLETION CODE - SYSTEM=(\w{3}) USER=(\d{4})")
+# IEF450I MYJOB STEP1 [PROCSTEP] - ABEND=S0C4 U0000 REASON=...
+ABEND_MESSAGE = re.compile(r"IEF450I (\S+) (\S+)(?: (\S+))? - ABEND=S(\w{3}) U(\d{4})")
+# IEF272I ... STEP WAS NOT EXECUTED / IEF202I ... STEP WAS NOT RUN BECAUSE OF CONDITION CODES
+NOT_EXECUTED = re.compile(r"IEF(?:272|202)I (\S+) (\S+)(?: (\S+))? - STEP WAS NOT (?:EXECUTED|RUN)")
+JCL_ERROR = re.compile(r"IEF453I \S+ - JOB FAILED - JCL ERROR")
+# IEF373I STEP/STEP1   /START 2024001.1000
+STEP_START = re.compile(r"IEF373I STEP/\s*([^/\s]+)\s*/START\s+(\d{7}\.\d{4})")
+# IEF374I (older, CPU on the same line) or IEF032I (CPU on the next line)
+STEP_STOP = re.compile(r"IEF(?:374|032)I STEP/\s*([^/\s]+)\s*/STOP\s+(\d{7}\.\d{4})")
+# "CPU    0MIN 00.01SEC" (IEF374I) or "CPU:     0 HR  00 MIN  00.01 SEC" (after IEF032I)
+CPU_TIME = re.compile(r"CPU:?\s+(?:(\d+)\s*HR\s+)?(\d+)\s*MIN\s+([\d.]+)\s*SEC")
+# JESJCL: "  12 //STEP1    EXEC PGM=IEBGENER"; XX/X/ and ++/+/ mark (in-stream) procedure lines
+EXEC_STATEMENT = re.compile(r"^\s*(?:\d+\s+)?(//|XX|X/|\+\+|\+/)(\S*)\s+EXEC\s+(\S+)")
+PGM_OPERAND = re.compile(r"(?:^|,)PGM=([A-Z0-9@#$]{1,8})(?:,|$)")
+PROC_OPERAND = re.compile(r"^(?:PROC=)?([A-Z0-9@#$]{1,8})(?:,|$)")
+SUMMARY_HEADER = re.compile(r"-JOBNAME\s+STEPNAME\s+PROCSTEP\s+RC\b")
+# Step summary RC column: 00, 0004, S0C4, *S0C4, U0100, AB S0C4, FLUSH
+SUMMARY_ABEND = re.compile(r"^\*?(?:AB\s*)?([SU][0-9A-F]{3,4})$")
+
+
+def _abend(system: str, user: str) -> str:
+    return f"S{system}" if system != '000' else f"U{user}"
+
+
+def _timestamp(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, "%Y%j.%H%M")
+    except ValueError:
+        return None
+
+
+def _minutes(value: str) -> Optional[float]:
+    try:
+        return round(float(value) * 60, 2)
+    except ValueError:
+        return None
+
+
+class StepParser:
+    """Incremental step extraction: feed(ddname, line) for every line, then steps()."""
+
+    def __init__(self):
+        self._steps: Dict[Tuple[str, str], Dict] = {}
+        self._programs: Dict[Tuple[str, str], str] = {}
+        self._started: Dict[Tuple[str, str], datetime] = {}
+        self._summary: Optional[Tuple[int, int, int, List[str]]] = None
+        self._cpu_step: Optional[Dict] = None
+        self._proc_caller = ''
+        self.jcl_error = False
+
+    def _step(self, stepname: str, procstep: Optional[str]) -> Dict:
+        key = (stepname, procstep or '')
+        step = self._steps.get(key)
+        if step is None:
+            step = self._steps[key] = {
+                "stepname": stepname, "procstep": procstep or None, "program": None,
+                "retcode": None, "abend": None, "cpu_s": None, "elapsed_s": None
+            }
+        return step
+
+    def _find(self, name: str) -> Optional[Dict]:
+        # IEF373I/IEF374I name only one step: the latest one called that
+        for step in reversed(list(self._steps.values())):
+            if name in (step["stepname"], step["procstep"]):
+                return step
+        return None
+
+    def feed(self, ddname: str, line: str):
+        if ddname == 'JESMSGLG':
+            self._feed_log(line)
+        elif ddname == 'JESJCL':
+            self._feed_jcl(line)
+        elif ddname == 'JESYSMSG':
+            self._feed_messages(line)
+
+    def _feed_log(self, line: str):
+        header = SUMMARY_HEADER.search(line)
+        if header:
+            start = header.start()
+            procstep = line.index('PROCSTEP', start)
+            self._summary = (start, line.index('STEPNAME', start), procstep,
+                             line[procstep + len('PROCSTEP'):].split())
+            return
+        if self._summary is None:
+            return
+        start, stepname_at, procstep_at, labels = self._summary
+        if len(line) <= procstep_at or line[start:start + 1] != '-' or line[start:start + 8] == '-JOBNAME':
+            return
+        stepname = line[stepname_at:procstep_at].strip()
+        if not stepname:
+            return
+        values = line[procstep_at + 8:].split()
+        if len(values) > 1 and values[0] in ('AB', 'ABEND'):
+            values[:2] = [values[0] + values[1]]
+        columns = dict(zip(labels, values))
+        retcode, abend = self._summary_rc(columns.get('RC', ''))
+        if retcode is None:
+            return  # Not a step row after all, e.g. an operator message
+        step = self._step(stepname, line[procstep_at:procstep_at + 8].strip())
+        step["retcode"], step["abend"] = retcode, abend
+        cpu = columns.get('CPU') or columns.get('TCB')
+        if cpu is not None:
+            step["cpu_s"] = _minutes(cpu)
+        if 'CLOCK' in columns:
+            step["elapsed_s"] = _minutes(columns['CLOCK'])
+
+    @staticmethod
+    def _summary_rc(rc: str) -> Tuple[Optional[str], Optional[str]]:
+        if rc.isdigit():
+            return f"CC {int(rc):04d}", None
+        if rc == 'FLUSH':
+            return 'FLUSH', None
+        abend = SUMMARY_ABEND.match(rc.replace('ABEND', 'AB'))
+        if abend:
+            return f"ABEND {abend.group(1)}", abend.group(1)
+        return None, None
+
+    def _feed_jcl(self, line: str):
+        statement = EXEC_STATEMENT.match(line)
+        if not statement:
+            return
+        prefix, name, operands = statement.groups()
+        in_procedure = prefix != '//'
+        program = PGM_OPERAND.search(operands)
+        if program:
+            key = (self._proc_caller, name) if in_procedure else (name, '')
+            self._programs[key] = program.group(1)
+        elif not in_procedure and PROC_OPERAND.match(operands):
+            # The procedure's own EXEC statements follow as XX/++ lines
+            self._proc_caller = name
+
+    def _feed_messages(self, line: str):
+        match = STEP_EXECUTED.search(line)
+        if match:
+            step = self._step(match.group(2), match.group(3))
+            if step["abend"] is None:
+                step["retcode"] = f"CC {match.group(4)}"
+            return
+        match = COMPLETION_CODE.search(line) or ABEND_MESSAGE.search(line)
+        if match:
+            step = self._step(match.group(2), match.group(3))
+            step["abend"] = _abend(match.group(4), match.group(5))
+            step["retcode"] = f"ABEND {step['abend']}"
+            return
+        match = NOT_EXECUTED.search(line)
+        if match:
+            self._step(match.group(2), match.group(3))["retcode"] = 'FLUSH'
+            return
+        if JCL_ERROR.search(line):
+            self.jcl_error = True
+            return
+        match = STEP_START.search(line)
+        if match:
+            self._cpu_step = None
+            step = self._find(match.group(1))
+            started = _timestamp(match.group(2))
+            if step is not None and started is not None:
+                self._started[(step["stepname"], step["procstep"] or '')] = started
+            return
+        match = STEP_STOP.search(line)
+        if match:
+            step = self._cpu_step = self._find(match.group(1))
+            if step is not None and step["elapsed_s"] is None:
+                started = self._started.get((step["stepname"], step["procstep"] or ''))
+                stopped = _timestamp(match.group(2))
+                if started is not None and stopped is not None:
+                    step["elapsed_s"] = (stopped - started).total_seconds()
+        match = CPU_TIME.search(line)
+        if match and self._cpu_step is not None:
+            hours, minutes, seconds = match.groups()
+            self._cpu_step["cpu_s"] = round(int(hours or 0) * 3600 + int(minutes) * 60 + float(seconds), 2)
+            self._cpu_step = None
+
+    def steps(self) -> List[Dict]:
+        result = []
+        for (stepname, procstep), step in self._steps.items():
+            step = dict(step)
+            step["program"] = self._programs.get((stepname, procstep)) or self._programs.get((stepname, ''))
+            if step["retcode"] is None and self.jcl_error:
+                step["retcode"] = 'JCL ERROR'
+            result.append(step)
+        return result
+
+
+def parse_steps(spool_files: Iterable[Tuple[str, Iterable[str]]]) -> List[Dict]:
+    """Steps from (ddname, lines) pairs, each consumed before the next is started."""
+    parser = StepParser()
+    for ddname, lines in spool_files:
+        for line in lines:
+            parser.feed(ddname, line)
+    return parser.steps()
@@ -114,6 +114,7 @@ function renderDatasets(datasets) {
                 </div>
             ` : `
                 <div class="dataset-actions">
+                    <i class="bi bi-download" title="Download" onclick="event.stopPropagation(); downloadDataset('${ds.name}')"></i>
                     <i class="bi bi-pencil-square"></i>
                 </div>
             `}
@@ -184,6 +185,7 @@ async function loadMembers(dataset) {
                         </div>
                     </div>
                     <div class="member-actions">
+                        <i class="bi bi-download" title="Download" onclick="event.stopPropagation(); downloadDataset('${dataset}', '${member.name}')"></i>
                         <i class="bi bi-pencil-square"></i>
                     </div>
                 </div>
@@ -210,6 +212,15 @@ function openInEditor(dataset, member) {
     }
 }
 
+// Streams the data set converted to UTF-8 text on the server
+function downloadDataset(dataset, member) {
+    const params = new URLSearchParams({ dataset });
+    if (member) {
+        params.set('member', member);
+    }
+    window.open(`/api/datasets/download?${params}`, '_blank');
+}
+
 function clearMembers() {
     document.getElementById('membersTitle').innerHTML = `
         <i class="bi bi-file-code" style="color: var(--secondary);"></i>
@@ -5,6 +5,15 @@ let hasChanges = false;
 let autoSaveEnabled = true;
 let autoSaveInterval = null;
 let allMembers = [];
+// Sequential data sets larger than one page are viewed read-only, a page of records at a time
+let sequential = false;
+let pageMode = false;
+let pageOffset = 0;
+let pageSize = 1000;
+let pageReturned = 0;
+let pageHasMore = false;
+let totalRecords = null;
+let countRequested = false;
 
 document.addEventListener('DOMContentLoaded', function() {
     const urlParams = new URLSearchParams(window.location.search);
@@ -13,11 +22,13 @@ document.addEventListener('DOMContentLoaded', function() {
     
     if (currentDataset) {
         document.getElementById('datasetName').textContent = currentDataset;
-        loadMembers();
         
         if (currentMember) {
+            loadMembers();
             document.getElementById('memberName').textContent = currentMember;
             loadMemberContent(currentMember);
+        } else {
+            openDataSet();
         }
     } else {
         document.getElementById('datasetName').textContent = 'No dataset selected';
@@ -33,6 +44,12 @@ document.addEventListener('DOMContentLoaded', function() {
     
     updateLineNumbers();
     
+    document.getElementById('recordJump').addEventListener('keypress', function(e) {
+        if (e.key === 'Enter') {
+            jumpToRecord(this.value);
+        }
+    });
+    
     document.getElementById('autoSaveToggle').classList.add('active');
     startAutoSave();
     
@@ -48,6 +65,127 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
+async function openDataSet() {
+    // Sequential data sets have no members; they open straight into their records
+    try {
+        const response = await fetch(`/api/datasets/content/info?dataset=${encodeURIComponent(currentDataset)}`);
+        const info = await response.json();
+        if (info.error) {
+            throw new Error(info.error);
+        }
+        if (info.dsorg && info.dsorg.startsWith('PS')) {
+            sequential = true;
+            pageSize = info.page_size || pageSize;
+            document.getElementById('memberName').textContent = `Sequential data set (${info.recfm}, LRECL ${info.lrecl})`;
+            document.getElementById('membersList').innerHTML = '<div class="text-center py-3 text-muted">Sequential data set, no members</div>';
+            loadPage(0);
+            return;
+        }
+    } catch (error) {
+        console.error('Error loading data set info:', error);
+    }
+    loadMembers();
+}
+
+async function loadPage(offset, targetRecord = null) {
+    const editor = document.getElementById('codeEditor');
+    editor.value = 'Loading...';
+    editor.disabled = true;
+    
+    try {
+        const params = new URLSearchParams({ dataset: currentDataset, offset: offset, limit: pageSize });
+        const response = await fetch(`/api/datasets/content?${params}`);
+        const data = await response.json();
+        if (data.error) {
+            throw new Error(data.error);
+        }
+        
+        if (offset === 0 && !data.has_more) {
+            // Fits in one page: edit it like a member
+            originalContent = data.records.join('\n');
+            editor.value = originalContent;
+            editor.disabled = false;
+            hasChanges = false;
+            updateSaveButton();
+            updateLineNumbers();
+            setSaveStatus('saved');
+            return;
+        }
+        
+        pageMode = true;
+        pageOffset = data.offset;
+        pageReturned = data.returned;
+        pageHasMore = data.has_more;
+        if (data.total !== null && data.total !== undefined) {
+            totalRecords = data.total;
+        }
+        editor.value = data.records.join('\n');
+        editor.readOnly = true;
+        editor.disabled = false;
+        hasChanges = false;
+        updateSaveButton();
+        updateLineNumbers();
+        updatePager();
+        
+        const lineHeight = parseFloat(getComputedStyle(editor).lineHeight) || 20;
+        editor.scrollTop = targetRecord ? (targetRecord - 1 - pageOffset) * lineHeight : 0;
+        
+        if (totalRecords === null) {
+            countRecords();
+        }
+    } catch (error) {
+        console.error('Error loading records:', error);
+        editor.value = '// Error loading records: ' + error.message;
+        editor.disabled = false;
+    }
+}
+
+function countRecords() {
+    // Counting reads the whole data set on the mainframe; the pager shows it once known
+    if (countRequested) {
+        return;
+    }
+    countRequested = true;
+    fetch(`/api/datasets/content/info?dataset=${encodeURIComponent(currentDataset)}&count=true`)
+        .then(response => response.json())
+        .then(info => {
+            if (info.records !== null && info.records !== undefined) {
+                totalRecords = info.records;
+                updatePager();
+            }
+        })
+        .catch(error => console.error('Error counting records:', error));
+}
+
+function updatePager() {
+    document.getElementById('editorPager').style.display = pageMode ? 'flex' : 'none';
+    const first = pageReturned ? pageOffset + 1 : pageOffset;
+    const total = totalRecords !== null ? totalRecords.toLocaleString() : 'counting...';
+    document.getElementById('pageInfo').textContent =
+        `Records ${first.toLocaleString()}-${(pageOffset + pageReturned).toLocaleString()} of ${total}`;
+}
+
+function changePage(direction) {
+    if (direction > 0 && !pageHasMore) {
+        return;
+    }
+    if (direction < 0 && pageOffset === 0) {
+        return;
+    }
+    loadPage(Math.max(0, pageOffset + direction * pageSize));
+}
+
+function jumpToRecord(value) {
+    let record = parseInt(value, 10);
+    if (!record || record < 1) {
+        return;
+    }
+    if (totalRecords !== null) {
+        record = Math.min(record, totalRecords);
+    }
+    loadPage(Math.floor((record - 1) / pageSize) * pageSize, record);
+}
+
 function loadMembers() {
     const membersList = document.getElementById('membersList');
     membersList.innerHTML = '<div class="text-center py-3"><div class="spinner-border spinner-border-sm text-primary"></div></div>';
@@ -167,7 +305,7 @@ function setSaveStatus(status) {
 }
 
 async function saveMember() {
-    if (!currentMember || !hasChanges || !currentDataset) {
+    if ((!currentMember && !sequential) || !hasChanges || !currentDataset) {
         if (!currentDataset) {
             showNotification('No dataset selected. Cannot save.', 'error');
         }
@@ -267,8 +405,10 @@ function updateLineNumbers() {
     const lineNumbers = document.getElementById('lineNumbers');
     const lines = editor.value.split('\n').length;
     
+    const first = pageMode ? pageOffset + 1 : 1;
+    
     lineNumbers.innerHTML = Array.from({length: lines}, (_, i) => 
-        `<div class="line-number">${i + 1}</div>`
+        `<div class="line-number">${first + i}</div>`
     ).join('');
     
     lineNumbers.scrollTop = editor.scrollTop;
@@ -23,43 +23,45 @@ async function loadDashboardData() {
     }
 }
 
+const ACTIVITY_LIMIT = 5;
+let activities = [];
+let latestActivityId = null;
+let activitiesEtag = null;
+
 async function loadRecentActivities() {
     try {
-        const response = await fetch('/api/activities?limit=5');
+        // After the first load only ask for entries newer than the newest we have
+        const since = latestActivityId !== null ? `&since=${latestActivityId}` : '';
+        const headers = activitiesEtag ? { 'If-None-Match': activitiesEtag } : {};
+        const response = await fetch(`/api/activities?limit=${ACTIVITY_LIMIT}${since}`, {
+            headers,
+            cache: 'no-store'
+        });
+        
+        if (response.status === 304) {
+            renderActivities();
+            return;
+        }
         
         if (!response.ok) {
             throw new Error('Failed to load activities');
         }
         
         const data = await response.json();
-        const container = document.getElementById('activity-container');
         
-        if (data.activities && data.activities.length > 0) {
-            container.innerHTML = data.activities.map(activity => {
-                return `
-                    <div class="activity-item">
-                        <div class="activity-icon ${activity.type}">
-                            <i class="bi bi-${activity.icon}"></i>
-                        </div>
-                        <div class="activity-content">
-                            <div class="activity-title">${escapeHtml(activity.title)}</div>
-                            <div class="activity-meta">
-                                ${escapeHtml(activity.meta)} • ${escapeHtml(activity.relative_time)}
-                            </div>
-                        </div>
-                    </div>
-                `;
-            }).join('');
-        } else {
-            container.innerHTML = `
-                <div class="text-center text-muted py-4">
-                    <i class="bi bi-inbox fs-1"></i>
-                    <p class="mt-2">No recent activities</p>
-                    <small>Start working to see your activity here</small>
-                </div>
-            `;
+        if (latestActivityId !== null && data.latest_id < latestActivityId) {
+            // The feed was reset on the server; start over
+            latestActivityId = null;
+            activitiesEtag = null;
+            activities = [];
+            return loadRecentActivities();
         }
         
+        activities = (data.activities || []).concat(activities).slice(0, ACTIVITY_LIMIT);
+        latestActivityId = data.latest_id;
+        activitiesEtag = response.headers.get('ETag');
+        renderActivities();
+        
     } catch (error) {
         console.error('Error loading activities:', error);
         const container = document.getElementById('activity-container');
@@ -72,6 +74,52 @@ async function loadRecentActivities() {
     }
 }
 
+function renderActivities() {
+    const container = document.getElementById('activity-container');
+    
+    if (activities.length > 0) {
+        container.innerHTML = activities.map(activity => {
+            return `
+                <div class="activity-item">
+                    <div class="activity-icon ${activity.type}">
+                        <i class="bi bi-${activity.icon}"></i>
+                    </div>
+                    <div class="activity-content">
+                        <div class="activity-title">${escapeHtml(activity.title)}</div>
+                        <div class="activity-meta">
+                            ${escapeHtml(activity.meta)} • ${escapeHtml(relativeTime(activity.timestamp))}
+                        </div>
+                    </div>
+                </div>
+            `;
+        }).join('');
+    } else {
+        container.innerHTML = `
+            <div class="text-center text-muted py-4">
+                <i class="bi bi-inbox fs-1"></i>
+                <p class="mt-2">No recent activities</p>
+                <small>Start working to see your activity here</small>
+            </div>
+        `;
+    }
+}
+
+function relativeTime(timestamp) {
+    const seconds = (Date.now() - new Date(timestamp).getTime()) / 1000;
+    if (isNaN(seconds)) return 'unknown';
+    if (seconds < 60) return 'just now';
+    if (seconds < 3600) {
+        const minutes = Math.floor(seconds / 60);
+        return `${minutes} minute${minutes > 1 ? 's' : ''} ago`;
+    }
+    if (seconds < 86400) {
+        const hours = Math.floor(seconds / 3600);
+        return `${hours} hour${hours > 1 ? 's' : ''} ago`;
+    }
+    const days = Math.floor(seconds / 86400);
+    return `${days} day${days > 1 ? 's' : ''} ago`;
+}
+
 function escapeHtml(text) {
     const div = document.createElement('div');
     div.textContent = text;
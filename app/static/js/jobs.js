@@ -1,8 +1,17 @@
+const JOBS_PAGE_SIZE = 200;
+const JOBS_POLL_INTERVAL = 15000;
+const JOB_FIELDS = 'jobid,jobname,owner,status,retcode,class';
+
 let currentOwner = '*';
 let currentPrefix = '*';
+let currentStatus = 'ALL';
 let jobs = [];
-let allJobs = [];
+let jobCounts = {};
+let jobsTotal = 0;
+let jobsVersion = null;
+let nextCursor = null;
 let selectedJobId = null;
+let jobWatch = null;
 
 function showJobsState(state) {
     document.getElementById('loadingState').style.display = state === 'loading' ? 'block' : 'none';
@@ -11,49 +20,119 @@ function showJobsState(state) {
     document.getElementById('jobsList').style.display = state === 'data' ? 'block' : 'none';
 }
 
+function jobsUrl(extra) {
+    const params = new URLSearchParams({
+        owner: currentOwner,
+        prefix: currentPrefix,
+        fields: JOB_FIELDS,
+        sort: 'jobid',
+        order: 'desc',
+        ...extra
+    });
+    if (currentStatus !== 'ALL') {
+        params.set('status', currentStatus);
+    }
+    return `/api/jobs?${params}`;
+}
+
+async function fetchJobs(extra) {
+    const response = await fetch(jobsUrl(extra));
+    const data = await response.json();
+
+    if (data.error) {
+        throw new Error(data.error);
+    }
+    return data;
+}
+
 async function loadJobs() {
-    const owner = document.getElementById('ownerInput').value.trim() || '*';
-    const prefix = document.getElementById('prefixInput').value.trim() || '*';
-    const status = document.getElementById('statusFilter').value;
-    
-    currentOwner = owner;
-    currentPrefix = prefix;
+    currentOwner = document.getElementById('ownerInput').value.trim() || '*';
+    currentPrefix = document.getElementById('prefixInput').value.trim() || '*';
+    currentStatus = document.getElementById('statusFilter').value;
     
     showJobsState('loading');
     
     try {
-        let url = `/api/jobs?owner=${encodeURIComponent(owner)}&prefix=${encodeURIComponent(prefix)}`;
-        
-        const response = await fetch(url);
-        const data = await response.json();
+        const data = await fetchJobs({ limit: JOBS_PAGE_SIZE });
+        applyPage(data, false);
+        showJobs();
+    } catch (error) {
+        document.getElementById('errorMessage').textContent = error.message;
+        showJobsState('error');
+    }
+}
 
-        if (data.error) {
-            throw new Error(data.error);
-        }
+async function loadMoreJobs() {
+    if (!nextCursor) return;
+    try {
+        const data = await fetchJobs({ limit: JOBS_PAGE_SIZE, cursor: nextCursor });
+        applyPage(data, true);
+        showJobs();
+    } catch (error) {
+        alert(`Error loading jobs: ${error.message}`);
+    }
+}
 
-        allJobs = data.jobs || [];
-        
-        if (status !== 'ALL') {
-            jobs = allJobs.filter(j => j.status === status);
+function applyPage(data, append) {
+    jobs = append ? jobs.concat(data.jobs || []) : (data.jobs || []);
+    nextCursor = data.next_cursor;
+    jobsVersion = data.version;
+    jobCounts = data.counts || {};
+    jobsTotal = data.total || 0;
+}
+
+// Poll for what changed since our snapshot instead of re-downloading the list
+async function pollJobs() {
+    if (jobsVersion === null) return;
+    try {
+        const data = await fetchJobs({ since: jobsVersion });
+        if (data.resync) {
+            applyPage(data, false);
+        } else if (data.version !== jobsVersion) {
+            applyDelta(data);
         } else {
-            jobs = allJobs;
-        }
-        
-        updateStats();
-        
-        if (jobs.length === 0) {
-            showJobsState('empty');
             return;
         }
-
-        renderJobs();
-        showJobsState('data');
+        showJobs();
     } catch (error) {
-        document.getElementById('errorMessage').textContent = error.message;
-        showJobsState('error');
+        console.error('Job poll failed:', error);
     }
 }
 
+function applyDelta(data) {
+    const removed = new Set(data.removed);
+    const updates = new Map(data.changed.concat(data.added).map(job => [job.jobid, job]));
+
+    jobs = jobs
+        .filter(job => !removed.has(job.jobid))
+        .map(job => updates.has(job.jobid) ? { ...job, ...updates.get(job.jobid) } : job);
+
+    const known = new Set(jobs.map(job => job.jobid));
+    // New jobs sort first (jobid descending); later pages pick up the rest. A changed
+    // job we do not hold yet just moved into the status filter.
+    const added = data.added.concat(data.changed).filter(job => !known.has(job.jobid));
+    jobs = added.concat(jobs).sort((a, b) => b.jobid.localeCompare(a.jobid));
+
+    if (currentStatus !== 'ALL') {
+        jobs = jobs.filter(job => job.status === currentStatus);
+    }
+    jobsVersion = data.version;
+    jobCounts = data.counts || {};
+    jobsTotal = currentStatus !== 'ALL' ? (jobCounts[currentStatus] || 0) : data.total;
+}
+
+function showJobs() {
+    updateStats();
+
+    if (jobs.length === 0) {
+        showJobsState('empty');
+        return;
+    }
+
+    renderJobs();
+    showJobsState('data');
+}
+
 function renderJobs() {
     const container = document.getElementById('jobsList');
     container.innerHTML = jobs.map(job => {
@@ -86,7 +165,13 @@ function renderJobs() {
                 </div>
             </div>
         `;
-    }).join('');
+    }).join('') + (nextCursor ? `
+        <div class="text-center py-3">
+            <button class="btn-secondary-custom" onclick="loadMoreJobs()">
+                Load more (${jobs.length} of ${jobsTotal})
+            </button>
+        </div>
+    ` : '');
 }
 
 function getStatusClass(status) {
@@ -101,17 +186,18 @@ function getStatusClass(status) {
 }
 
 function updateStats() {
-    const activeCount = allJobs.filter(j => j.status === 'ACTIVE' || j.status === 'INPUT').length;
-    const outputCount = allJobs.filter(j => j.status === 'OUTPUT').length;
-    const errorCount = allJobs.filter(j => j.status === 'ABEND').length;
+    const activeCount = (jobCounts.ACTIVE || 0) + (jobCounts.INPUT || 0);
+    const outputCount = jobCounts.OUTPUT || 0;
+    const total = Object.values(jobCounts).reduce((sum, count) => sum + count, 0);
     
-    document.getElementById('totalJobs').textContent = allJobs.length;
+    document.getElementById('totalJobs').textContent = total;
     document.getElementById('activeJobs').textContent = activeCount;
     document.getElementById('completedJobs').textContent = outputCount;
 }
 
 async function selectJob(jobid) {
     selectedJobId = jobid;
+    stopJobWatch();
     const job = jobs.find(j => j.jobid === jobid);
     
     if (!job) return;
@@ -140,6 +226,9 @@ async function selectJob(jobid) {
         }
 
         renderJobDetails(data);
+        if (data.status !== 'OUTPUT') {
+            watchJob(data.jobid, data.status);
+        }
     } catch (error) {
         detailsContainer.innerHTML = `
             <div class="text-center py-5">
@@ -157,15 +246,18 @@ function renderJobDetails(jobData) {
     let stepsHtml = '';
     if (jobData.steps && jobData.steps.length > 0) {
         stepsHtml = jobData.steps.map(step => {
-            const rcClass = step.retcode === 'CC 0000' ? 'success' : 'error';
+            const details = [];
+            if (step.program) details.push(`Program: ${step.program}`);
+            if (step.cpu_s !== null && step.cpu_s !== undefined) details.push(`CPU: ${step.cpu_s}s`);
+            if (step.elapsed_s !== null && step.elapsed_s !== undefined) details.push(`Elapsed: ${step.elapsed_s}s`);
             return `
                 <div class="job-step">
                     <div class="step-header">
-                        <span class="step-name">${step.stepname}</span>
-                        <span class="step-rc ${rcClass}">${step.retcode || 'N/A'}</span>
+                        <span class="step-name">${step.stepname}${step.procstep ? `.${step.procstep}` : ''}</span>
+                        <span class="step-rc ${getStepRcClass(step.retcode)}">${step.retcode || 'N/A'}</span>
                     </div>
                     <div class="step-info">
-                        ${step.program ? `Program: ${step.program}` : ''}
+                        ${details.join(' &middot; ')}
                     </div>
                 </div>
             `;
@@ -250,6 +342,50 @@ function renderJobDetails(jobData) {
     `;
 }
 
+function getStepRcClass(retcode) {
+    if (retcode === 'CC 0000') return 'success';
+    // CC 0004 is a warning; skipped steps did not fail themselves
+    if (retcode === 'CC 0004' || retcode === 'FLUSH') return 'warning';
+    return 'error';
+}
+
+function stopJobWatch() {
+    if (jobWatch) {
+        jobWatch.abort();
+        jobWatch = null;
+    }
+}
+
+// Long-poll the server until the job's status changes, then reload its details
+async function watchJob(jobid, status) {
+    const controller = new AbortController();
+    jobWatch = controller;
+    const params = new URLSearchParams({ status: status || '', timeout: 25 });
+    while (!controller.signal.aborted) {
+        try {
+            const response = await fetch(`/api/jobs/${encodeURIComponent(jobid)}/wait?${params}`, {
+                signal: controller.signal
+            });
+            const data = await response.json();
+            if (data.error) {
+                throw new Error(data.error);
+            }
+            if (data.done || data.status !== status) {
+                if (jobWatch === controller) {
+                    jobWatch = null;
+                    refreshJobDetails(jobid);
+                    pollJobs();
+                }
+                return;
+            }
+        } catch (error) {
+            if (controller.signal.aborted) return;
+            console.error('Job watch failed:', error);
+            await new Promise(resolve => setTimeout(resolve, JOBS_POLL_INTERVAL));
+        }
+    }
+}
+
 async function refreshJobDetails(jobid) {
     await selectJob(jobid);
 }
@@ -270,6 +406,7 @@ async function purgeJob(jobid) {
             throw new Error(data.error);
         }
         
+        stopJobWatch();
         alert(`Job ${jobid} purged successfully`);
         
         await loadJobs();
@@ -299,11 +436,7 @@ document.addEventListener('DOMContentLoaded', function() {
     
     document.getElementById('statusFilter').addEventListener('change', loadJobs);
     
-    setInterval(() => {
-        if (selectedJobId) {
-            refreshJobDetails(selectedJobId);
-        }
-    }, 30000);
+    setInterval(pollJobs, JOBS_POLL_INTERVAL);
     
     loadJobs();
 });
\ No newline at end of file
@@ -264,6 +264,27 @@ const Theme = {
     }
 };
 
+const ZoweProfile = {
+    init() {
+        const select = document.getElementById('zoweProfileSelect');
+        if (!select) return;
+
+        select.addEventListener('change', async () => {
+            try {
+                if (select.value) {
+                    await API.post('/session', { profile: select.value });
+                } else {
+                    await API.delete('/session');
+                }
+                // Every cached view on the page belongs to the previous identity
+                window.location.reload();
+            } catch (error) {
+                console.error('Could not switch Zowe profile:', error);
+            }
+        });
+    }
+};
+
 const styles = document.createElement('style');
 styles.textContent = `
     @keyframes slideInRight {
@@ -309,6 +330,7 @@ document.addEventListener('DOMContentLoaded', function() {
     console.log('%cInitialized successfully', 'color: #10b981;');
     
     Theme.init();
+    ZoweProfile.init();
     
     document.querySelectorAll('a[href^="#"]').forEach(anchor => {
         anchor.addEventListener('click', function (e) {
@@ -47,6 +47,25 @@ async function sendToAI() {
 
     const code = document.getElementById("codeEditor").value || "";
 
+    const status = document.createElement("div");
+    status.className = "zbot-msg zbot-bot";
+    status.innerText = "Thinking...";
+    messages.appendChild(status);
+    messages.scrollTop = messages.scrollHeight;
+
+    // Show the queue position while the shared model server is busy
+    const queuePoll = setInterval(async () => {
+        try {
+            const res = await fetch("/api/zbot/queue");
+            const queue = await res.json();
+            status.innerText = queue.position > 0
+                ? `Waiting in queue (position ${queue.position})...`
+                : "Thinking...";
+        } catch (err) {
+            // Queue status is informational only
+        }
+    }, 2000);
+
     try {
         const res = await fetch("/api/zbot", {
             method: "POST",
@@ -58,10 +77,14 @@ async function sendToAI() {
         });
 
         const data = await res.json();
+        status.remove();
         addMessage(data.response, "zbot-bot");
 
     } catch (err) {
+        status.remove();
         addMessage("AI Error: " + err, "zbot-bot");
+    } finally {
+        clearInterval(queuePoll);
     }
 }
 
@@ -13,6 +13,8 @@ async function loadDirectory(path = null) {
         currentPath = path;
     }
     
+    stopFind();
+    document.getElementById('findStatus').style.display = 'none';
     showUssState('loading');
     updateBreadcrumb();
 
@@ -483,6 +485,107 @@ function handleFileUpload(input) {
     reader.readAsText(file);
 }
 
+let findController = null;
+
+async function findFiles() {
+    const pattern = document.getElementById('findInput').value.trim();
+    if (!pattern) {
+        loadDirectory();
+        return;
+    }
+    stopFind();
+    const controller = findController = new AbortController();
+    const container = document.getElementById('fileBrowser');
+    const status = document.getElementById('findStatus');
+    container.innerHTML = '';
+    status.textContent = `Searching ${currentPath} for ${pattern}...`;
+    status.style.display = 'block';
+    document.getElementById('stopFindBtn').style.display = 'inline-flex';
+    showUssState('data');
+
+    let matches = 0;
+    try {
+        const params = new URLSearchParams({ path: currentPath, name: pattern, limit: 1000 });
+        const response = await fetch(`/api/uss/find?${params}`, { signal: controller.signal });
+        if (!response.ok) {
+            const data = await response.json();
+            throw new Error(data.error || `HTTP ${response.status}`);
+        }
+
+        // One JSON record per line, rendered as they arrive
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffered = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffered += decoder.decode(value, { stream: true });
+            const lines = buffered.split('\n');
+            buffered = lines.pop();
+            for (const line of lines.filter(Boolean)) {
+                const record = JSON.parse(line);
+                if (record.type === 'match') {
+                    container.appendChild(renderFindMatch(record.path));
+                    matches++;
+                    status.textContent = `Searching ${currentPath}... ${matches} found`;
+                } else if (record.type === 'error') {
+                    throw new Error(record.error);
+                } else if (record.type === 'done') {
+                    status.textContent = `${record.matches} found in ${(record.elapsed_ms / 1000).toFixed(1)}s` +
+                        (record.truncated ? ' (limit reached, narrow the pattern)' : '');
+                }
+            }
+        }
+    } catch (error) {
+        if (findController === controller) {
+            status.textContent = `Find failed: ${error.message}`;
+        }
+    } finally {
+        if (findController === controller) {
+            findController = null;
+            document.getElementById('stopFindBtn').style.display = 'none';
+        }
+    }
+}
+
+function stopFind() {
+    // Aborting the fetch closes the connection; the server then kills the remote find
+    if (findController) {
+        const controller = findController;
+        findController = null;
+        controller.abort();
+        document.getElementById('stopFindBtn').style.display = 'none';
+        document.getElementById('findStatus').textContent += ' (stopped)';
+    }
+}
+
+function renderFindMatch(path) {
+    const slash = path.lastIndexOf('/');
+    const directory = path.substring(0, slash) || '/';
+    const name = path.substring(slash + 1);
+    const item = document.createElement('div');
+    item.className = 'uss-item';
+    item.innerHTML = `
+        <div class="uss-icon file">
+            <i class="bi bi-file-earmark"></i>
+        </div>
+        <div class="uss-info">
+            <div class="uss-name">${escapeHtml(name)}</div>
+            <div class="uss-meta">
+                <span class="uss-meta-item">
+                    <i class="bi bi-folder2"></i>
+                    ${escapeHtml(directory)}
+                </span>
+            </div>
+        </div>
+    `;
+    item.addEventListener('click', () => {
+        document.getElementById('findStatus').style.display = 'none';
+        loadDirectory(directory);
+    });
+    return item;
+}
+
 function closeModal(modalId) {
     document.getElementById(modalId).classList.remove('show');
 }
@@ -508,5 +611,11 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
     
+    document.getElementById('findInput').addEventListener('keypress', (e) => {
+        if (e.key === 'Enter') {
+            findFiles();
+        }
+    });
+
     loadDirectory();
 });
\ No newline at end of file
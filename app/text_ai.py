@@ -1,13 +1,99 @@
 import requests
+import hashlib
 import json
+import os
+import time
 from typing import Dict, Any
+from requests.adapters import HTTPAdapter
+from cache import TTLCache
+from admission import FairScheduler
+from zbot_context import build_context
+from model_pool import ModelPool, NoHealthyEndpointError
+from metrics import ZBOT_UPSTREAM_DURATION
+from tracing import start_span
 
-OLLAMA_URL = "http://35.189.240.113:11434/api/generate"
-MODEL_NAME = "gemma3:4b"
+OLLAMA_URL = os.environ.get('OLLAMA_URL', "http://35.189.240.113:11434/api/generate")
+MODEL_NAME = os.environ.get('ZBOT_MODEL', "gemma3:4b")
+
+# Comma-separated base URLs of Ollama nodes; defaults to the single OLLAMA_URL host
+OLLAMA_ENDPOINTS = [
+    url.strip() for url in
+    os.environ.get('OLLAMA_ENDPOINTS', OLLAMA_URL.replace('/api/generate', '')).split(',')
+    if url.strip()
+]
+ZBOT_FALLBACK_MODEL = os.environ.get('ZBOT_FALLBACK_MODEL') or None
+ZBOT_MAX_PER_NODE = int(os.environ.get('ZBOT_MAX_PER_NODE', 1))
+ZBOT_EJECT_AFTER = int(os.environ.get('ZBOT_EJECT_AFTER', 3))
+ZBOT_HEALTH_INTERVAL = float(os.environ.get('ZBOT_HEALTH_INTERVAL', 10))
+ZBOT_READMIT_AFTER = float(os.environ.get('ZBOT_READMIT_AFTER', 30))
+
+MODEL_OPTIONS = {
+    'temperature': 0.4,
+    'num_predict': 200,
+    'top_k': 40,
+    'top_p': 0.9
+}
+
+ZBOT_POOL_SIZE = int(os.environ.get('ZBOT_POOL_SIZE', 10))
+ZBOT_CACHE_SIZE = int(os.environ.get('ZBOT_CACHE_SIZE', 256))
+ZBOT_CACHE_TTL = int(os.environ.get('ZBOT_CACHE_TTL', 3600))
+ZBOT_MAX_CONCURRENT = int(os.environ.get('ZBOT_MAX_CONCURRENT', 2))
+ZBOT_PER_USER_LIMIT = int(os.environ.get('ZBOT_PER_USER_LIMIT', 1))
+ZBOT_MAX_QUEUE = int(os.environ.get('ZBOT_MAX_QUEUE', 20))
+ZBOT_QUEUE_TIMEOUT = float(os.environ.get('ZBOT_QUEUE_TIMEOUT', 60))
 
 SYSTEM_PROMPT_ZBOT = """<HIER BOVENSTAANDE SYSTEM PROMPT INVOEGEN>"""
 
-def ask_zbot(user_message: str, code: str = "") -> Dict[str, Any]:
+
+def _build_session() -> requests.Session:
+    # One keep-alive pool for the model backend instead of a new TCP connection per chat message
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(OLLAMA_ENDPOINTS), pool_maxsize=ZBOT_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_session = _build_session()
+response_cache = TTLCache("zbot_responses", maxsize=ZBOT_CACHE_SIZE, ttl=ZBOT_CACHE_TTL, shared=True)
+scheduler = FairScheduler(
+    "Z-Bot",
+    max_concurrent=ZBOT_MAX_CONCURRENT,
+    per_user_limit=ZBOT_PER_USER_LIMIT,
+    max_queue=ZBOT_MAX_QUEUE,
+    queue_timeout=ZBOT_QUEUE_TIMEOUT
+)
+model_pool = ModelPool(
+    OLLAMA_ENDPOINTS,
+    model=MODEL_NAME,
+    fallback_model=ZBOT_FALLBACK_MODEL,
+    max_per_node=ZBOT_MAX_PER_NODE,
+    eject_after=ZBOT_EJECT_AFTER,
+    probe_interval=ZBOT_HEALTH_INTERVAL,
+    readmit_after=ZBOT_READMIT_AFTER,
+    session=_session
+)
+
+
+def _cache_key(model: str, options: Dict[str, Any], user_message: str, code: str) -> str:
+    payload = json.dumps(
+        {"model": model, "options": options, "message": user_message, "code": code},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def ask_zbot(user_message: str, code: str = "", use_cache: bool = True,
+             user: str = "anonymous") -> Dict[str, Any]:
+
+    key = _cache_key(MODEL_NAME, MODEL_OPTIONS, user_message, code)
+    if use_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return {**cached, 'cached': True}
+
+    context = build_context(code, user_message)
+    file_header = "OPEN FILE CONTENT (most relevant excerpts):" if context['truncated'] else "OPEN FILE CONTENT:"
 
     full_prompt = f"""
 {SYSTEM_PROMPT_ZBOT}
@@ -15,36 +101,65 @@ def ask_zbot(user_message: str, code: str = "") -> Dict[str, Any]:
 USER QUESTION:
 {user_message}
 
-OPEN FILE CONTENT:
-{code}
+{file_header}
+{context['text']}
 
 Z-BOT:
 """.strip()
 
+    # Admission control sits after the cache so repeated questions never queue
+    with start_span("zbot.request", **{"zbot.context_truncated": context['truncated']}) as span:
+        with scheduler.slot(user) as ticket:
+            span.set_attribute("zbot.queue_wait_ms", ticket.wait_ms)
+            result = _generate(full_prompt, key)
+
+    result['queue'] = {
+        'position': ticket.initial_position,
+        'wait_ms': ticket.wait_ms
+    }
+    return result
+
+
+def _generate(full_prompt: str, key: str) -> Dict[str, Any]:
     try:
-        response = requests.post(
-            OLLAMA_URL,
-            json={
-                'model': MODEL_NAME,
-                'prompt': full_prompt,
-                'stream': False,
-                'options': {
-                    'temperature': 0.4,
-                    'num_predict': 200,
-                    'top_k': 40,
-                    'top_p': 0.9
-                }
-            },
-            timeout=30
-        )
+        endpoint, model = model_pool.acquire()
+    except NoHealthyEndpointError as e:
+        return {
+            'success': False,
+            'error': str(e),
+            'response': "All AI servers are currently unavailable. Please try again later."
+        }
+
+    started = time.monotonic()
+    ok = False
+    try:
+        with start_span("zbot.generate", **{"zbot.endpoint": endpoint.base_url, "zbot.model": model}) as span:
+            response = _session.post(
+                endpoint.generate_url,
+                json={
+                    'model': model,
+                    'prompt': full_prompt,
+                    'stream': False,
+                    'options': MODEL_OPTIONS
+                },
+                timeout=30
+            )
+            span.set_attribute("http.status_code", response.status_code)
+        # 4xx means a bad request, not a sick node
+        ok = response.status_code < 500
 
         if response.status_code == 200:
             data = response.json()
             bot_response = data.get('response', '').strip()
-            return {
+            result = {
                 'success': True,
-                'response': bot_response or "No response from model."
+                'response': bot_response or "No response from model.",
+                'model': model
             }
+            # Fallback answers are not cached under the primary model's key
+            if bot_response and model == MODEL_NAME:
+                response_cache.set(key, result)
+            return {**result, 'cached': False}
 
         return {
             'success': False,
@@ -57,4 +172,13 @@ Z-BOT:
             'success': False,
             'error': str(e),
             'response': f"Error communicating with AI server: {e}"
-        }
\ No newline at end of file
+        }
+    finally:
+        elapsed = time.monotonic() - started
+        model_pool.release(endpoint, ok, elapsed)
+        ZBOT_UPSTREAM_DURATION.observe(
+            elapsed,
+            endpoint=endpoint.base_url,
+            model=model,
+            outcome='ok' if ok else 'error'
+        )
@@ -0,0 +1,292 @@
+import contextvars
+import json
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import requests
+from flask import request, g
+
+# TRACE_EXPORT: "file:/path/to/traces.jsonl" or "otlp:http://collector:4318/v1/traces".
+# Tracing is disabled entirely when it is not set.
+TRACE_EXPORT = os.environ.get('TRACE_EXPORT', '')
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 0.1))
+TRACE_SERVICE_NAME = os.environ.get('TRACE_SERVICE_NAME', 'kdg-mainframe-control-center')
+TRACE_MAX_SPANS = 500
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class Trace:
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+
+
+class Span:
+    def __init__(self, name: str, trace: Trace, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class _NoopSpan:
+    trace = None
+    span_id = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def record_error(self, error):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def enabled() -> bool:
+    return bool(TRACE_EXPORT)
+
+
+def _new_trace(trace_id: Optional[str] = None, sampled: Optional[bool] = None) -> Trace:
+    if sampled is None:
+        sampled = random.random() < TRACE_SAMPLE_RATE
+    return Trace(trace_id or f"{random.getrandbits(128):032x}", sampled)
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace.trace_id if isinstance(span, Span) else None
+
+
+@contextmanager
+def start_span(name: str, **attributes):
+    """Open a child span of the current span, or a new sampled-or-not root trace."""
+    if not enabled():
+        yield NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    if parent is NOOP_SPAN:
+        # Inside an unsampled trace: stay silent for the whole request
+        yield NOOP_SPAN
+        return
+    root = parent is None
+    trace = parent.trace if parent else _new_trace()
+    if not trace.sampled:
+        token = _current_span.set(NOOP_SPAN)
+        try:
+            yield NOOP_SPAN
+        finally:
+            _current_span.reset(token)
+        return
+
+    span = Span(name, trace, parent, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        _finish(span, root)
+
+
+def _finish(span: Span, root: bool):
+    span.end_ns = time.time_ns()
+    trace = span.trace
+    if len(trace.spans) < TRACE_MAX_SPANS:
+        trace.spans.append(span)
+    if root:
+        _exporter().submit(trace.spans)
+
+
+class Exporter:
+    """Ships finished traces from a background thread so requests never wait on I/O."""
+
+    def __init__(self, target: str):
+        self.kind, _, self.destination = target.partition(':')
+        self._queue = queue.Queue(maxsize=1000)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def submit(self, spans: List[Span]):
+        try:
+            self._queue.put_nowait([s.to_dict() for s in spans])
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 50:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._export([span for trace in batch for span in trace])
+            except Exception as e:
+                print(f"Error exporting traces: {e}")
+
+    def _export(self, spans: List[Dict]):
+        if self.kind == 'file':
+            with open(self.destination, 'a') as f:
+                for span in spans:
+                    f.write(json.dumps(span) + '\n')
+        elif self.kind == 'otlp':
+            requests.post(self.destination, json=to_otlp(spans), timeout=5)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Dict]) -> Dict[str, Any]:
+    otlp_spans = []
+    for span in spans:
+        otlp_span = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": 2 if "http.method" in span["attributes"] else 1,
+            "startTimeUnixNano": str(span["start_ns"]),
+            "endTimeUnixNano": str(span["end_ns"]),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span["attributes"].items()],
+            "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1}
+        }
+        if span["parent_id"]:
+            otlp_span["parentSpanId"] = span["parent_id"]
+        otlp_spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}
+            ]},
+            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": otlp_spans}]
+        }]
+    }
+
+
+_exporter_instance = None
+_exporter_lock = threading.Lock()
+
+
+def _exporter() -> Exporter:
+    global _exporter_instance
+    with _exporter_lock:
+        if _exporter_instance is None:
+            _exporter_instance = Exporter(TRACE_EXPORT)
+        return _exporter_instance
+
+
+def _parse_traceparent(header: str):
+    # W3C traceparent: version-traceid-parentid-flags
+    parts = header.split('-')
+    if len(parts) == 4 and len(parts[1]) == 32:
+        return parts[1], parts[2], parts[3] == '01'
+    return None, None, None
+
+
+@contextmanager
+def request_span(name: str, traceparent: str = '', **attributes):
+    """Root span for one incoming request, joining an upstream trace when present."""
+    if not enabled():
+        yield NOOP_SPAN
+        return
+    trace_id, upstream_span_id, sampled = _parse_traceparent(traceparent) if traceparent else (None, None, None)
+    trace = _new_trace(trace_id, sampled)
+    if not trace.sampled:
+        token = _current_span.set(NOOP_SPAN)
+        try:
+            yield NOOP_SPAN
+        finally:
+            _current_span.reset(token)
+        return
+    span = Span(name, trace, None, attributes)
+    span.parent_id = upstream_span_id
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        _finish(span, True)
+
+
+def init_tracing(app):
+    if not enabled():
+        return
+
+    @app.before_request
+    def open_request_span():
+        manager = request_span(
+            f"{request.method} {request.path}",
+            request.headers.get('traceparent', ''),
+            **{"http.method": request.method, "http.target": request.full_path}
+        )
+        g.trace_span = manager.__enter__()
+        g.trace_manager = manager
+
+    @app.after_request
+    def tag_response(response):
+        span = g.get('trace_span')
+        if isinstance(span, Span):
+            span.set_attribute("http.status_code", response.status_code)
+            if request.url_rule:
+                span.set_attribute("http.route", request.url_rule.rule)
+            response.headers['X-Trace-Id'] = span.trace.trace_id
+        return response
+
+    @app.teardown_request
+    def close_request_span(error=None):
+        manager = g.pop('trace_manager', None)
+        g.pop('trace_span', None)
+        if manager is not None:
+            if error is not None:
+                manager.__exit__(type(error), error, error.__traceback__)
+            else:
+                manager.__exit__(None, None, None)
@@ -0,0 +1,229 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from cache import CACHES
+from job_snapshots import job_store
+from job_stats import job_stats
+from shared_store import shared_store
+
+WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'True').lower() in ['true', '1', 'yes']
+# Readiness is granted after this many seconds even if a warm-up step still hangs
+WARMUP_TIMEOUT = float(os.environ.get('WARMUP_TIMEOUT', 90))
+READY_PROBE_INTERVAL = float(os.environ.get('READY_PROBE_INTERVAL', 30))
+
+# Flask's instance folder by default; created private to the server's user
+CACHE_SNAPSHOT_DIR = os.environ.get(
+    'CACHE_SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+)
+CACHE_SNAPSHOT_FILE = os.environ.get('CACHE_SNAPSHOT_FILE', os.path.join(CACHE_SNAPSHOT_DIR, 'cache_snapshot.json'))
+# Only small metadata caches; content, spool, Z-Bot answers and last-known-good
+# output hold users' data and stay in memory
+CACHE_SNAPSHOT_CACHES = [name.strip() for name in
+                         os.environ.get('CACHE_SNAPSHOT_CACHES', 'catalog,record_counts').split(',') if name.strip()]
+CACHE_SNAPSHOT_INTERVAL = float(os.environ.get('CACHE_SNAPSHOT_INTERVAL', 60))
+# An older snapshot describes a different day on the mainframe; start empty instead
+CACHE_SNAPSHOT_MAX_AGE = float(os.environ.get('CACHE_SNAPSHOT_MAX_AGE', 86400))
+
+
+def save_snapshot(path: str = CACHE_SNAPSHOT_FILE) -> Dict:
+    """Write the allow-listed caches, job snapshots and job statistics to disk atomically."""
+    caches = {name: CACHES[name].dump() for name in CACHE_SNAPSHOT_CACHES if name in CACHES}
+    state = {
+        "saved_at": time.time(),
+        "caches": caches,
+        "jobs": job_store.dump(),
+        "job_stats": job_stats.dump()
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    # mkstemp creates the file 0600 under a unique name, so concurrent saves never collide
+    fd, tmp_path = tempfile.mkstemp(prefix='.cache_snapshot.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return {name: len(entries) for name, entries in caches.items()}
+
+
+def restore_snapshot(path: str = CACHE_SNAPSHOT_FILE) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable cache snapshot {path}: {e}")
+        return None
+
+    age = time.time() - state.get("saved_at", 0)
+    if age > CACHE_SNAPSHOT_MAX_AGE:
+        print(f"Cache snapshot {path} is {age / 3600:.1f}h old, not restoring it")
+        return None
+
+    restored = {}
+    for name, entries in state.get("caches", {}).items():
+        cache = CACHES.get(name) if name in CACHE_SNAPSHOT_CACHES else None
+        if cache is not None:
+            restored[name] = cache.load(entries)
+    restored["job_snapshots"] = job_store.load(state.get("jobs", {}))
+    job_stats.load(state.get("job_stats", {}))
+    print(f"Restored cache snapshot from {age:.0f}s ago: {restored}")
+    return {"age_s": round(age, 1), "entries": restored}
+
+
+class Warmup:
+    """Boot-time warm-up steps plus the state /api/ready reports.
+
+    Steps run in order on a background thread so the server can accept
+    connections meanwhile; readiness is withheld until they finish (or
+    WARMUP_TIMEOUT passes). Afterwards the same thread keeps probing the
+    backend and saving the cache snapshot.
+    """
+
+    def __init__(self):
+        self.steps: List[Dict] = []
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.restored: Optional[Dict] = None
+        self.backend: Dict = {"ok": None, "latency_ms": None, "checked_at": None, "error": None}
+        self._probe: Optional[Callable[[], None]] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_step(self, name: str, action: Callable[[], None]):
+        self.steps.append({"name": name, "action": action, "status": "pending",
+                           "duration_ms": None, "error": None})
+
+    def set_probe(self, probe: Callable[[], None]):
+        """Backend check timed for the readiness report, e.g. `zowe zosmf check status`."""
+        self._probe = probe
+
+    def start(self, restore: bool = True):
+        self.started_at = time.time()
+        if restore:
+            # Restoring is local disk I/O; done before the first request is served
+            self.restored = restore_snapshot()
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+        atexit.register(self._save, final=True)
+
+    def _run(self):
+        for step in self.steps:
+            self._run_step(step)
+        with self._lock:
+            self.finished_at = time.time()
+        print(f"Warm-up finished in {self.finished_at - self.started_at:.1f}s")
+        self._save()
+
+        last_save = time.monotonic()
+        while True:
+            time.sleep(min(READY_PROBE_INTERVAL, CACHE_SNAPSHOT_INTERVAL))
+            if self._probe is not None:
+                try:
+                    self.check_backend()
+                except Exception:
+                    pass  # recorded in self.backend
+            if time.monotonic() - last_save >= CACHE_SNAPSHOT_INTERVAL:
+                self._save()
+                last_save = time.monotonic()
+
+    def _run_step(self, step: Dict):
+        step["status"] = "running"
+        started = time.perf_counter()
+        try:
+            step["action"]()
+            step["status"] = "done"
+        except Exception as e:
+            step["status"] = "failed"
+            step["error"] = str(e)
+            print(f"Warm-up step {step['name']} failed: {e}")
+        step["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    def check_backend(self):
+        started = time.perf_counter()
+        try:
+            self._probe()
+            result = {"ok": True, "error": None}
+        except Exception as e:
+            result = {"ok": False, "error": str(e)}
+        result["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        result["checked_at"] = time.time()
+        with self._lock:
+            self.backend = result
+        if not result["ok"]:
+            # Surfaced to the warm-up step and readiness report
+            raise Exception(result["error"])
+
+    def _save(self, final: bool = False):
+        # The workers share their caches through the shared store, so one save per
+        # interval (and one at shutdown) covers them all
+        lease = 'cache_snapshot_final' if final else 'cache_snapshot'
+        if shared_store is not None and not shared_store.try_lease(lease, CACHE_SNAPSHOT_INTERVAL * 0.9):
+            return
+        try:
+            save_snapshot()
+        except Exception as e:
+            print(f"Could not save cache snapshot: {e}")
+
+    @property
+    def ready(self) -> bool:
+        if self.started_at is None:
+            return True
+        with self._lock:
+            if self.finished_at is not None:
+                return True
+        return time.time() - self.started_at >= WARMUP_TIMEOUT
+
+    def status(self) -> Dict:
+        with self._lock:
+            backend = dict(self.backend)
+            finished_at = self.finished_at
+        return {
+            "ready": self.ready,
+            "status": "ready" if self.ready and backend["ok"] is not False else
+                      "degraded" if self.ready else "warming",
+            "backend": backend,
+            "warmup": {
+                "started_at": self.started_at,
+                "finished_at": finished_at,
+                "done": sum(1 for s in self.steps if s["status"] in ("done", "failed")),
+                "total": len(self.steps),
+                "steps": [{k: v for k, v in s.items() if k != "action"} for s in self.steps]
+            },
+            "restored": self.restored
+        }
+
+
+warmup = Warmup()
+
+
+def init_warmup(app, start: bool = True):
+    from flask import jsonify
+    from routes import list_catalog, refresh_jobs, run_zowe
+    from zowe_backend import get_backend
+
+    @app.route("/api/ready")
+    def api_ready():
+        status = warmup.status()
+        return jsonify(status), 200 if status["ready"] else 503
+
+    if not WARMUP_ENABLED or not start:
+        return
+
+    # The static mock answers from code; only the persisted caches are worth restoring
+    if not (app.config.get('MOCK_MODE', True) and get_backend() is None):
+        user = os.environ.get('ZOS_USER')
+        warmup.set_probe(lambda: run_zowe('zowe zosmf check status'))
+        # The first zowe call pays CLI start-up and profile loading; take it here
+        warmup.add_step("backend", warmup.check_backend)
+        warmup.add_step("job_snapshot", refresh_jobs)
+        if user:
+            warmup.add_step("catalog", lambda: list_catalog(f"{user}.*"))
+    warmup.start()
@@ -0,0 +1,167 @@
+import hashlib
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, List
+from cache import TTLCache
+
+ZBOT_CONTEXT_TOKENS = int(os.environ.get('ZBOT_CONTEXT_TOKENS', 1500))
+MAX_CHUNK_LINES = 60
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+TOKEN_RE = re.compile(r"[A-Za-z0-9@#$][A-Za-z0-9@#$-]*")
+COBOL_DIVISION_RE = re.compile(r"^[A-Z-]+\s+DIVISION\b", re.IGNORECASE)
+COBOL_LABEL_RE = re.compile(r"^[A-Z0-9][A-Z0-9-]*(\s+SECTION)?\s*\.\s*$", re.IGNORECASE)
+JCL_STEP_RE = re.compile(r"^//[A-Z@#$][A-Z0-9@#$.]*\s+(EXEC|PROC)\b", re.IGNORECASE)
+REXX_LABEL_RE = re.compile(r"^\s*[A-Za-z_@#$!?][A-Za-z0-9_.@#$!?]*\s*:(?!=)")
+
+_index_cache = TTLCache("zbot_context_index", maxsize=32, ttl=1800)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def detect_language(code: str) -> str:
+    lines = [l for l in code.splitlines() if l.strip()][:200]
+    if not lines:
+        return "text"
+    if sum(1 for l in lines if l.startswith('//')) > len(lines) / 2:
+        return "jcl"
+    if any(COBOL_DIVISION_RE.match(_cobol_area(l).strip()) for l in lines):
+        return "cobol"
+    if 'rexx' in lines[0].lower() and '/*' in lines[0]:
+        return "rexx"
+    return "text"
+
+
+def _cobol_area(line: str) -> str:
+    # Drop the sequence number area (columns 1-7) of fixed-format source
+    if len(line) > 7 and (line[:6].strip() == "" or line[:6].strip().isdigit()):
+        return line[7:72]
+    return line
+
+
+def _boundaries(lines: List[str], language: str) -> List[int]:
+    starts = [0]
+    for i, line in enumerate(lines):
+        if i == 0:
+            continue
+        if language == "cobol":
+            if len(line) > 6 and line[6:7] in ('*', '/'):
+                continue
+            area = _cobol_area(line)
+            if area[:1] != ' ' and (COBOL_DIVISION_RE.match(area) or COBOL_LABEL_RE.match(area)):
+                starts.append(i)
+        elif language == "jcl":
+            if JCL_STEP_RE.match(line):
+                starts.append(i)
+        elif language == "rexx":
+            if REXX_LABEL_RE.match(line):
+                starts.append(i)
+    return starts
+
+
+def split_chunks(code: str) -> List[Dict]:
+    lines = code.splitlines()
+    language = detect_language(code)
+    starts = _boundaries(lines, language) + [len(lines)]
+
+    chunks = []
+    for start, end in zip(starts, starts[1:]):
+        # Oversized paragraphs/steps are windowed so the budget stays usable
+        for window_start in range(start, end, MAX_CHUNK_LINES):
+            window_end = min(window_start + MAX_CHUNK_LINES, end)
+            text = "\n".join(lines[window_start:window_end])
+            if not text.strip():
+                continue
+            chunks.append({
+                "start": window_start + 1,
+                "end": window_end,
+                "text": text,
+                "tokens": estimate_tokens(text)
+            })
+    return chunks
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        if '-' in token:
+            tokens.extend(part for part in token.split('-') if part)
+    return tokens
+
+
+class BM25Index:
+    def __init__(self, chunks: List[Dict]):
+        self.chunks = chunks
+        self.term_freqs = [Counter(tokenize(c["text"])) for c in chunks]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        self.doc_freqs = Counter()
+        for tf in self.term_freqs:
+            self.doc_freqs.update(tf.keys())
+
+    def idf(self, term: str) -> float:
+        n = len(self.chunks)
+        df = self.doc_freqs.get(term, 0)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def scores(self, query: str) -> List[float]:
+        terms = set(tokenize(query))
+        result = []
+        for tf, length in zip(self.term_freqs, self.lengths):
+            score = 0.0
+            norm = K1 * (1 - B + B * length / self.avg_length) if self.avg_length else K1
+            for term in terms:
+                freq = tf.get(term, 0)
+                if freq:
+                    score += self.idf(term) * freq * (K1 + 1) / (freq + norm)
+            result.append(score)
+        return result
+
+
+def _get_index(code: str) -> BM25Index:
+    key = hashlib.sha256(code.encode("utf-8")).hexdigest()
+    index = _index_cache.get(key)
+    if index is None:
+        index = BM25Index(split_chunks(code))
+        _index_cache.set(key, index)
+    return index
+
+
+def build_context(code: str, question: str, budget: int = ZBOT_CONTEXT_TOKENS) -> Dict:
+    """Return the open file, or only its most relevant chunks when it exceeds the token budget."""
+    if not code or estimate_tokens(code) <= budget:
+        return {"text": code, "truncated": False, "chunks": None}
+
+    index = _get_index(code)
+    scores = index.scores(question)
+    # Highest score first; ties (including "no match at all") keep file order
+    ranked = sorted(range(len(index.chunks)), key=lambda i: (-scores[i], i))
+
+    selected = []
+    used = 0
+    for i in ranked:
+        chunk = index.chunks[i]
+        if used + chunk["tokens"] > budget:
+            continue
+        selected.append(i)
+        used += chunk["tokens"]
+
+    parts = []
+    for i in sorted(selected):
+        chunk = index.chunks[i]
+        parts.append(f"[lines {chunk['start']}-{chunk['end']}]\n{chunk['text']}")
+
+    return {
+        "text": "\n\n".join(parts),
+        "truncated": True,
+        "chunks": len(selected),
+        "total_chunks": len(index.chunks)
+    }
@@ -0,0 +1,159 @@
+import asyncio
+import contextvars
+import os
+import shlex
+import time
+from admission import QueueFullError
+from metrics import ZOWE_COMMAND_DURATION, ZOWE_INFLIGHT
+from tracing import start_span
+from zowe_backend import get_backend, ZoweResult
+from zowe_identity import current_identity, with_profile, zowe_scheduler
+from zowe_replay import get_recorder
+from zowe_resilience import TIMEOUT_RETURNCODE, ZoweCall, kill_group, timeout_for
+
+# Upper bound on concurrent zowe child processes in async mode
+ZOWE_MAX_PROCESSES = int(os.environ.get('ZOWE_MAX_PROCESSES', 256))
+
+_semaphore = None
+
+# Set per request by the ASGI server; a stale answer marks it so the response gets X-Zowe-Stale
+stale_marker = contextvars.ContextVar('zowe_stale_marker', default=None)
+
+# Set per request by the ASGI server; the client address users on the shared identity queue under
+client_address = contextvars.ContextVar('zowe_client_address', default=None)
+
+
+def _get_semaphore():
+    # Created lazily so it binds to the server's running event loop
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(ZOWE_MAX_PROCESSES)
+    return _semaphore
+
+
+async def _run_process(cmd_list, family):
+    async with _get_semaphore():
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            *cmd_list,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            # Own process group, so a kill also reaches the node/ssh children the CLI started
+            start_new_session=True
+        )
+        ZOWE_INFLIGHT.inc(mode='async')
+        try:
+            with start_span(f"zowe {family}", **{"zowe.family": family, "zowe.command": ' '.join(cmd_list)}) as span:
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(), timeout_for(family))
+                except asyncio.TimeoutError:
+                    kill_group(process)
+                    await process.wait()
+                    ZOWE_COMMAND_DURATION.observe(time.perf_counter() - started, family=family, outcome='timeout')
+                    return TIMEOUT_RETURNCODE, '', f"Zowe command timed out after {timeout_for(family):g}s ({family})"
+                span.set_attribute("zowe.returncode", process.returncode)
+        except asyncio.CancelledError:
+            # Client went away: do not leave the zowe process running
+            if process.returncode is None:
+                kill_group(process)
+                await process.wait()
+            ZOWE_COMMAND_DURATION.observe(time.perf_counter() - started, family=family, outcome='cancelled')
+            raise
+        finally:
+            ZOWE_INFLIGHT.dec(mode='async')
+
+    ZOWE_COMMAND_DURATION.observe(
+        time.perf_counter() - started,
+        family=family,
+        outcome='ok' if process.returncode == 0 else 'error'
+    )
+
+    return (
+        process.returncode,
+        stdout.decode('utf-8', errors='replace'),
+        stderr.decode('utf-8', errors='replace')
+    )
+
+
+async def _run_backend(backend, cmd_list, family):
+    # In-process backends are synchronous; keep them off the event loop
+    started = time.perf_counter()
+    ZOWE_INFLIGHT.inc(mode='async')
+    try:
+        with start_span(f"zowe {family}", **{"zowe.family": family, "zowe.command": ' '.join(cmd_list)}) as span:
+            result = await asyncio.to_thread(backend.execute, cmd_list)
+            span.set_attribute("zowe.returncode", result.returncode)
+    finally:
+        ZOWE_INFLIGHT.dec(mode='async')
+    ZOWE_COMMAND_DURATION.observe(
+        time.perf_counter() - started,
+        family=family,
+        outcome='ok' if result.returncode == 0 else 'error'
+    )
+    return result
+
+
+async def run_zowe_async(cmd):
+    print(f"Executing (async): {cmd}")
+
+    if isinstance(cmd, str):
+        cmd_list = shlex.split(cmd)
+    else:
+        cmd_list = cmd
+
+    identity = current_identity()
+    cmd_list = with_profile(cmd_list, identity)
+    # Same retry, breaker and stale policy as run_zowe
+    call = ZoweCall(cmd_list, on_stale=_flag_stale)
+
+    if not call.admit():
+        return call.unavailable()
+
+    fair_key = _fair_key(identity)
+    while True:
+        try:
+            # Same scheduler and slots as run_zowe, so sync and async callers share the caps
+            async with zowe_scheduler.slot_async(fair_key):
+                result = await _execute(cmd_list, call.family)
+        except (QueueFullError, asyncio.CancelledError):
+            call.abandon()
+            raise
+
+        delay = call.settle(result)
+        if delay is None:
+            return call.output
+        await asyncio.sleep(delay)
+
+
+def _fair_key(identity):
+    # routes.fair_key_for, with the client address from the ASGI scope
+    if identity.personal:
+        return identity.name
+    return client_address.get() or 'system'
+
+
+def _flag_stale():
+    marker = stale_marker.get()
+    if marker is not None:
+        marker.add(True)
+
+
+async def _execute(cmd_list, family):
+    started = time.perf_counter()
+    backend = get_backend()
+    if backend is not None:
+        returncode, stdout, stderr = await _run_backend(backend, cmd_list, family)
+    else:
+        returncode, stdout, stderr = await _run_process(cmd_list, family)
+
+    recorder = get_recorder()
+    if recorder is not None:
+        recorder.record(cmd_list, ZoweResult(returncode, stdout, stderr), time.perf_counter() - started)
+
+    print(f"Return code: {returncode}")
+    print(f"stdout: {stdout[:200]}")
+
+    if returncode != 0:
+        print(f"stderr: {stderr}")
+
+    return ZoweResult(returncode, stdout, stderr)
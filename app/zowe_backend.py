@@ -0,0 +1,40 @@
+from typing import Iterator, List, NamedTuple, Optional
+
+
+class ZoweResult(NamedTuple):
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+class ZoweBackend:
+    """Answers zowe command lines in-process instead of spawning the CLI."""
+
+    name = 'backend'
+
+    def execute(self, cmd_list: List[str]) -> ZoweResult:
+        raise NotImplementedError
+
+    def stream(self, cmd_list: List[str]) -> Iterator[str]:
+        """Output lines as they are produced; raises on a failed command.
+
+        Backends that can produce output incrementally override this.
+        """
+        result = self.execute(cmd_list)
+        yield from result.stdout.splitlines()
+        if result.returncode != 0:
+            raise Exception(result.stderr)
+
+
+_backend: Optional[ZoweBackend] = None
+
+
+def get_backend() -> Optional[ZoweBackend]:
+    return _backend
+
+
+def set_backend(backend: Optional[ZoweBackend]):
+    global _backend
+    _backend = backend
+    if backend is not None:
+        print(f"Zowe calls are served by the {backend.name} backend")
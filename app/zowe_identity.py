@@ -0,0 +1,160 @@
+import contextvars
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional
+from admission import FairScheduler
+
+# Profiles users may act as, e.g.
+# {"alice": "ALICE", "bob": {"user": "BOB", "zosmf": "bob_zosmf", "ssh": "bob_ssh", "allow": ["alice"]}}
+# A plain string is the z/OS user id; zosmf/ssh default to the profile name itself.
+# "allow" lists the authenticated users, besides its owner, who may switch to the
+# profile ("*" for everyone the proxy lets in).
+ZOWE_PROFILES = json.loads(os.environ.get('ZOWE_PROFILES', '{}'))
+# Set when a reverse proxy authenticates users, e.g. X-Forwarded-User. The header
+# value picks the profile; without it nobody is authenticated and the profiles
+# cannot be chosen from the browser.
+ZOWE_IDENTITY_HEADER = os.environ.get('ZOWE_IDENTITY_HEADER', '')
+
+# Shared capacity towards the mainframe, handed out round-robin across users
+ZOWE_MAX_CONCURRENT = int(os.environ.get('ZOWE_MAX_CONCURRENT', 16))
+ZOWE_PER_USER_LIMIT = int(os.environ.get('ZOWE_PER_USER_LIMIT', 4))
+ZOWE_MAX_QUEUE = int(os.environ.get('ZOWE_MAX_QUEUE', 200))
+ZOWE_PER_USER_QUEUE = int(os.environ.get('ZOWE_PER_USER_QUEUE', 50))
+ZOWE_QUEUE_TIMEOUT = float(os.environ.get('ZOWE_QUEUE_TIMEOUT', 30))
+
+SESSION_KEY = 'zowe_profile'
+
+
+class Identity(NamedTuple):
+    name: str
+    user: Optional[str]
+    zosmf_profile: Optional[str]
+    ssh_profile: Optional[str]
+    # False for the server-wide ZOS_USER/ZOWE_PROFILE identity
+    personal: bool = True
+
+
+def _profile(name: str, spec) -> Identity:
+    if isinstance(spec, str):
+        spec = {"user": spec}
+    return Identity(
+        name=name,
+        user=(spec.get("user") or name).upper(),
+        zosmf_profile=spec.get("zosmf", name),
+        ssh_profile=spec.get("ssh", name)
+    )
+
+
+def default_identity() -> Identity:
+    """The server's own identity from ZOS_USER/ZOWE_PROFILE, as before per-user profiles."""
+    user = os.environ.get('ZOS_USER')
+    profile = os.environ.get('ZOWE_PROFILE')
+    return Identity(
+        name=profile or user or 'default',
+        user=user,
+        zosmf_profile=profile,
+        ssh_profile=os.environ.get('ZOWE_SSH_PROFILE', profile),
+        personal=False
+    )
+
+
+def profile_names() -> List[str]:
+    return sorted(ZOWE_PROFILES)
+
+
+def lookup(name: str) -> Optional[Identity]:
+    spec = ZOWE_PROFILES.get(name)
+    if spec is None:
+        return None
+    return _profile(name, spec)
+
+
+def own_profile(proxy_user: Optional[str]) -> Optional[Identity]:
+    name = (proxy_user or '').strip()
+    if not name:
+        return None
+    return lookup(name) or lookup(name.lower())
+
+
+def may_use(proxy_user: Optional[str], name: str) -> bool:
+    """Whether the authenticated proxy user may act as profile name."""
+    user = (proxy_user or '').strip()
+    if not ZOWE_IDENTITY_HEADER or not user or name not in ZOWE_PROFILES:
+        return False
+    own = own_profile(user)
+    if own is not None and own.name == name:
+        return True
+    spec = ZOWE_PROFILES[name]
+    allowed = spec.get("allow", []) if isinstance(spec, dict) else []
+    return '*' in allowed or user in allowed or user.lower() in allowed
+
+
+def selectable_profiles(proxy_user: Optional[str]) -> List[str]:
+    return [name for name in profile_names() if may_use(proxy_user, name)]
+
+
+def resolve(proxy_user: Optional[str], session_profile: Optional[str]) -> Identity:
+    """Identity for a request: a profile the proxy user switched to, their own profile, then the default.
+
+    Without ZOWE_IDENTITY_HEADER nobody is authenticated, so the session is ignored.
+    """
+    if not ZOWE_IDENTITY_HEADER:
+        return default_identity()
+    if session_profile and may_use(proxy_user, session_profile):
+        return lookup(session_profile)
+    return own_profile(proxy_user) or default_identity()
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar('zowe_identity', default=None)
+
+
+def current_identity() -> Identity:
+    return _current.get() or default_identity()
+
+
+def set_identity(identity: Optional[Identity]):
+    return _current.set(identity)
+
+
+def reset_identity(token):
+    _current.reset(token)
+
+
+def with_profile(cmd_list: List[str], identity: Identity) -> List[str]:
+    """Append the identity's --zosmf-profile/--ssh-profile unless the command names one."""
+    if len(cmd_list) < 2 or cmd_list[0] != 'zowe':
+        return cmd_list
+    if any(arg in ('--zosmf-profile', '--ssh-profile', '--zosmf-p', '--ssh-p') for arg in cmd_list):
+        return cmd_list
+    if cmd_list[1] == 'zos-uss':
+        option, profile = '--ssh-profile', identity.ssh_profile
+    else:
+        option, profile = '--zosmf-profile', identity.zosmf_profile
+    if not profile:
+        return cmd_list
+    return cmd_list + [option, profile]
+
+
+zowe_scheduler = FairScheduler(
+    "Zowe",
+    max_concurrent=ZOWE_MAX_CONCURRENT,
+    per_user_limit=ZOWE_PER_USER_LIMIT,
+    max_queue=ZOWE_MAX_QUEUE,
+    queue_timeout=ZOWE_QUEUE_TIMEOUT,
+    per_user_queue=ZOWE_PER_USER_QUEUE
+)
+
+
+def identity_info(identity: Identity, proxy_user: Optional[str] = None) -> Dict:
+    profiles = selectable_profiles(proxy_user)
+    own = own_profile(proxy_user) if ZOWE_IDENTITY_HEADER else None
+    home = own.name if own else None
+    return {
+        "profile": identity.name,
+        "user": identity.user,
+        "personal": identity.personal,
+        # Where DELETE /api/session goes back to; None is the shared identity
+        "home": home,
+        "profiles": profiles,
+        "selectable": any(name != home for name in profiles)
+    }
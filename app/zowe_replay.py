@@ -0,0 +1,207 @@
+import atexit
+import base64
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from zowe_backend import ZoweBackend, ZoweResult
+from metrics import command_family
+
+# 1.0 = recorded latency, 2.0 = twice as fast, 0 = no delay
+ZOWE_REPLAY_SPEED = float(os.environ.get('ZOWE_REPLAY_SPEED', 1.0))
+
+TMP_PLACEHOLDER = '<tmpfile>'
+
+
+def _open(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def normalize_command(cmd_list: List[str]) -> Tuple[str, ...]:
+    """Command key used to match a live call against a recording.
+
+    Temporary upload/download paths differ on every call, so they are masked.
+    """
+    tmp = tempfile.gettempdir()
+    return tuple(TMP_PLACEHOLDER if arg.startswith(tmp) else arg for arg in cmd_list)
+
+
+def _file_option(cmd_list: List[str]) -> Optional[str]:
+    if '--file' in cmd_list:
+        index = cmd_list.index('--file')
+        if index + 1 < len(cmd_list):
+            return cmd_list[index + 1]
+    return None
+
+
+def _current_route() -> Optional[str]:
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return None
+    if has_request_context():
+        return f"{request.method} {request.full_path.rstrip('?')}"
+    return None
+
+
+class ZoweRecorder:
+    """Appends every Zowe call (command, output, return code, timing) to a fixture archive.
+
+    The archive is JSON lines, gzip-compressed when the path ends in .gz. Each
+    record also carries the HTTP route that issued the call, so a replay can
+    drive the same traffic.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.time()
+        self.count = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = _open(path, 'a')
+        atexit.register(self.close)
+        print(f"Recording Zowe calls to {path}")
+
+    def record(self, cmd_list: List[str], result, elapsed: float, partial: bool = False):
+        """partial marks a streamed command its caller stopped reading early."""
+        entry = {
+            "offset_ms": round((time.time() - self.started) * 1000, 1),
+            "command": list(normalize_command(cmd_list)),
+            "family": command_family(cmd_list),
+            "route": _current_route(),
+            "returncode": result.returncode,
+            "stdout": result.stdout,
+            "stderr": result.stderr,
+            "duration_ms": round(elapsed * 1000, 1)
+        }
+        if partial:
+            entry["partial"] = True
+        # Downloads return their payload through --file, not stdout
+        target = _file_option(cmd_list)
+        if target and result.returncode == 0 and os.path.exists(target):
+            with open(target, 'rb') as f:
+                payload = f.read()
+            try:
+                entry["file_content"] = payload.decode('utf-8')
+            except UnicodeDecodeError:
+                # --binary/--record downloads are EBCDIC; keep them byte for byte
+                entry["file_content"] = base64.b64encode(payload).decode('ascii')
+                entry["file_base64"] = True
+        line = json.dumps(entry)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def load_recording(path: str) -> List[Dict]:
+    records = []
+    with _open(path, 'r') as f:
+        try:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+        except EOFError:
+            # gzip archive of a recorder that was killed before closing; every flushed line is usable
+            pass
+    return records
+
+
+class ReplayBackend(ZoweBackend):
+    """Serves Zowe calls from a recording made by ZoweRecorder.
+
+    Calls are matched on the normalized command line. Repeated calls to the
+    same command get the recorded responses in order, wrapping around once
+    they run out, so a short capture can drive a long benchmark.
+    """
+
+    name = 'replay'
+
+    def __init__(self, records: List[Dict], speed: float = ZOWE_REPLAY_SPEED):
+        self.records = records
+        self.speed = speed
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._queues: Dict[Tuple[str, ...], deque] = {}
+        for record in records:
+            self._queues.setdefault(tuple(record["command"]), deque()).append(record)
+
+    @classmethod
+    def load(cls, path: str, speed: float = ZOWE_REPLAY_SPEED) -> 'ReplayBackend':
+        records = load_recording(path)
+        print(f"Loaded {len(records)} recorded Zowe calls from {path}")
+        return cls(records, speed)
+
+    def routes(self) -> List[Tuple[str, str]]:
+        """Distinct (method, path) HTTP routes seen while recording."""
+        seen = []
+        for record in self.records:
+            route = record.get("route")
+            if route:
+                method, path = route.split(' ', 1)
+                if (method, path) not in seen:
+                    seen.append((method, path))
+        return seen
+
+    def execute(self, cmd_list: List[str]) -> ZoweResult:
+        key = normalize_command(cmd_list)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                self.misses += 1
+                record = None
+            else:
+                self.hits += 1
+                record = queue[0]
+                queue.rotate(-1)
+
+        if record is None:
+            return ZoweResult(1, '', f"No recording for: {' '.join(cmd_list)}")
+
+        if self.speed > 0:
+            time.sleep(record["duration_ms"] / 1000 / self.speed)
+
+        target = _file_option(cmd_list)
+        if target and "file_content" in record:
+            if record.get("file_base64"):
+                payload = base64.b64decode(record["file_content"])
+            else:
+                payload = record["file_content"].encode('utf-8')
+            with open(target, 'wb') as f:
+                f.write(payload)
+
+        return ZoweResult(record["returncode"], record["stdout"], record["stderr"])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "records": len(self.records),
+                "commands": len(self._queues),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+_recorder: Optional[ZoweRecorder] = None
+
+
+def get_recorder() -> Optional[ZoweRecorder]:
+    return _recorder
+
+
+def set_recorder(recorder: Optional[ZoweRecorder]):
+    global _recorder
+    _recorder = recorder
@@ -0,0 +1,352 @@
+import json
+import os
+import queue
+import random
+import re
+import select
+import signal
+import socket
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+from cache import TTLCache
+from metrics import (
+    command_family,
+    ZOWE_BREAKER_OPEN,
+    ZOWE_RETRIES as ZOWE_RETRIES_TOTAL,
+    ZOWE_STALE_RESPONSES
+)
+from zowe_backend import ZoweResult
+
+# Deadline per zowe call; ZOWE_TIMEOUTS overrides it per family, e.g. {"uss_ssh": 20}
+ZOWE_TIMEOUT = float(os.environ.get('ZOWE_TIMEOUT', 60))
+DEFAULT_TIMEOUTS = {
+    'uss_ssh': 30,
+    'zosmf_status': 30,
+    'spool_view': 120,
+    'dataset_view': 120,
+    'dataset_download': 600,
+    'uss_view': 120,
+    'uss_download': 180,
+    'dataset_upload': 180,
+    'uss_upload': 180,
+}
+ZOWE_TIMEOUTS = {**DEFAULT_TIMEOUTS, **json.loads(os.environ.get('ZOWE_TIMEOUTS', '{}'))}
+
+ZOWE_RETRIES = int(os.environ.get('ZOWE_RETRIES', 2))
+ZOWE_BACKOFF_BASE = float(os.environ.get('ZOWE_BACKOFF_BASE', 0.5))
+ZOWE_BACKOFF_MAX = float(os.environ.get('ZOWE_BACKOFF_MAX', 8))
+
+ZOWE_BREAKER_FAILURES = int(os.environ.get('ZOWE_BREAKER_FAILURES', 5))
+ZOWE_BREAKER_COOLDOWN = float(os.environ.get('ZOWE_BREAKER_COOLDOWN', 30))
+# How long a last-known-good answer may be served while the target is unhealthy
+ZOWE_STALE_TTL = float(os.environ.get('ZOWE_STALE_TTL', 3600))
+
+TIMEOUT_RETURNCODE = 124
+
+# Only reads are retried or served stale; a repeated upload/delete/purge could do harm
+READ_FAMILIES = {
+    'jobs_list', 'job_status', 'spool_list', 'spool_view',
+    'dataset_list', 'member_list', 'dataset_view', 'dataset_download',
+    'uss_list', 'uss_view', 'uss_download', 'uss_ssh',
+}
+
+TRANSIENT_PATTERNS = re.compile(
+    r"ETIMEDOUT|ECONNRESET|ECONNREFUSED|EHOSTUNREACH|EAI_AGAIN|ENOTFOUND|socket hang up"
+    r"|timed out|Timeout|HTTP\(S\) status 50[234]|status code 50[234]|Service Unavailable"
+    r"|Bad Gateway|Gateway Timeout|connection (?:reset|refused|closed)",
+    re.IGNORECASE
+)
+
+last_good = TTLCache("zowe_last_good", maxsize=512, ttl=ZOWE_STALE_TTL, shared=True)
+
+
+class CircuitOpenError(Exception):
+    """The target is failing and no cached answer is available."""
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away while its zowe call was running."""
+
+
+def timeout_for(family: str) -> float:
+    return float(ZOWE_TIMEOUTS.get(family, ZOWE_TIMEOUT))
+
+
+def is_transient(result: ZoweResult) -> bool:
+    if result.returncode == TIMEOUT_RETURNCODE:
+        return True
+    return bool(TRANSIENT_PATTERNS.search(result.stderr or ''))
+
+
+def backoff_delay(attempt: int) -> float:
+    # Full jitter: spreads retries from many workers over the whole interval
+    return random.uniform(0, min(ZOWE_BACKOFF_MAX, ZOWE_BACKOFF_BASE * (2 ** attempt)))
+
+
+def target_for(cmd_list: List[str]) -> str:
+    """Backend a command talks to: z/OSMF or SSH, per profile when one is given."""
+    service = 'ssh' if len(cmd_list) > 1 and cmd_list[1] == 'zos-uss' else 'zosmf'
+    for option in ('--ssh-profile', '--zosmf-profile', '--ssh-p', '--zosmf-p'):
+        if option in cmd_list:
+            index = cmd_list.index(option)
+            if index + 1 < len(cmd_list):
+                return f"{service}:{cmd_list[index + 1]}"
+    return service
+
+
+def cache_key(cmd_list: List[str]) -> str:
+    return '\x00'.join(cmd_list)
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive transient failures -> half-open after a cooldown.
+
+    While open, calls fail fast. After the cooldown a single probe call is let
+    through; its outcome closes the breaker again or restarts the cooldown.
+    """
+
+    def __init__(self, target: str, failures: int = ZOWE_BREAKER_FAILURES, cooldown: float = ZOWE_BREAKER_COOLDOWN):
+        self.target = target
+        self.threshold = failures
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = 'half-open'
+            if self.state == 'half-open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            if self.state != 'closed':
+                print(f"Zowe circuit for {self.target} closed")
+            self.state = 'closed'
+            self.failures = 0
+            self._probing = False
+        ZOWE_BREAKER_OPEN.set(0, target=self.target)
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            tripped = self.state == 'half-open' or self.failures >= self.threshold
+            if tripped:
+                if self.state != 'open':
+                    print(f"Zowe circuit for {self.target} opened after {self.failures} failures")
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+        if tripped:
+            ZOWE_BREAKER_OPEN.set(1, target=self.target)
+
+    def abandon(self):
+        """The call was cancelled before it said anything about the target."""
+        with self._lock:
+            self._probing = False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "target": self.target,
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "retry_in_s": round(max(0.0, self.cooldown - (time.monotonic() - self.opened_at)), 1)
+                if self.state == 'open' else 0
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(target: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(target)
+        if breaker is None:
+            breaker = _breakers[target] = CircuitBreaker(target)
+        return breaker
+
+
+def breaker_stats() -> List[Dict]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [b.stats() for b in breakers]
+
+
+class ZoweCall:
+    """Retry, circuit breaker and last-known-good policy for one zowe command.
+
+    Shared by run_zowe and run_zowe_async, which only differ in how they run an
+    attempt and wait out a backoff. settle() takes each attempt's result and
+    returns the delay before the next attempt, or None once `output` holds the
+    answer.
+    """
+
+    def __init__(self, cmd_list: List[str], on_stale: Callable[[], None]):
+        self.family = command_family(cmd_list)
+        self.read_only = self.family in READ_FAMILIES
+        self.key = cache_key(cmd_list)
+        self.breaker = breaker_for(target_for(cmd_list))
+        self.on_stale = on_stale
+        self.attempt = 0
+        self.output: Optional[str] = None
+
+    def admit(self) -> bool:
+        """False when the target's circuit is open; answer with stale() instead."""
+        return self.breaker.allow()
+
+    def settle(self, result: ZoweResult) -> Optional[float]:
+        if result.returncode == 0:
+            self.breaker.success()
+            if self.read_only:
+                last_good.set(self.key, result.stdout)
+            self.output = result.stdout
+            return None
+
+        if not is_transient(result):
+            # The mainframe answered (bad data set name, RACF denial...): it is healthy
+            self.breaker.success()
+            raise Exception(result.stderr)
+
+        self.breaker.failure()
+        # A timed-out call already used its whole deadline; do not spend it again
+        if (not self.read_only or result.returncode == TIMEOUT_RETURNCODE or self.attempt >= ZOWE_RETRIES
+                or not self.breaker.allow()):
+            self.output = self.stale(result.stderr)
+            return None
+
+        delay = backoff_delay(self.attempt)
+        self.attempt += 1
+        ZOWE_RETRIES_TOTAL.inc(family=self.family)
+        print(f"Transient Zowe failure, retry {self.attempt}/{ZOWE_RETRIES} in {delay:.2f}s")
+        return delay
+
+    def stale(self, error: str) -> str:
+        """Last successful output for a read while its target is failing, else raise."""
+        cached = last_good.get(self.key) if self.read_only else None
+        if cached is None:
+            raise CircuitOpenError(error)
+        print(f"Serving last known good {self.family} output: {error}")
+        ZOWE_STALE_RESPONSES.inc(family=self.family)
+        self.on_stale()
+        return cached
+
+    def unavailable(self) -> str:
+        return self.stale(f"Mainframe target {self.breaker.target} is unavailable")
+
+    def abandon(self):
+        """The attempt was cancelled (queue full, client gone) before it said anything."""
+        self.breaker.abandon()
+
+
+def client_gone(sock) -> bool:
+    """True when the peer closed the request's socket (werkzeug/gunicorn sync workers)."""
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return False
+        return sock.recv(1, socket.MSG_PEEK) == b''
+    except (OSError, ValueError):
+        return True
+
+
+def _spawn(cmd_list: List[str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        cmd_list,
+        shell=False,  # Important: avoid shell globbing
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        # Own process group, so a kill also reaches whatever the CLI started
+        start_new_session=True
+    )
+
+
+def kill_group(process):
+    """Kill the child and everything it started (it leads its own session)."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        process.kill()
+
+
+def stream_process(cmd_list: List[str], timeout: float, client_socket=None, poll: float = 0.5) -> Iterator[str]:
+    """Yield stdout lines while the child runs.
+
+    The child is killed when the deadline passes, when the client disconnects,
+    or when the caller stops iterating (e.g. after a result cap).
+    """
+    process = _spawn(cmd_list)
+    # Unbounded so the reader never blocks on a consumer that already stopped
+    lines: "queue.Queue[Optional[str]]" = queue.Queue()
+    stderr_tail: List[str] = []
+
+    def read_stdout():
+        for line in process.stdout:
+            lines.put(line.rstrip('\n'))
+        lines.put(None)
+
+    def read_stderr():
+        # Drained on its own thread so a chatty stderr cannot block the child
+        for line in process.stderr:
+            stderr_tail.append(line)
+            del stderr_tail[:-50]
+
+    for reader in (read_stdout, read_stderr):
+        threading.Thread(target=reader, name="zowe-stream", daemon=True).start()
+
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Zowe command timed out after {timeout:g}s ({command_family(cmd_list)})")
+            try:
+                line = lines.get(timeout=min(poll, max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                if client_gone(client_socket):
+                    raise ClientDisconnected(f"Client disconnected during {command_family(cmd_list)}")
+                continue
+            if line is None:
+                break
+            yield line
+        if process.wait() != 0:
+            raise Exception(''.join(stderr_tail) or f"Zowe command failed with return code {process.returncode}")
+    finally:
+        if process.poll() is None:
+            kill_group(process)
+            process.wait()
+
+
+def run_process(cmd_list: List[str], timeout: float, client_socket=None, poll: float = 0.5) -> ZoweResult:
+    """subprocess.run with a deadline that also kills the child if the client disconnects."""
+    process = _spawn(cmd_list)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            stdout, stderr = process.communicate(timeout=min(poll, max(0.0, deadline - time.monotonic())))
+            return ZoweResult(process.returncode, stdout, stderr)
+        except subprocess.TimeoutExpired:
+            if time.monotonic() >= deadline:
+                kill_group(process)
+                stdout, stderr = process.communicate()
+                return ZoweResult(
+                    TIMEOUT_RETURNCODE, stdout or '',
+                    f"Zowe command timed out after {timeout:g}s ({command_family(cmd_list)})"
+                )
+            if client_gone(client_socket):
+                kill_group(process)
+                process.communicate()
+                raise ClientDisconnected(f"Client disconnected during {command_family(cmd_list)}")
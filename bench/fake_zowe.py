@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Stand-in for the `zowe` CLI used by the benchmark suite.
+
+Behaviour is driven by environment variables so each scenario can shape it:
+
+    FAKE_ZOWE_LATENCY_MS    default latency per call (ms)
+    FAKE_ZOWE_LATENCY       JSON map of command family -> latency ms, e.g. {"jobs_list": 800}
+    FAKE_ZOWE_ROWS          rows in list output (jobs, data sets, members, USS entries)
+    FAKE_ZOWE_CONTENT_KB    size of spool / data set / USS file content
+    FAKE_ZOWE_FAILURE_RATE  probability (0..1) that a call exits with rc 1
+    FAKE_ZOWE_SEED          seed for the generated listings
+"""
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+from metrics import command_family  # noqa: E402
+
+STATUSES = ['OUTPUT', 'OUTPUT', 'OUTPUT', 'ACTIVE', 'INPUT']
+RETCODES = ['CC 0000', 'CC 0000', 'CC 0004', 'CC 0008', 'ABEND S0C7', 'JCL ERROR']
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def content(size_kb):
+    line = "//STEP1    EXEC PGM=IEFBR14                                              \n"
+    return line * max(1, (size_kb * 1024) // len(line))
+
+
+def jobs(rows, rng):
+    result = []
+    for i in range(rows):
+        status = rng.choice(STATUSES)
+        result.append({
+            "jobid": f"JOB{i:05d}",
+            "jobname": f"JOB{rng.randint(0, 999):03d}X",
+            "owner": f"USER{rng.randint(1, 20):02d}",
+            "status": status,
+            "retcode": rng.choice(RETCODES) if status == 'OUTPUT' else None,
+            "class": rng.choice('ABC'),
+            "subsystem": "JES2"
+        })
+    return result
+
+
+def respond(args, rng):
+    family = command_family(['zowe'] + args)
+    rows = env_int('FAKE_ZOWE_ROWS', 100)
+    size_kb = env_int('FAKE_ZOWE_CONTENT_KB', 16)
+
+    if family == 'jobs_list':
+        return json.dumps({"data": jobs(rows, rng)})
+    if family == 'job_status':
+        return json.dumps({"data": dict(jobs(1, rng)[0], jobid=args[3])})
+    if family == 'spool_list':
+        return json.dumps({"data": [
+            {"id": i, "ddname": dd, "stepname": "JES2", "procstep": None}
+            for i, dd in enumerate(['JESMSGLG', 'JESJCL', 'JESYSMSG', 'SYSPRINT'], start=2)
+        ]})
+    if family in ('spool_view', 'dataset_view', 'uss_view'):
+        return content(size_kb)
+    if family == 'dataset_list':
+        return '\n'.join(f"BENCH.DS{i:05d}.{'JCL' if i % 3 == 0 else 'DATA'}" for i in range(rows))
+    if family == 'member_list':
+        return '\n'.join(f"MEM{i:05d} 2024/01/15 2024/02/{1 + i % 28:02d}" for i in range(rows))
+    if family == 'uss_list':
+        return '\n'.join(f"dir{i}/" if i % 5 == 0 else f"file{i}.sh" for i in range(rows))
+    if family == 'uss_download':
+        target = args[args.index('--file') + 1]
+        with open(target, 'w') as f:
+            f.write(content(size_kb))
+        return f"Data set downloaded successfully.\nDestination: {target}"
+    if family == 'uss_ssh':
+        command = args[-1]
+        if command.startswith('df'):
+            return "Filesystem 1K-blocks Used Available Use% Mounted\nOMVS.ROOT 1000000 420000 580000 42% /"
+        if 'who' in command:
+            return str(rng.randint(1, 30))
+        return ""
+    return "success"
+
+
+def main():
+    args = sys.argv[1:]
+    family = command_family(['zowe'] + args)
+
+    latencies = json.loads(os.environ.get('FAKE_ZOWE_LATENCY', '{}'))
+    latency_ms = float(latencies.get(family, os.environ.get('FAKE_ZOWE_LATENCY_MS', 50)))
+    time.sleep(latency_ms / 1000)
+
+    if random.random() < float(os.environ.get('FAKE_ZOWE_FAILURE_RATE', 0)):
+        sys.stderr.write(f"Fake failure for {family}\n")
+        return 1
+
+    rng = random.Random(env_int('FAKE_ZOWE_SEED', 42))
+    sys.stdout.write(respond(args, rng) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
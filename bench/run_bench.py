@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Benchmark the control center against a fake zowe CLI.
+
+    python bench/run_bench.py                       # all scenarios
+    python bench/run_bench.py -s dashboard -c 16    # one scenario, 16 clients
+    python bench/run_bench.py --replay session.jsonl.gz   # replay a recorded session
+
+Each run writes bench/results/<timestamp>.json and compares throughput and
+p95 latency against the previous result file.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCH_DIR, '..', 'app')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+READ_ROUTES = [
+    ('GET', '/api/health', None),
+    ('GET', '/api/activities?limit=5', None),
+    ('GET', '/api/jobs', None),
+    ('GET', '/api/jobs?status=OUTPUT', None),
+    ('GET', '/api/jobs/JOB00001', None),
+    ('GET', '/api/jobs/JOB00001/spool/2', None),
+    ('GET', '/api/datasets/list?hlq=BENCH', None),
+    ('GET', '/api/datasets/members?dataset=BENCH.JCL', None),
+    ('GET', '/api/datasets/content?dataset=BENCH.JCL&member=MEM00001', None),
+    ('GET', '/api/uss/browse?path=/u/bench', None),
+    ('GET', '/api/uss/file?path=/u/bench/file1.sh', None),
+    ('GET', '/api/uss/download?path=/u/bench/file1.sh', None),
+]
+
+WRITE_ROUTES = [
+    ('POST', '/api/datasets/save', {"dataset": "BENCH.JCL", "member": "MEM00001", "content": "//X JOB\n" * 50}),
+    ('PUT', '/api/uss/file', {"path": "/u/bench/new.sh", "content": "echo hi\n" * 50}),
+    ('POST', '/api/uss/directory', {"path": "/u/bench/newdir"}),
+    ('DELETE', '/api/uss/file?path=/u/bench/newdir', None),
+    ('DELETE', '/api/jobs/JOB00002', None),
+    ('POST', '/api/activities/sync', None),
+]
+
+DASHBOARD_ROUTES = [
+    ('GET', '/api/dashboard', None),
+    ('GET', '/api/system-status', None),
+    ('GET', '/api/activities?limit=5', None),
+]
+
+ZBOT_ROUTES = [
+    ('POST', '/api/zbot', {"message": "Explain this job", "code": "//STEP1 EXEC PGM=IEFBR14\n" * 200, "no_cache": True}),
+]
+
+SCENARIOS = {
+    'read-mix': {
+        'routes': READ_ROUTES,
+        'fake_zowe': {'FAKE_ZOWE_LATENCY_MS': 50, 'FAKE_ZOWE_ROWS': 500, 'FAKE_ZOWE_CONTENT_KB': 32}
+    },
+    'write-mix': {
+        'routes': WRITE_ROUTES,
+        'fake_zowe': {'FAKE_ZOWE_LATENCY_MS': 100, 'FAKE_ZOWE_ROWS': 200}
+    },
+    'dashboard': {
+        'routes': DASHBOARD_ROUTES,
+        'fake_zowe': {'FAKE_ZOWE_LATENCY_MS': 50, 'FAKE_ZOWE_ROWS': 5000,
+                      'FAKE_ZOWE_LATENCY': json.dumps({'jobs_list': 400, 'uss_ssh': 200})}
+    },
+    'large-lists': {
+        'routes': READ_ROUTES[2:4] + READ_ROUTES[6:8],
+        'fake_zowe': {'FAKE_ZOWE_LATENCY_MS': 20, 'FAKE_ZOWE_ROWS': 50000}
+    },
+    'flaky-backend': {
+        'routes': READ_ROUTES + DASHBOARD_ROUTES,
+        'fake_zowe': {'FAKE_ZOWE_LATENCY_MS': 50, 'FAKE_ZOWE_FAILURE_RATE': 0.2}
+    },
+    'zbot': {
+        'routes': ZBOT_ROUTES,
+        'fake_zowe': {},
+        'model_latency_ms': 300
+    },
+}
+
+
+class StubModelHandler(BaseHTTPRequestHandler):
+    latency_ms = 300
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._reply({"models": [{"name": "bench"}]})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.latency_ms / 1000)
+        self._reply({"response": "This job runs IEFBR14."})
+
+
+def install_fake_zowe(workdir):
+    bin_dir = os.path.join(workdir, 'bin')
+    os.makedirs(bin_dir)
+    launcher = os.path.join(bin_dir, 'zowe')
+    with open(launcher, 'w') as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.join(BENCH_DIR, "fake_zowe.py")}" "$@"\n')
+    os.chmod(launcher, os.stat(launcher).st_mode | stat.S_IEXEC)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ['PATH']
+
+
+def start_model_stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubModelHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KB on Linux, bytes on macOS; close enough as a fallback
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index] * 1000, 2)
+
+
+def summarize(latencies):
+    return {
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": round(max(latencies) * 1000, 2) if latencies else None
+    }
+
+
+def run_scenario(name, spec, base_url, clients, duration):
+    import requests
+
+    for key, value in spec['fake_zowe'].items():
+        os.environ[key] = str(value)
+    StubModelHandler.latency_ms = spec.get('model_latency_ms', 300)
+
+    routes = spec['routes']
+    deadline = time.monotonic() + duration
+    lock = threading.Lock()
+    per_route = {}
+    all_latencies = []
+    errors = {}
+    peak_rss = [rss_mb()]
+    rss_start = peak_rss[0]
+    stop = threading.Event()
+
+    def sample_memory():
+        while not stop.wait(0.1):
+            peak_rss[0] = max(peak_rss[0], rss_mb())
+
+    def client(seed):
+        rng = random.Random(seed)
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            method, path, body = rng.choice(routes)
+            started = time.perf_counter()
+            try:
+                response = session.request(method, base_url + path, json=body, timeout=120)
+                status = response.status_code
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - started
+            label = f"{method} {path.split('?')[0]}"
+            with lock:
+                per_route.setdefault(label, []).append(elapsed)
+                all_latencies.append(elapsed)
+                if status != 200:
+                    errors[str(status)] = errors.get(str(status), 0) + 1
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, range(clients)))
+    wall = time.monotonic() - started
+    stop.set()
+    sampler.join()
+
+    for key in spec['fake_zowe']:
+        os.environ.pop(key, None)
+
+    return {
+        "clients": clients,
+        "duration_s": round(wall, 2),
+        "requests": len(all_latencies),
+        "throughput_rps": round(len(all_latencies) / wall, 2) if wall else 0,
+        "errors": errors,
+        "error_rate": round(sum(errors.values()) / len(all_latencies), 4) if all_latencies else 0,
+        "latency": summarize(all_latencies),
+        "routes": {label: summarize(values) for label, values in sorted(per_route.items())},
+        "memory": {
+            "rss_start_mb": round(rss_start, 1),
+            "rss_peak_mb": round(peak_rss[0], 1),
+            "rss_end_mb": round(rss_mb(), 1)
+        }
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BENCH_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def previous_result():
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    files = sorted(f for f in os.listdir(RESULTS_DIR) if f.endswith('.json'))
+    if not files:
+        return None
+    with open(os.path.join(RESULTS_DIR, files[-1])) as f:
+        return json.load(f)
+
+
+def compare(current, previous, threshold):
+    regressions = []
+    for name, result in current['scenarios'].items():
+        before = previous.get('scenarios', {}).get(name)
+        if not before:
+            continue
+        rps_before, rps_now = before['throughput_rps'], result['throughput_rps']
+        p95_before, p95_now = before['latency']['p95_ms'], result['latency']['p95_ms']
+        print(f"  {name:15} rps {rps_before:>9} -> {rps_now:<9} p95 {p95_before} -> {p95_now} ms")
+        if rps_before and rps_now < rps_before * (1 - threshold):
+            regressions.append(f"{name}: throughput dropped {rps_before} -> {rps_now} rps")
+        if p95_before and p95_now and p95_now > p95_before * (1 + threshold):
+            regressions.append(f"{name}: p95 rose {p95_before} -> {p95_now} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-s', '--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='scenario to run (repeatable, default: all)')
+    parser.add_argument('-c', '--clients', type=int, default=8, help='concurrent clients')
+    parser.add_argument('-d', '--duration', type=float, default=15, help='seconds per scenario')
+    parser.add_argument('--threshold', type=float, default=0.2, help='regression threshold (fraction)')
+    parser.add_argument('--no-save', action='store_true', help='do not write a result file')
+    parser.add_argument('--replay', metavar='FILE', help='serve zowe calls from a ZOWE_RECORD capture')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='replay latency divisor (1 = recorded latency, 0 = none)')
+    args = parser.parse_args()
+    if args.replay:
+        args.replay = os.path.abspath(args.replay)
+
+    workdir = tempfile.mkdtemp(prefix='mfcc-bench-')
+    install_fake_zowe(workdir)
+    model_stub = start_model_stub()
+
+    # The app reads its configuration at import time
+    os.environ.update({
+        'MOCK_MODE': 'false',
+        'ZOS_USER': 'BENCH',
+        'OLLAMA_ENDPOINTS': f'http://127.0.0.1:{model_stub.server_port}',
+        'ZBOT_MAX_CONCURRENT': '4',
+        'ZBOT_PER_USER_LIMIT': '4',
+        'ZBOT_MAX_QUEUE': '1000',
+    })
+    if args.replay:
+        os.environ.update({'ZOWE_REPLAY': args.replay, 'ZOWE_REPLAY_SPEED': str(args.replay_speed)})
+    os.chdir(workdir)
+    sys.path.insert(0, APP_DIR)
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    scenarios = args.scenario or sorted(SCENARIOS)
+    if args.replay:
+        from zowe_backend import get_backend
+        replay = get_backend()
+        # Drive the routes that were hit while recording
+        SCENARIOS['replay'] = {'routes': [(m, p, None) for m, p in replay.routes() if m == 'GET'], 'fake_zowe': {}}
+        if not SCENARIOS['replay']['routes']:
+            sys.exit(f"{args.replay} contains no recorded GET routes")
+        scenarios = args.scenario or ['replay']
+
+    import builtins
+    quiet_print = builtins.print
+    builtins.print = lambda *a, **k: None  # the app logs every zowe call to stdout
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "scenarios": {}
+    }
+    try:
+        for name in scenarios:
+            quiet_print(f"Running {name} ({args.clients} clients, {args.duration}s)...")
+            result = run_scenario(name, SCENARIOS[name], base_url, args.clients, args.duration)
+            results['scenarios'][name] = result
+            quiet_print(
+                f"  {result['throughput_rps']} req/s, p50 {result['latency']['p50_ms']} ms, "
+                f"p95 {result['latency']['p95_ms']} ms, p99 {result['latency']['p99_ms']} ms, "
+                f"errors {result['error_rate']:.1%}, peak RSS {result['memory']['rss_peak_mb']} MB"
+            )
+    finally:
+        builtins.print = quiet_print
+        if args.replay:
+            print(f"Replay: {replay.stats()}")
+        server.shutdown()
+        model_stub.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    previous = previous_result()
+    if previous:
+        print(f"Compared with {previous.get('timestamp')} ({previous.get('git_commit')}):")
+        for regression in compare(results, previous, args.threshold):
+            print(f"  REGRESSION {regression}")
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {path}")
+
+
+if __name__ == '__main__':
+    main()